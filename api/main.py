@@ -1,37 +1,98 @@
-from fastapi import FastAPI, HTTPException, UploadFile, File, Form
+from fastapi import FastAPI, HTTPException, UploadFile, File, Form, Request
+from fastapi.responses import JSONResponse, StreamingResponse, Response
 from pydantic import BaseModel
-from typing import List, Dict, Optional, Union, Any
+from typing import List, Dict, Optional, Union, Any, Iterator, Tuple
 import sys
 import os
 from PIL import Image
-from io import BytesIO
 import json
-import tempfile
 import pathlib
 import logging
-import csv
 import io
+import asyncio
+import gc
+import hashlib
+import itertools
+import math
+import time
+import zipfile
+from contextlib import asynccontextmanager
+import numpy as np
 
 # 添加项目目录到系统路径
 sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from tools.classifier import classifier as classifier_module
 from tools.classifier.classifier import txtClassifier
+from tools.classifier.batcher import ClassifyBatcher
+from tools.classifier.dedup import NearDuplicateIndex
+from tools.classifier.prefilter import RulePrefilter
+from tools.transformer import image as image_module
+from tools.transformer import audio as audio_module
 from tools.transformer.image import ImageRecognizer
-from tools.transformer.audio import AudioRecognizer
+from tools.transformer.audio import AudioRecognizer, SAMPLING_RATE, audio_duration
 from tools.default_labels import unified_security_matrix, get_all_labels
+from tools.executor import InferenceExecutor, InferenceQueueFull
+from tools.cache import ResultCache
+from tools.metrics import registry, timer, RequestMetricsMiddleware
+from tools.transformer.table import read_csv_head, column_samples, build_column_texts
+from tools.scanner.readers import detect_format
+from tools.scanner.table_scanner import TableScanner
+from tools.registry import ModelRegistry, ModelNotReady
+from tools.settings import (
+    INFER_TXT_WORKERS, INFER_TXT_QUEUE,
+    INFER_IMAGE_WORKERS, INFER_IMAGE_QUEUE,
+    INFER_AUDIO_WORKERS, INFER_AUDIO_QUEUE,
+    TXT_BATCH_CHUNK_SIZE, IMAGE_BATCH_SIZE, IMAGE_CAPTION_MAX_LENGTH, IMAGE_BATCH_MAX_FILE_BYTES, IMAGE_BATCH_MAX_FILES,
+    CSV_SAMPLE_ROWS, CSV_MAX_SAMPLE_ROWS, SCAN_WORKERS, SCAN_QUEUE,
+    CLASSIFY_ENGINE, CLASSIFY_BACKEND, CLASSIFY_HIERARCHICAL, CLASSIFY_CASCADE_TOP_K,
+    MODEL_ENABLE_TXT, MODEL_ENABLE_IMAGE, MODEL_ENABLE_AUDIO, MODEL_WARMUP, MODEL_PRELOAD,
+    AUDIO_TRANSCRIPT_MAX_CHARS, AUDIO_CHUNK_SECONDS, AUDIO_BATCH_SIZE, AUDIO_BLOCK_SECONDS,
+    AUDIO_VAD, AUDIO_VAD_FRAME_MS, AUDIO_VAD_THRESHOLD_DB, AUDIO_VAD_MIN_SPEECH_MS,
+    AUDIO_VAD_MIN_SILENCE_MS, AUDIO_VAD_PAD_MS,
+    AUDIO_EARLY_EXIT, AUDIO_EARLY_EXIT_WINDOW_SECONDS, AUDIO_EARLY_EXIT_MARGIN, ASR_BACKEND,
+    LONG_TEXT_ENABLED, LONG_TEXT_WINDOW_TOKENS, LONG_TEXT_OVERLAP_TOKENS, LONG_TEXT_AGGREGATION, LONG_TEXT_MAX_TOKENS,
+    DEDUP_ENABLED, PREFILTER_ENABLED
+)
 logging.basicConfig(
     level=logging.INFO,
     format='%(asctime)s - %(name)s - %(levelname)s - %(message)s'
 )
 logger = logging.getLogger(__name__)
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    """模型在后台并发加载并预热，服务立即开始监听：/health 始终可用，/ready 在预热完成后返回 200"""
+    loading = asyncio.create_task(models.load_all())
+    yield
+    loading.cancel()
+    if batcher is not None:
+        await batcher.close()
+    for executor in (txt_executor, image_executor, audio_executor, scan_executor):
+        executor.shutdown(wait=False)
+
 app = FastAPI(
     title="文本分类API",
     description="基于zero-shot learning的文本分类服务",
     version="1.0.0",
     docs_url="/docs",
     redoc_url="/redoc",
-    openapi_url="/openapi.json"
+    openapi_url="/openapi.json",
+    lifespan=lifespan
 )
 
+# 请求耗时与接口内各阶段耗时，由 /metrics 以 Prometheus 文本格式导出
+request_seconds = registry.histogram(
+    'http_request_duration_seconds', '请求耗时（秒），流式响应计到响应体发送完毕', ('endpoint', 'status')
+)
+request_stage_seconds = registry.histogram(
+    'request_stage_seconds', '接口内各阶段的耗时（秒）', ('endpoint', 'stage', 'label_set')
+)
+app.add_middleware(RequestMetricsMiddleware, histogram=request_seconds)
+
+def stage(endpoint: str, name: str, label_set: str = ''):
+    """记录接口内某个阶段的耗时，label_set 为所用默认标签集的名称"""
+    return timer(request_stage_seconds.labels(endpoint, name, label_set))
+
 # 添加全局异常处理
 @app.exception_handler(Exception)
 async def global_exception_handler(request, exc):
@@ -41,18 +102,123 @@ async def global_exception_handler(request, exc):
         "path": request.url.path
     }
 
+# 推理队列已满时返回 503，提示客户端稍后重试
+@app.exception_handler(InferenceQueueFull)
+async def inference_queue_full_handler(request, exc):
+    return JSONResponse(
+        status_code=503,
+        content={"detail": str(exc)},
+        headers={"Retry-After": str(exc.retry_after)}
+    )
+
+# 模型未启用或尚未就绪时返回 503
+@app.exception_handler(ModelNotReady)
+async def model_not_ready_handler(request, exc):
+    return JSONResponse(
+        status_code=503,
+        content={"detail": str(exc), "model": exc.name, "state": exc.state},
+        headers={"Retry-After": str(exc.retry_after)}
+    )
+
 # 添加健康检查
 @app.get("/health")
 async def health_check():
     """健康检查接口"""
     return {"status": "healthy"}
 
+@app.get("/ready")
+async def readiness_check():
+    """就绪检查：所有启用的模型加载并预热完成后返回 200，否则返回 503"""
+    content = {"status": "ready" if models.ready else "loading", "models": models.status()}
+    return JSONResponse(status_code=200 if models.ready else 503, content=content)
+
+@app.get("/stats")
+async def get_stats():
+    """运行时统计：微批处理调度器与各推理执行器的状态"""
+    return {
+        "models": models.status(),
+        "batcher": batcher.stats() if batcher is not None else None,
+        "result_cache": result_cache.stats(),
+        "dedup": txt_dedup.stats() if txt_dedup is not None else None,
+        "prefilter": prefilter.stats() if prefilter is not None else None,
+        "caption_cache": image_recognizer.cache_stats() if image_recognizer is not None else None,
+        "executors": {
+            "txt": txt_executor.stats(),
+            "image": image_executor.stats(),
+            "audio": audio_executor.stats(),
+            "scan": scan_executor.stats()
+        }
+    }
+
+@app.get("/metrics")
+async def get_metrics():
+    """Prometheus 文本格式的指标：请求与各阶段耗时、模型计数、缓存命中次数、执行器队列等
+
+    指标保存在进程内，多 worker 部署时每次抓取只返回处理该请求的 worker 的指标
+    """
+    return Response(content=registry.render(), media_type='text/plain; version=0.0.4; charset=utf-8')
+
+
 
+# 分类器、图像识别器和语音识别器在 lifespan 中加载，加载完成前为 None
+classifier: Optional[txtClassifier] = None
+image_recognizer: Optional[ImageRecognizer] = None
+audio_recognizer: Optional[AudioRecognizer] = None
+batcher: Optional[ClassifyBatcher] = None
+table_scanner: Optional[TableScanner] = None
 
-# 初始化分类器、图像识别器和语音识别器
-classifier = txtClassifier()
-image_recognizer = ImageRecognizer()
-audio_recognizer = AudioRecognizer()
+# 每类模型一个推理执行器，阻塞推理不占用事件循环
+txt_executor = InferenceExecutor('txt', INFER_TXT_WORKERS, INFER_TXT_QUEUE)
+image_executor = InferenceExecutor('image', INFER_IMAGE_WORKERS, INFER_IMAGE_QUEUE)
+audio_executor = InferenceExecutor('audio', INFER_AUDIO_WORKERS, INFER_AUDIO_QUEUE)
+# 表格扫描的读取与采样不占用模型执行器
+scan_executor = InferenceExecutor('scan', SCAN_WORKERS, SCAN_QUEUE)
+
+def model_identity() -> str:
+    """模型与分类参数的标识，任一变化时结果缓存自动失效"""
+    parts = [
+        classifier_module.model_path, CLASSIFY_ENGINE, CLASSIFY_BACKEND, CLASSIFY_HIERARCHICAL, CLASSIFY_CASCADE_TOP_K,
+        classifier_module.hypothesis_template,
+        image_module.model_path, audio_module.model_path, ASR_BACKEND
+    ]
+    return hashlib.sha256('|'.join(str(part) for part in parts).encode('utf-8')).hexdigest()[:12]
+
+result_cache = ResultCache(model_identity())
+# 模板化文本只有姓名、编号等不同，近似重复的文本直接复用已分类文本的结果
+txt_dedup = NearDuplicateIndex() if DEDUP_ENABLED else None
+# 含无歧义关键词的文本与表头由规则直接分类，不占用模型
+prefilter = RulePrefilter() if PREFILTER_ENABLED else None
+
+def lookup_counts(stats: Optional[dict]) -> list:
+    """把统计中的命中、未命中次数转换为回调指标的 (标签值, 数值)"""
+    if not stats:
+        return []
+    return [(('hit',), stats['hits']), (('miss',), stats['misses'])]
+
+def prefilter_counts() -> list:
+    if prefilter is None:
+        return []
+    return [
+        ((kind, tier), tier_stats['count'])
+        for kind, kind_stats in prefilter.stats().items() for tier, tier_stats in kind_stats['tiers'].items()
+    ]
+
+executors = {'txt': txt_executor, 'image': image_executor, 'audio': audio_executor, 'scan': scan_executor}
+# 已有的统计在抓取时读取，请求路径上没有额外开销
+registry.callback('result_cache_lookups_total', 'counter', '结果缓存的查询次数', ('result',),
+                  lambda: lookup_counts(result_cache.stats() if result_cache.enabled else None))
+registry.callback('dedup_lookups_total', 'counter', '近似重复文本索引的查询次数', ('result',),
+                  lambda: lookup_counts(txt_dedup.stats() if txt_dedup is not None else None))
+registry.callback('caption_cache_lookups_total', 'counter', '图像描述缓存的查询次数', ('result',),
+                  lambda: lookup_counts(image_recognizer.cache_stats() if image_recognizer is not None else None))
+registry.callback('prefilter_texts_total', 'counter', '规则预分类处理的文本数，按命中层级区分', ('kind', 'tier'),
+                  prefilter_counts)
+registry.callback('executor_pending', 'gauge', '推理执行器中执行与排队的任务数', ('executor',),
+                  lambda: [((name,), executor.stats()['pending']) for name, executor in executors.items()])
+registry.callback('executor_rejected_total', 'counter', '推理执行器因队列已满拒绝的任务数', ('executor',),
+                  lambda: [((name,), executor.stats()['rejected']) for name, executor in executors.items()])
+registry.callback('batcher_pending', 'gauge', '微批处理调度器中排队的请求数', (),
+                  lambda: [((), batcher.stats()['pending'])] if batcher is not None else [])
 
 def load_default_labels():
     """从 default_labels.py 加载默认标签"""
@@ -71,6 +237,90 @@ def load_default_labels():
         
 default_labels = load_default_labels()
 
+def load_classifier() -> txtClassifier:
+    model = txtClassifier()
+    # 启动时编码固定标签集的假设句，请求时只对输入文本分词
+    model.preload_labels(get_all_labels().values())
+    return model
+
+def on_classifier_loaded(model: txtClassifier):
+    global classifier, batcher, table_scanner
+    classifier = model
+    batcher = ClassifyBatcher(model, executor=txt_executor)
+    table_scanner = TableScanner(model)
+
+def on_image_recognizer_loaded(model: ImageRecognizer):
+    global image_recognizer
+    image_recognizer = model
+
+def on_audio_recognizer_loaded(model: AudioRecognizer):
+    global audio_recognizer
+    audio_recognizer = model
+
+async def warmup_classifier(model: txtClassifier):
+    """在推理线程中对每个默认标签集各分类一次，首个请求不再承担初始化开销"""
+    items = [('预热文本', labels) for labels in get_all_labels().values() if labels]
+    await txt_executor.run(model.classify_many, items)
+
+async def warmup_image_recognizer(model: ImageRecognizer):
+    await image_executor.run(model.recognize, Image.new('RGB', (64, 64)))
+
+async def warmup_audio_recognizer(model: AudioRecognizer):
+    # 一秒静音，关闭语音检测以确保实际运行一次解码
+    silence = np.zeros(SAMPLING_RATE, dtype=np.float32)
+    await audio_executor.run(lambda: list(model.transcribe_stream(silence, vad=False)))
+
+models = ModelRegistry()
+models.register('txt', load_classifier, warmup_classifier if MODEL_WARMUP else None,
+                on_classifier_loaded, enabled=MODEL_ENABLE_TXT)
+models.register('image', ImageRecognizer, warmup_image_recognizer if MODEL_WARMUP else None,
+                on_image_recognizer_loaded, enabled=MODEL_ENABLE_IMAGE)
+models.register('audio', AudioRecognizer, warmup_audio_recognizer if MODEL_WARMUP else None,
+                on_audio_recognizer_loaded, enabled=MODEL_ENABLE_AUDIO)
+
+if MODEL_PRELOAD:
+    # gunicorn --preload：主进程在 fork 前加载权重，worker 以写时复制方式共享，只各自持有激活值；
+    # 冻结已有对象，避免 worker 中的垃圾回收写入这些对象所在的内存页
+    models.preload()
+    gc.freeze()
+
+async def classify_groups(sequence: str, label_groups: list) -> list:
+    """按标签组对同一文本分类，返回每组的完整分类结果
+
+    所有标签组作为一个请求提交给微批处理调度器，在同一次前向计算中完成，并与其他请求合并计算。
+    """
+    return await batcher.classify_multi(sequence, label_groups)
+
+async def classify_label_groups(sequence: str, label_groups: list) -> list:
+    """按标签组对同一文本分类，返回每组得分最高的 [标签, 分数]"""
+    return [top_result(result) for result in await classify_groups(sequence, label_groups)]
+
+def is_confident(results: list, margin: float) -> bool:
+    """每个标签组的最高分都领先第二名至少 margin 时认为分类结果已确定"""
+    for result in results:
+        if not result or not result.get('scores'):
+            return False
+        scores = result['scores']
+        runner_up = scores[1] if len(scores) > 1 else 0.0
+        if scores[0] - runner_up < margin:
+            return False
+    return True
+
+def take_segments(segments, until: float) -> tuple:
+    """从转录结果迭代器中取出片段，直到片段结束时间达到 until 秒，返回 (片段列表, 是否已取完)"""
+    taken = []
+    for segment in segments:
+        taken.append(segment)
+        if segment['end'] >= until:
+            return taken, False
+    return taken, True
+
+def top_result(result: dict) -> list:
+    """取分类结果中得分最高的 [标签, 分数]，无结果时为空列表"""
+    if result and result['labels'] and result['scores']:
+        return [result['labels'][0], result['scores'][0]]
+    return []
+
 class TxtRequest(BaseModel):
     txt: str
 
@@ -80,142 +330,673 @@ class SecurityLevelRequest(BaseModel):
 
 @app.post("/classify/txt")
 async def classify_txt(request: TxtRequest):
+    models.require('txt')
     if not request.txt.strip():
         return {"results": []}
     labels = default_labels.get('txt', [])
     if not labels:
         return {"results": []}
     try:
-        all_results = []
-        for label_group in labels:
-            if not label_group:
-                all_results.append([])
-                continue
-            result = classifier.classify(
-                sequence=request.txt,
-                labels=label_group
-            )
-            if result['labels'] and result['scores']:
-                all_results.append([result['labels'][0], result['scores'][0]])
-            else:
-                all_results.append([])
+        if LONG_TEXT_ENABLED and classifier.may_need_windows(request.txt, labels):
+            with stage('/classify/txt', 'classify_long', 'txt'):
+                return await classify_long_txt(request.txt, labels)
+        with stage('/classify/txt', 'prefilter', 'txt'):
+            ruled = prefilter_label_groups('txt', request.txt, labels)
+        if ruled is not None:
+            all_results, tier = ruled
+            logger.info(f'分类结果（规则：{tier}）：{all_results}')
+            return txt_response(all_results, tier)
+        cache_key = result_cache.make_key('txt', request.txt)
+        all_results = result_cache.get(cache_key)
+        if all_results is not None:
+            logger.info(f'分类结果（缓存）：{all_results}')
+            return txt_response(all_results)
+        reused = lookup_near_duplicate(request.txt)
+        if reused is not None:
+            all_results, similarity = reused
+            logger.info(f'分类结果（复用相似度 {similarity:.2f} 的近似重复文本）：{all_results}')
+            return txt_response(all_results, reused=True, similarity=similarity)
+        with stage('/classify/txt', 'classify', 'txt'):
+            all_results = await classify_label_groups(request.txt, labels)
+        result_cache.set(cache_key, all_results)
+        remember_near_duplicate(request.txt, all_results)
         logger.info(f'分类结果：{all_results}')
-        return {"results": all_results}
+        return txt_response(all_results)
+    except InferenceQueueFull:
+        raise
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
 
+def prefilter_label_groups(kind: str, txt: str, label_groups: list) -> Optional[tuple]:
+    """用规则对每个标签组分类，所有标签组都被规则命中时返回 (每组的 [标签, 分数], 命中的层级)，否则为 None"""
+    if prefilter is None:
+        return None
+    results = []
+    for group in label_groups:
+        result = prefilter.classify(kind, txt, group)
+        if result is None:
+            return None
+        results.append(result)
+    tier = 'keyword' if all(result['tier'] == 'keyword' for result in results) else 'regex'
+    return [top_result(result) for result in results], tier
+
+def lookup_near_duplicate(txt: str) -> Optional[tuple]:
+    """查找近似重复的已分类文本，返回 (分类结果, 相似度)，未启用或未找到时为 None"""
+    if txt_dedup is None:
+        return None
+    return txt_dedup.get(txt, result_cache.namespace('txt'))
+
+def remember_near_duplicate(txt: str, results: list):
+    if txt_dedup is not None:
+        txt_dedup.add(txt, results, result_cache.namespace('txt'))
+
+def txt_response(results: list, tier: str = 'model', windows: int = 1, tokens: Optional[int] = None,
+                 truncated: bool = False, reused: bool = False, similarity: Optional[float] = None) -> dict:
+    """文本分类结果，单条与批量接口、长短文本使用相同的字段
+
+    Args:
+        results: 每组得分最高的 [标签, 分数]
+        tier: 给出结果的层级，'keyword'、'regex' 或 'model'
+        windows: 使用的窗口数
+        tokens: 长文本处理的 token 数，未切分窗口的文本为 None
+        truncated: 是否因超出 LONG_TEXT_MAX_TOKENS 被截断
+        reused: 是否复用了近似重复文本的结果
+        similarity: 复用时与已分类文本的相似度
+    """
+    return {
+        "results": results,
+        "windows": windows,
+        "tokens": tokens,
+        "truncated": truncated,
+        "reused": reused,
+        "similarity": round(similarity, 4) if similarity is not None else None,
+        "tier": tier
+    }
+
+def long_txt_cache_key(txt: str) -> str:
+    # 窗口参数会影响结果，需作为缓存键的一部分
+    cache_kind = (f'txt-long:{LONG_TEXT_AGGREGATION}:{LONG_TEXT_WINDOW_TOKENS}:'
+                  f'{LONG_TEXT_OVERLAP_TOKENS}:{LONG_TEXT_MAX_TOKENS}')
+    return result_cache.make_key(cache_kind, txt)
+
+def summarize_long_results(results: list) -> dict:
+    """汇总一条长文本各标签组的窗口分类结果，作为缓存值"""
+    used = [result for result in results if result]
+    return {
+        "results": [top_result(result) for result in results],
+        "windows": max((result['windows'] for result in used), default=0),
+        "tokens": max((result['tokens'] for result in used), default=0),
+        "truncated": any(result['truncated'] for result in used)
+    }
+
+async def classify_long_txt(txt: str, label_groups: list) -> dict:
+    """长文本按 token 窗口切分后分类并聚合，窗口数较多，不经过微批处理调度器而直接提交到文本执行器"""
+    cache_key = long_txt_cache_key(txt)
+    summary = result_cache.get(cache_key)
+    if summary is None:
+        results = await txt_executor.run(
+            classifier.classify_long_many, [(txt, group) for group in label_groups]
+        )
+        summary = summarize_long_results(results)
+        result_cache.set(cache_key, summary)
+    response = txt_response(**summary)
+    logger.info(f'长文本分类结果：{response}')
+    return response
+
+def iter_batch_texts(payload):
+    """逐条解析批量请求中的文本，元素可以是字符串或 {"txt": ...}
+
+    生成 (文本, 错误信息)，解析失败的元素文本为 None
+    """
+    for item in payload:
+        if isinstance(item, dict):
+            item = item.get('txt')
+        if isinstance(item, str):
+            yield item, None
+        else:
+            yield None, '无法解析的文本'
+
+def iter_ndjson(stream):
+    """逐行解析 NDJSON，跳过空行"""
+    for line in stream:
+        line = line.strip()
+        if not line:
+            continue
+        try:
+            yield json.loads(line)
+        except ValueError:
+            yield None
+
+async def stream_batch_results(texts, label_groups: list):
+    """按输入顺序分块分类并逐行输出 NDJSON
+
+    第一块推理队列已满时抛出 InferenceQueueFull（此时尚未开始响应，由异常处理返回 503）；
+    之后的块队列已满时，该块每行输出 error 和建议的重试等待秒数 retry_after。
+    """
+    index = 0
+    chunk = []
+    first = True
+
+    async def flush(chunk):
+        cached = {}
+        reused = {}
+        ruled = {}
+        # 超过单个窗口的长文本与单条接口一样按窗口分类，使用相同的缓存
+        long_cached = {}
+        lookup_started = time.perf_counter()
+        for position, text, error in chunk:
+            if error or not text or not text.strip():
+                continue
+            if LONG_TEXT_ENABLED and classifier.may_need_windows(text, label_groups):
+                cache_key = long_txt_cache_key(text)
+                long_cached[position] = (cache_key, result_cache.get(cache_key))
+                continue
+            rule_result = prefilter_label_groups('txt', text, label_groups)
+            if rule_result is not None:
+                ruled[position] = rule_result
+                continue
+            cache_key = result_cache.make_key('txt', text)
+            cached[position] = (cache_key, result_cache.get(cache_key))
+            if cached[position][1] is None:
+                duplicate = lookup_near_duplicate(text)
+                if duplicate is not None:
+                    reused[position] = duplicate
+                    cached[position] = (cache_key, duplicate[0])
+        request_stage_seconds.labels('/classify/txt/batch', 'lookup', 'txt').observe(
+            time.perf_counter() - lookup_started
+        )
+        items = [
+            (text, group) for position, text, _ in chunk
+            if position in cached and cached[position][1] is None for group in label_groups
+        ]
+        long_items = [
+            (text, group) for position, text, _ in chunk
+            if position in long_cached and long_cached[position][1] is None for group in label_groups
+        ]
+
+        def classify_chunk():
+            return (classifier.classify_many(items) if items else [],
+                    classifier.classify_long_many(long_items) if long_items else [])
+
+        retry_after = None
+        try:
+            with stage('/classify/txt/batch', 'classify', 'txt'):
+                short_results, long_results = (
+                    await txt_executor.run(classify_chunk) if items or long_items else ([], [])
+                )
+            results, long_results = iter(short_results), iter(long_results)
+            failure = None
+        except InferenceQueueFull as e:
+            if first:
+                raise
+            logger.warning(f'批量分类第 {chunk[0][0]} 条起推理队列已满')
+            failure = str(e)
+            retry_after = e.retry_after
+        except Exception as e:
+            logger.error(f'批量分类错误：{str(e)}')
+            failure = str(e)
+        lines = []
+        for position, text, error in chunk:
+            record = {"index": position}
+            if position in ruled:
+                record.update(txt_response(*ruled[position]))
+            elif position in long_cached and long_cached[position][1] is not None:
+                record.update(txt_response(**long_cached[position][1]))
+            elif position in cached and cached[position][1] is not None:
+                similarity = reused[position][1] if position in reused else None
+                record.update(txt_response(cached[position][1], reused=position in reused, similarity=similarity))
+            elif error:
+                record["error"] = error
+            elif (position in cached or position in long_cached) and failure:
+                # 只有需要推理的条目受推理失败影响
+                record["error"] = failure
+                if retry_after is not None:
+                    record["retry_after"] = retry_after
+            elif position in long_cached:
+                summary = summarize_long_results([next(long_results) for _ in label_groups])
+                result_cache.set(long_cached[position][0], summary)
+                record.update(txt_response(**summary))
+            elif position in cached:
+                record.update(txt_response([top_result(next(results)) for _ in label_groups]))
+                result_cache.set(cached[position][0], record["results"])
+                remember_near_duplicate(text, record["results"])
+            else:
+                record["results"] = []
+            lines.append(json.dumps(record, ensure_ascii=False) + '\n')
+        return ''.join(lines)
+
+    for text, error in texts:
+        chunk.append((index, text, error))
+        index += 1
+        if len(chunk) >= TXT_BATCH_CHUNK_SIZE:
+            yield await flush(chunk)
+            chunk = []
+            first = False
+    if chunk:
+        yield await flush(chunk)
+    logger.info(f'批量分类完成，共 {index} 条')
+
+async def start_batch_stream(lines):
+    """在返回响应前先取出第一块结果，使第一块的推理队列已满等错误仍能以状态码返回"""
+    try:
+        head = await lines.__anext__()
+    except StopAsyncIteration:
+        head = ''
+
+    async def body():
+        if head:
+            yield head
+        async for line in lines:
+            yield line
+
+    return body()
+
+@app.post("/classify/txt/batch")
+async def classify_txt_batch(request: Request):
+    """批量文本分类，按输入顺序以 NDJSON 流式返回每条文本的结果
+
+    请求体可以是 JSON 字符串数组、{"txts": [...]}、NDJSON（application/x-ndjson），
+    也可以用 multipart 上传 NDJSON 文件（字段名 file）。
+    每行结果为 {"index": 序号, "results": [[标签, 分数], ...]}，解析或推理失败时为 {"index": 序号, "error": 原因}。
+    第一块推理队列已满时返回 503 和 Retry-After；之后的块队列已满时错误行附带 retry_after（秒）。
+    """
+    models.require('txt')
+    label_groups = default_labels.get('txt', [])
+    content_type = request.headers.get('content-type', '')
+    if content_type.startswith('multipart/form-data'):
+        form = await request.form()
+        upload = form.get('file')
+        if upload is None or isinstance(upload, str):
+            raise HTTPException(status_code=400, detail='缺少上传文件字段：file')
+        texts = iter_batch_texts(iter_ndjson(upload.file))
+    elif 'ndjson' in content_type or 'jsonlines' in content_type:
+        body = await request.body()
+        texts = iter_batch_texts(iter_ndjson(io.BytesIO(body)))
+    else:
+        try:
+            payload = await request.json()
+        except ValueError:
+            raise HTTPException(status_code=400, detail='请求体不是合法的 JSON')
+        if isinstance(payload, dict):
+            payload = payload.get('txts')
+        if not isinstance(payload, list):
+            raise HTTPException(status_code=400, detail='请求体应为文本数组或 {"txts": [...]}')
+        texts = iter_batch_texts(payload)
+    body = await start_batch_stream(stream_batch_results(texts, label_groups))
+    return StreamingResponse(body, media_type='application/x-ndjson')
+
+def progressive_windows(window: float) -> Iterator[Tuple[float, int]]:
+    """渐进模式的窗口序列
+
+    首个窗口为 window 秒，之后每个窗口翻倍，直到一批 AUDIO_BATCH_SIZE 个片段能覆盖的时长，
+    早期窗口保留尽早结束的机会，后续窗口恢复整批识别。
+
+    Returns:
+        Iterator[Tuple[float, int]]: 每个窗口的时长（秒）和覆盖该窗口所需的片段数
+    """
+    limit = max(window, AUDIO_BATCH_SIZE * AUDIO_CHUNK_SECONDS)
+    span = window
+    while True:
+        span = min(span, limit)
+        yield span, min(max(1, math.ceil(span / AUDIO_CHUNK_SECONDS)), max(1, AUDIO_BATCH_SIZE))
+        span *= 2
+
+async def classify_audio_progressive(audio_content: bytes, label_groups: list) -> dict:
+    """渐进式音频分类
+
+    每转录一个窗口（首个窗口为 AUDIO_EARLY_EXIT_WINDOW_SECONDS 秒，之后逐个翻倍）就对目前的转录文本分类一次，
+    所有标签组的最高分领先第二名达到 AUDIO_EARLY_EXIT_MARGIN 时停止，否则扩大窗口继续转录。
+    关闭渐进模式时转录整段音频（至多 AUDIO_TRANSCRIPT_MAX_CHARS 字符）后分类一次。
+
+    Returns:
+        dict: results 为每组得分最高的 [标签, 分数]，audio 为已处理的音频时长、总时长（未知时为 None）等
+    """
+    if AUDIO_EARLY_EXIT:
+        window = max(AUDIO_EARLY_EXIT_WINDOW_SECONDS, 1.0)
+        # 识别端与分类端按同一窗口序列推进，每批识别的片段恰好覆盖一个窗口
+        spans = (span for span, _ in progressive_windows(window))
+        batch_size = (size for _, size in progressive_windows(window))
+    else:
+        spans = itertools.repeat(float('inf'))
+        batch_size = AUDIO_BATCH_SIZE
+    segments = audio_recognizer.transcribe_stream(audio_content, batch_size=batch_size)
+    texts = []
+    consumed = 0.0
+    windows = 0
+    early_exit = False
+    results = []
+    # 转录与分类在各窗口间交替进行，按请求累计两者的耗时
+    elapsed = {'transcribe': 0.0, 'classify': 0.0}
+    try:
+        until = next(spans)
+        while True:
+            started = time.perf_counter()
+            taken, exhausted = await audio_executor.run(take_segments, segments, until)
+            elapsed['transcribe'] += time.perf_counter() - started
+            texts.extend(segment['text'] for segment in taken)
+            if taken:
+                consumed = taken[-1]['end']
+            transcription = ''.join(texts)
+            if AUDIO_TRANSCRIPT_MAX_CHARS and len(transcription) >= AUDIO_TRANSCRIPT_MAX_CHARS:
+                transcription = transcription[:AUDIO_TRANSCRIPT_MAX_CHARS]
+                exhausted = True
+            if taken or windows == 0:
+                windows += 1
+                started = time.perf_counter()
+                results = await classify_groups(transcription, label_groups)
+                elapsed['classify'] += time.perf_counter() - started
+            if exhausted:
+                break
+            if AUDIO_EARLY_EXIT and is_confident(results, AUDIO_EARLY_EXIT_MARGIN):
+                early_exit = True
+                break
+            until = consumed + next(spans)
+    finally:
+        try:
+            # 结束 ffmpeg 解码进程等资源
+            segments.close()
+        except ValueError:
+            pass
+        for name, seconds in elapsed.items():
+            request_stage_seconds.labels('/classify/audio', name, 'audio').observe(seconds)
+    total = audio_duration(audio_content)
+    logger.info(f'音频分类处理 {consumed:.1f} 秒音频，共 {windows} 个窗口，提前结束：{early_exit}')
+    return {
+        "results": [top_result(result) for result in results],
+        "audio": {
+            "consumed_seconds": round(consumed, 2),
+            "total_seconds": round(total, 2) if total is not None else None,
+            "windows": windows,
+            "early_exit": early_exit
+        }
+    }
+
+def audio_cache_kind() -> str:
+    """音频结果的缓存类型：转录文本长度上限、切分与语音活动检测、渐进模式的参数都会影响结果，需作为缓存键的一部分"""
+    parts = [f'chars={AUDIO_TRANSCRIPT_MAX_CHARS}', f'chunk={AUDIO_CHUNK_SECONDS}']
+    if AUDIO_VAD:
+        # 底噪按解码块估计，块时长也会影响检测结果
+        parts.append(f'vad={AUDIO_VAD_FRAME_MS}:{AUDIO_VAD_THRESHOLD_DB}:{AUDIO_VAD_MIN_SPEECH_MS}:'
+                     f'{AUDIO_VAD_MIN_SILENCE_MS}:{AUDIO_VAD_PAD_MS}:{AUDIO_BLOCK_SECONDS}')
+    else:
+        parts.append('vad=off')
+    if AUDIO_EARLY_EXIT:
+        # 窗口序列取决于每批片段数，批大小也会影响在何处提前结束
+        parts.append(f'early={AUDIO_EARLY_EXIT_WINDOW_SECONDS}:{AUDIO_EARLY_EXIT_MARGIN}:{AUDIO_BATCH_SIZE}')
+    else:
+        parts.append('full')
+    return 'audio:' + ':'.join(parts)
+
 @app.post("/classify/audio")
 async def classify_audio(audio: UploadFile = File(...)):
+    models.require('audio', 'txt')
     try:
         label_groups = default_labels.get('audio', [])
         if not label_groups:
             return {"results": []}
-        audio_content = await audio.read()
-        with tempfile.NamedTemporaryFile(delete=False, suffix=f".{audio.filename.split('.')[-1]}") as temp_audio:
-            temp_audio.write(audio_content)
-            temp_audio_path = temp_audio.name
-        try:
-            transcription = audio_recognizer.transcribe(temp_audio_path)
-            all_results = []
-            for label_group in label_groups:
-                if not label_group:
-                    all_results.append([])
-                    continue
-                result = classifier.classify(
-                    sequence=transcription,
-                    labels=label_group
-                )
-                if result['labels'] and result['scores']:
-                    all_results.append([result['labels'][0], result['scores'][0]])
-                else:
-                    all_results.append([])
-            logger.info(f'音频分类结果：{all_results}')
-            return {"results": all_results}
-        except Exception as e:
-            raise HTTPException(status_code=500, detail=str(e))
-        finally:
-            if os.path.exists(temp_audio_path):
-                os.remove(temp_audio_path)
+        with stage('/classify/audio', 'read', 'audio'):
+            audio_content = await audio.read()
+        cache_key = result_cache.make_key(audio_cache_kind(), audio_content)
+        response = result_cache.get(cache_key)
+        if response is not None:
+            logger.info(f'音频分类结果（缓存）：{response}')
+            return response
+        # 音频在内存中逐块解码，丢弃静音后分批识别；分类结果确定后不再解码后续音频
+        response = await classify_audio_progressive(audio_content, label_groups)
+        result_cache.set(cache_key, response)
+        logger.info(f'音频分类结果：{response}')
+        return response
+    except (HTTPException, InferenceQueueFull):
+        raise
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
 
+def image_cache_kind() -> str:
+    """图像结果的缓存类型：单张与批量接口使用相同的描述长度，描述长度影响结果，需作为缓存键的一部分"""
+    return f'image:{IMAGE_CAPTION_MAX_LENGTH}'
+
 @app.post("/classify/image")
 async def classify_image(image: UploadFile = File(...)):
+    models.require('image', 'txt')
     try:
         label_groups = default_labels.get('image', [])
         if not label_groups:
             return {"results": []}
-        image_content = await image.read()
-        img = Image.open(BytesIO(image_content)).convert('RGB')
-        all_results = []
-        for label_group in label_groups:
-            if not label_group:
-                all_results.append([])
-                continue
-            description = image_recognizer.recognize(img)
-            # 用图片描述进行文本分类
-            result = classifier.classify(
-                sequence=description,
-                labels=label_group
-            )
-            if result['labels'] and result['scores']:
-                all_results.append([result['labels'][0], result['scores'][0]])
-            else:
-                all_results.append([])
+        with stage('/classify/image', 'read', 'image'):
+            image_content = await image.read()
+        cache_key = result_cache.make_key(image_cache_kind(), image_content)
+        cached_results = result_cache.get(cache_key)
+        if cached_results is not None:
+            logger.info(f'图像分类结果（缓存）：{cached_results}')
+            return {"results": cached_results}
+        # 图片只生成一次描述，再用描述对所有标签组进行文本分类
+        with stage('/classify/image', 'caption', 'image'):
+            description = await image_executor.run(image_recognizer.recognize, image_content)
+        with stage('/classify/image', 'classify', 'image'):
+            all_results = await classify_label_groups(description, label_groups)
+        result_cache.set(cache_key, all_results)
         logger.info(f'图像分类结果：{all_results}')
         return {"results": all_results}
+    except InferenceQueueFull:
+        raise
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
 
+IMAGE_EXTENSIONS = ('.jpg', '.jpeg', '.png', '.bmp', '.gif', '.webp', '.tif', '.tiff')
+
+def iter_archive_images(archive):
+    """逐个读取 zip 压缩包中的图片，生成 (文件名, 内容, 错误信息)"""
+    with zipfile.ZipFile(archive) as zf:
+        for info in zf.infolist():
+            if info.is_dir() or not info.filename.lower().endswith(IMAGE_EXTENSIONS):
+                continue
+            if info.file_size > IMAGE_BATCH_MAX_FILE_BYTES:
+                yield info.filename, None, '图片文件过大'
+                continue
+            yield info.filename, zf.read(info), None
+
+async def stream_image_batch_results(images, label_groups: list):
+    """按输入顺序分块生成图片描述、分类，并逐行输出 NDJSON"""
+    index = 0
+    chunk = []
+
+    async def describe(contents):
+        try:
+            return await image_executor.run(image_recognizer.recognize_batch, contents), [None] * len(contents)
+        except Exception as e:
+            # 整批失败时逐张重试，定位无法识别的图片
+            logger.error(f'批量图像识别错误：{str(e)}')
+        descriptions, errors = [], []
+        for content in contents:
+            try:
+                descriptions.append(await image_executor.run(image_recognizer.recognize, content))
+                errors.append(None)
+            except Exception as e:
+                descriptions.append(None)
+                errors.append(str(e))
+        return descriptions, errors
+
+    async def flush(chunk):
+        records = {}
+        pending = []
+        for position, filename, content, error in chunk:
+            records[position] = {"index": position, "filename": filename}
+            if error:
+                records[position]["error"] = error
+                continue
+            cache_key = result_cache.make_key(image_cache_kind(), content)
+            cached_results = result_cache.get(cache_key)
+            if cached_results is not None:
+                records[position]["results"] = cached_results
+            else:
+                pending.append((position, content, cache_key))
+
+        if pending:
+            with stage('/classify/image/batch', 'caption', 'image'):
+                descriptions, errors = await describe([content for _, content, _ in pending])
+            described = []
+            for (position, _, cache_key), description, error in zip(pending, descriptions, errors):
+                if error:
+                    records[position]["error"] = error
+                else:
+                    described.append((position, description, cache_key))
+            items = [(description, group) for _, description, _ in described for group in label_groups]
+            try:
+                with stage('/classify/image/batch', 'classify', 'image'):
+                    results = iter(await txt_executor.run(classifier.classify_many, items)) if items else iter([])
+                for position, _, cache_key in described:
+                    records[position]["results"] = [top_result(next(results)) for _ in label_groups]
+                    result_cache.set(cache_key, records[position]["results"])
+            except Exception as e:
+                logger.error(f'批量分类错误：{str(e)}')
+                for position, _, _ in described:
+                    records[position]["error"] = str(e)
+        return ''.join(json.dumps(records[position], ensure_ascii=False) + '\n' for position, _, _, _ in chunk)
+
+    async for filename, content, error in images:
+        chunk.append((index, filename, content, error))
+        index += 1
+        if len(chunk) >= IMAGE_BATCH_SIZE:
+            yield await flush(chunk)
+            chunk = []
+    if chunk:
+        yield await flush(chunk)
+    logger.info(f'批量图像分类完成，共 {index} 张')
+
+@app.post("/classify/image/batch")
+async def classify_image_batch(request: Request):
+    """批量图像分类，按输入顺序以 NDJSON 流式返回每张图片的结果
+
+    以 multipart 上传多个图片文件（字段名 images），或 zip 压缩包（字段名 archive）。
+    每行结果为 {"index": 序号, "filename": 文件名, "results": [[标签, 分数], ...]}，失败时为 "error"。
+    """
+    models.require('image', 'txt')
+    if not request.headers.get('content-type', '').startswith('multipart/form-data'):
+        raise HTTPException(status_code=400, detail='请以 multipart/form-data 上传图片或 zip 压缩包')
+    # 上传文件在流式响应结束前保持打开，逐个读取，不一次性载入内存
+    form = await request.form(max_files=IMAGE_BATCH_MAX_FILES)
+    uploads = [upload for upload in form.getlist('images') if not isinstance(upload, str)]
+    archive = form.get('archive')
+    if isinstance(archive, str):
+        archive = None
+    if not uploads and archive is None:
+        raise HTTPException(status_code=400, detail='请上传图片文件（images）或 zip 压缩包（archive）')
+    label_groups = default_labels.get('image', [])
+
+    async def iter_images():
+        for upload in uploads:
+            yield upload.filename, await upload.read(), None
+        if archive is not None:
+            if not zipfile.is_zipfile(archive.file):
+                yield archive.filename, None, '不是合法的 zip 压缩包'
+                return
+            archive.file.seek(0)
+            for item in iter_archive_images(archive.file):
+                yield item
+
+    return StreamingResponse(stream_image_batch_results(iter_images(), label_groups),
+                             media_type='application/x-ndjson')
+
 @app.post("/classify/csv")
-async def classify_csv(csv_file: UploadFile = File(...)):
+async def classify_csv(csv_file: UploadFile = File(...), per_column: bool = Form(False),
+                       sample_rows: int = Form(CSV_SAMPLE_ROWS)):
+    """CSV 分类：按表名和表头分类；per_column 为真时额外对每一列（列名加采样值）分类
+
+    只读取表头和所需的前几行，自动识别 UTF-8、UTF-8 BOM 和 GBK 编码
+    """
+    models.require('txt')
     try:
         label_groups = default_labels.get('csv', default_labels.get('txt', []))
         if not label_groups:
             return {"results": []}
-            
-        # 读取CSV文件内容
-        csv_content = await csv_file.read()
-        csv_text = csv_content.decode('utf-8')
-        
-        # 使用CSV模块解析CSV内容
-        csv_reader = csv.reader(io.StringIO(csv_text))
-        
-        # 提取表头（第一行）
-        headers = next(csv_reader, [])
+
+        # 只读取表头（按列分类时再读取前几行采样值），不读取整个文件
+        sample_rows = min(max(0, sample_rows), CSV_MAX_SAMPLE_ROWS) if per_column else 0
+        with stage('/classify/csv', 'decode', 'csv'):
+            headers, rows, encoding = read_csv_head(csv_file.file, sample_rows)
         
         if not headers:
             return {"results": []}
         
         # 将表头合并成一个字符串
         header_text = ", ".join(headers)
-        logger.info(f'CSV表头：{header_text}')
+        logger.info(f'CSV表头（{encoding}）：{header_text}')
         #将表名也合并到header_text
-        header_text = f'表名：{csv_file.filename.split(".")[0]}，表头：{header_text}'
+        table_name = csv_file.filename.split(".")[0]
+        header_text = f'表名：{table_name}，表头：{header_text}'
 
-        # 使用合并后的表头文本进行分类
-        all_results = []
-        for label_group in label_groups:
-            if not label_group:
-                all_results.append([])
-                continue
-                
-            result = classifier.classify(
-                sequence=header_text,
-                labels=label_group
-            )
-            
-            if result['labels'] and result['scores']:
-                all_results.append([result['labels'][0], result['scores'][0]])
-            else:
-                all_results.append([])
-                
+        # 使用合并后的表头文本进行分类，表名和表头相同的文件共用缓存结果
+        with stage('/classify/csv', 'prefilter', 'csv'):
+            ruled = prefilter_label_groups('csv', header_text, label_groups)
+        if ruled is not None:
+            all_results = ruled[0]
+        else:
+            cache_key = result_cache.make_key('csv', header_text)
+            all_results = result_cache.get(cache_key)
+            if all_results is None:
+                with stage('/classify/csv', 'classify', 'csv'):
+                    all_results = await classify_label_groups(header_text, label_groups)
+                result_cache.set(cache_key, all_results)
         logger.info(f'CSV分类结果：{all_results}')
-        return {"results": all_results}
+        if not per_column:
+            return {"results": all_results}
+
+        # 按列分类：所有列、所有标签组合并为一次批量推理
+        column_texts = build_column_texts(table_name, headers, column_samples(headers, rows))
+        columns_key = result_cache.make_key('csv_columns', '\n'.join(column_texts))
+        columns = result_cache.get(columns_key)
+        if columns is None:
+            # 列名命中规则的列不再送入模型
+            ruled_columns = [prefilter_label_groups('csv', header, label_groups) for header in headers]
+            items = [
+                (text, group) for text, ruled in zip(column_texts, ruled_columns) if ruled is None
+                for group in label_groups
+            ]
+            with stage('/classify/csv', 'classify_columns', 'csv'):
+                results = iter(await txt_executor.run(classifier.classify_many, items) if items else [])
+            columns = [
+                {"column": header,
+                 "results": ruled[0] if ruled is not None else [top_result(next(results)) for _ in label_groups]}
+                for header, ruled in zip(headers, ruled_columns)
+            ]
+            result_cache.set(columns_key, columns)
+        logger.info(f'CSV按列分类结果：{columns}')
+        return {"results": all_results, "columns": columns}
+    except InferenceQueueFull:
+        raise
     except Exception as e:
         logger.error(f'CSV分类错误：{str(e)}')
         raise HTTPException(status_code=500, detail=str(e))
 
+@app.post("/scan/table")
+async def scan_table(table_file: UploadFile = File(...)):
+    """大表格扫描：流式读取 CSV/TSV/Parquet/Excel，按列采样值检测敏感数据
+
+    正则与校验位检测器无法确定的列，再用列名和采样值交给模型分类
+    """
+    models.require('txt')
+    try:
+        try:
+            fmt = detect_format(table_file.filename or '')
+        except ValueError as e:
+            raise HTTPException(status_code=400, detail=str(e))
+        table_name = os.path.splitext(os.path.basename(table_file.filename))[0]
+        with stage('/scan/table', 'decode', 'table'):
+            profile = await scan_executor.run(table_scanner.profile, table_file.file, fmt, table_name)
+        results = []
+        if profile['texts']:
+            items = [(text, table_scanner.labels) for text in profile['texts']]
+            with stage('/scan/table', 'classify', 'table'):
+                results = await txt_executor.run(classifier.classify_many, items)
+        result = table_scanner.apply_model_results(profile, results)
+        logger.info(f'表格扫描完成：{table_name}，{result["rows"]} 行，模型分类 {len(results)} 列')
+        return result
+    except (HTTPException, InferenceQueueFull):
+        raise
+    except Exception as e:
+        logger.error(f'表格扫描错误：{str(e)}')
+        raise HTTPException(status_code=500, detail=str(e))
+
 @app.post("/security/level")
 async def get_security_level(request: SecurityLevelRequest):
     """根据类别和安全级别获取对应的级别值"""
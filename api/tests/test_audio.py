@@ -25,5 +25,19 @@ class TestAudioClassificationAPI(unittest.TestCase):
             self.assertGreaterEqual(score, 0.0)
             self.assertLessEqual(score, 1.0)
 
+    def test_classify_audio_reports_consumed_audio(self):
+        """测试音频分类接口返回已处理的音频时长"""
+        with open(self.audio_path, 'rb') as f:
+            files = {'audio': (os.path.basename(self.audio_path), f, 'audio/wav')}
+            response = requests.post(self.classify_audio_url, files=files)
+        self.assertEqual(response.status_code, 200)
+        audio = response.json()["audio"]
+        self.assertIn("early_exit", audio)
+        self.assertGreaterEqual(audio["windows"], 1)
+        self.assertAlmostEqual(audio["total_seconds"], 47.6, delta=0.1)
+        self.assertGreaterEqual(audio["consumed_seconds"], 0.0)
+        self.assertLessEqual(audio["consumed_seconds"], audio["total_seconds"])
+        print("音频处理情况:", audio)
+
 if __name__ == '__main__':
     unittest.main()
\ No newline at end of file
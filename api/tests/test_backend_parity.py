@@ -0,0 +1,70 @@
+import os
+import unittest
+
+from tools.classifier.backends import default_onnx_path
+from tools.classifier.classifier import model_path
+from tools.default_labels import text_labels
+
+# 固定的测试文本，覆盖常见的文本标签
+FIXTURE_SEQUENCES = [
+    '请提供您的身份证号码和户籍所在地',
+    '本季度营业收入同比增长12%，净利润率保持稳定',
+    '数据库连接串：host=10.0.0.1 user=admin password=******',
+    '患者主诉头痛三天，既往有高血压病史',
+    '客户张三，手机号13800138000，住址北京市朝阳区',
+    '本合同自双方签字盖章之日起生效，有效期三年',
+    '新员工入职培训安排在下周一上午九点',
+    '服务器 CPU 使用率持续超过 90%，请检查进程',
+]
+# fp32 模型前两名的分数差小于该值时视为并列，量化误差可能改变排序，不参与比较
+TIE_MARGIN = 0.05
+
+
+@unittest.skipUnless(os.path.exists(model_path), f'分类模型不存在：{model_path}')
+class TestBackendParity(unittest.TestCase):
+    @classmethod
+    def setUpClass(cls):
+        from tools.classifier.classifier import txtClassifier
+
+        cls.txtClassifier = txtClassifier
+        cls.classifier = txtClassifier(backend='pytorch')
+        cls.reference = cls.classifier.classify_batch(FIXTURE_SEQUENCES, text_labels)
+
+    def assert_top_label_parity(self, classifier):
+        results = classifier.classify_batch(FIXTURE_SEQUENCES, text_labels)
+        compared = 0
+        for reference, result in zip(self.reference, results):
+            if reference['scores'][0] - reference['scores'][1] < TIE_MARGIN:
+                continue
+            compared += 1
+            self.assertEqual(result['labels'][0], reference['labels'][0], reference['sequence'])
+        # 所有样例都接近平局时没有比较任何标签，不能视为通过
+        self.assertGreater(compared, 0)
+        print(f'{classifier.backend} 后端：比较 {compared} 条，top1 与 fp32 一致')
+
+    def test_int8_parity(self):
+        """测试 INT8 动态量化后端与 fp32 模型的 top1 标签一致"""
+        self.assert_top_label_parity(self.txtClassifier(backend='int8'))
+
+    def test_onnx_parity(self):
+        """测试 ONNX Runtime 后端与 fp32 模型的 top1 标签一致"""
+        try:
+            import onnxruntime  # noqa: F401
+        except ImportError:
+            self.skipTest('未安装 onnxruntime')
+        if not os.path.exists(default_onnx_path(model_path)):
+            self.skipTest('ONNX 模型不存在，请先运行 python model/export_onnx.py')
+        self.assert_top_label_parity(self.txtClassifier(backend='onnx'))
+
+    def test_classify_multi_parity(self):
+        """测试多标签组单次前向计算与逐组分类的结果一致，含有共同标签的标签组也分别归一化"""
+        label_groups = [text_labels, text_labels[:5], text_labels[3:8]]
+        for sequence in FIXTURE_SEQUENCES:
+            results = self.classifier.classify_multi(sequence, label_groups)
+            for labels, (label, score) in zip(label_groups, results):
+                expected = self.classifier.classify(sequence, labels)
+                self.assertEqual(label, expected['labels'][0], sequence)
+                self.assertAlmostEqual(score, expected['scores'][0], places=4)
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,110 @@
+import os
+import unittest
+
+from tools.classifier.cascade import NgramLabelScorer, recall_at_k
+from tools.default_labels import table_data_labels
+
+# 固定的表格样本（表名与表头）及人工标注的标签，覆盖常见的表格数据标签
+FIXTURE_SAMPLES = [
+    ('表名：user_info，表头：姓名, 性别, 出生日期, 手机号, 邮箱', '个人基本资料'),
+    ('表名：实名认证，表头：用户ID, 证件类型, 证件号码, 户籍地址', '个人身份信息'),
+    ('表名：体检记录，表头：姓名, 身高, 体重, 血型, 过敏史, 诊断结论', '个人健康生理信息'),
+    ('表名：员工档案，表头：工号, 姓名, 学历, 毕业院校, 职称', '个人教育工作信息'),
+    ('表名：客户资产，表头：客户号, 银行卡号, 账户余额, 房产数量', '个人财产信息'),
+    ('表名：通话详单，表头：主叫号码, 被叫号码, 通话时长, 通话时间', '个人通信信息'),
+    ('表名：紧急联系人，表头：用户ID, 联系人姓名, 关系, 联系人电话', '联系人信息'),
+    ('表名：访问日志，表头：用户ID, 访问网址, 搜索记录, 访问时间', '个人上网记录'),
+    ('表名：终端信息，表头：设备号, IMEI, MAC地址, 设备型号, 操作系统', '个人常用设备信息'),
+    ('表名：定位记录，表头：用户ID, 经度, 纬度, 定位时间', '个人位置信息'),
+    ('表名：贷款台账，表头：贷款编号, 放款金额, 利率, 网点, 还款状态', '银行业务数据'),
+    ('表名：持仓明细，表头：股东账号, 证券代码, 持仓数量, 成交价格', '证券业务数据'),
+    ('表名：保单信息，表头：保单号, 投保人, 被保险人, 险种, 保费', '保险业务数据'),
+    ('表名：支付流水，表头：交易号, 钱包账户, 支付渠道, 风控结果', '金融科技业务数据'),
+    ('表名：信托合同，表头：信托计划, 受益人, 信托金额, 期限', '信托与租赁业务数据'),
+    ('表名：投资项目，表头：项目名称, 融资轮次, 估值, 投资金额', '风险投资与私募股权数据'),
+    ('表名：案件登记，表头：案件编号, 案由, 嫌疑人, 立案日期', '公安司法数据'),
+    ('表名：企业登记，表头：企业名称, 统一社会信用代码, 注册资本, 登记机关', '市场监管数据'),
+    ('表名：纳税申报，表头：纳税人识别号, 税种, 申报税额, 申报期', '税务财政数据'),
+    ('表名：参保信息，表头：姓名, 社保号, 参保类型, 缴费基数', '民政社保数据'),
+    ('表名：疫苗接种，表头：接种人, 疫苗名称, 接种日期, 接种单位', '卫生健康数据'),
+    ('表名：学生成绩，表头：学号, 姓名, 班级, 考试科目, 成绩', '教育科研数据'),
+    ('表名：水质监测，表头：监测点, 监测时间, 水质等级, 污染物浓度', '自然资源与环保数据'),
+    ('表名：市政设施，表头：设施编号, 井盖位置, 路灯状态, 巡查时间', '城市管理数据'),
+    ('表名：事故台账，表头：事故编号, 灾害类型, 救援人数, 隐患等级', '应急管理数据'),
+    ('表名：人口普查，表头：地区, 统计指标, 人口数, 统计年份', '国家统计'),
+    ('表名：晶圆测试，表头：晶圆编号, 芯片型号, 良率, 封装批次', '电子与半导体数据'),
+    ('表名：机床工单，表头：工单号, 设备编号, 生产线, 工艺路线', '重工与装备制造数据'),
+    ('表名：原料配方，表头：配方编号, 原料名称, 纯度, 危化品类别', '化工与新材料数据'),
+    ('表名：采矿产量，表头：矿区, 矿石品位, 产量, 日期', '原材料与采矿数据'),
+    ('表名：整车下线，表头：VIN, 车型, 发动机号, 总装日期', '整车研发与制造数据'),
+    ('表名：经销订单，表头：经销商, 渠道, 销量, 提货日期', '销售与分销数据'),
+    ('表名：维修记录，表头：维修工单, 车牌号, 里程, 更换配件', '汽车售后市场数据'),
+    ('表名：车载数据，表头：车辆ID, 车速, 雷达信号, 自动驾驶状态', '车联网与智能驾驶数据'),
+    ('表名：购票记录，表头：乘客姓名, 车次, 座位号, 乘车日期', '客运服务数据'),
+    ('表名：快递运单，表头：运单号, 寄件人, 收件人, 包裹重量', '货运与物流数据'),
+    ('表名：库存台账，表头：仓库, 库位, 入库数量, 出库数量', '仓储服务数据'),
+    ('表名：网约车订单，表头：订单号, 司机, 上车点, 下车点', '出行服务数据'),
+    ('表名：用电档案，表头：户号, 电表编号, 用电量, 电费', '电力行业数据'),
+    ('表名：油井生产，表头：油井编号, 原油产量, 天然气产量', '石油天然气数据'),
+    ('表名：用水账单，表头：水表编号, 用水量, 水费', '水务行业数据'),
+    ('表名：光伏电站，表头：电站编号, 发电量, 储能容量', '新能源数据'),
+    ('表名：商城订单，表头：订单号, 商品sku, 买家, 收货地址, 店铺', '线上电商数据'),
+    ('表名：门店销售，表头：门店, 收银员, 小票号, 会员卡号', '线下零售数据'),
+    ('表名：挂号记录，表头：门诊号, 科室, 医生, 挂号时间', '医疗机构数据'),
+    ('表名：临床试验，表头：受试者编号, 药品批号, 试验阶段', '生命科学与制药数据'),
+    ('表名：房源信息，表头：楼盘, 房号, 户型, 面积, 售价', '地产开发与销售数据'),
+    ('表名：物业缴费，表头：业主, 房号, 物业费, 停车位', '物业管理数据'),
+    ('表名：玩家充值，表头：玩家账号, 角色, 充值金额, 道具', '游戏产业数据'),
+    ('表名：入住登记，表头：宾客姓名, 房间号, 入住时间, 退房时间', '酒店住宿数据'),
+    ('表名：外卖订单，表头：菜品, 桌号, 餐厅, 下单时间', '餐饮行业数据'),
+    ('表名：景区票务，表头：游客姓名, 景区, 门票类型, 导游', '旅游服务数据'),
+    ('表名：员工薪资，表头：工号, 部门, 薪资, 考勤, 绩效', '人力资源数据'),
+    # 用词与标签描述不同的样本
+    ('表名：t_customer，表头：cust_name, gender, birthday, mobile', '个人基本资料'),
+    ('表名：会员表，表头：昵称, 生日, 所在城市, 注册时间', '个人基本资料'),
+    ('表名：就诊信息，表头：患者姓名, 主诉, 既往史, 用药情况', '个人健康生理信息'),
+    ('表名：理财客户，表头：客户姓名, 理财产品, 持有份额, 到期日', '个人财产信息'),
+    ('表名：航班旅客，表头：旅客姓名, 航班号, 舱位, 登机口', '客运服务数据'),
+    ('表名：招聘简历，表头：应聘岗位, 期望薪资, 工作年限, 面试结果', '人力资源数据'),
+    ('表名：销售小票，表头：商品条码, 数量, 单价, 收银台', '线下零售数据'),
+    ('表名：赛事报名，表头：参赛者, 项目, 成绩, 名次', '体育产业数据'),
+    ('表名：节目单，表头：节目名称, 频道, 播出时间, 收视率', '广播影视与流媒体数据'),
+    ('表名：生猪养殖，表头：猪舍编号, 存栏头数, 出栏头数, 饲料用量', '畜牧业数据'),
+]
+# 级联初筛需要达到的召回率：期望标签出现在前 k 个标签中的样本比例
+RECALL_K = 15
+MIN_RECALL = 0.9
+REPORT_KS = (1, 3, 5, 10, 15, 20, 30)
+
+
+def format_recall(recall: dict) -> str:
+    return '，'.join(f'recall@{k}={value:.2f}' for k, value in recall.items())
+
+
+class TestCascadeRecall(unittest.TestCase):
+    def test_recall_on_annotated_labels(self):
+        """测试字符 n-gram 初筛在人工标注样本上的 recall@k，用于选择 CLASSIFY_CASCADE_TOP_K"""
+        recall = recall_at_k(NgramLabelScorer(), FIXTURE_SAMPLES, table_data_labels, REPORT_KS)
+        print(f'\n人工标注（{len(FIXTURE_SAMPLES)} 条）：{format_recall(recall)}')
+        self.assertGreaterEqual(recall[RECALL_K], MIN_RECALL)
+
+    def test_recall_on_model_top1(self):
+        """测试初筛对零样本模型 top1 标签的 recall@k：级联模式只有在 top1 被保留时结果才不变"""
+        # 分类器依赖 torch，只在该测试中导入，上面的测试无需安装模型依赖
+        try:
+            from tools.classifier.classifier import txtClassifier, model_path
+        except ImportError as e:
+            self.skipTest(f'缺少分类模型依赖：{e}')
+        if not os.path.exists(model_path):
+            self.skipTest(f'分类模型不存在：{model_path}')
+
+        classifier = txtClassifier(cascade_top_k=0)
+        sequences = [sequence for sequence, _ in FIXTURE_SAMPLES]
+        results = classifier.classify_batch(sequences, table_data_labels)
+        samples = [(sequence, result['labels'][0]) for sequence, result in zip(sequences, results)]
+        recall = recall_at_k(NgramLabelScorer(), samples, table_data_labels, REPORT_KS)
+        print(f'\n模型 top1（{len(samples)} 条）：{format_recall(recall)}')
+        self.assertGreaterEqual(recall[RECALL_K], MIN_RECALL)
+
+if __name__ == '__main__':
+    unittest.main()
@@ -39,6 +39,31 @@ class TestCSVClassificationAPI(unittest.TestCase):
         # 打印分类结果
         print("CSV分类结果:", result["results"])
 
+    def test_csv_per_column_classification(self):
+        """测试CSV按列分类"""
+        temp_csv_path = 'audio/个人财产信息.csv'
+        self.assertTrue(os.path.exists(temp_csv_path), f"测试CSV文件不存在: {temp_csv_path}")
+
+        with open(temp_csv_path, "rb") as csv_file:
+            files = {"csv_file": (os.path.basename(temp_csv_path), csv_file, "text/csv")}
+            data = {"per_column": "true", "sample_rows": "3"}
+            response = requests.post(self.classify_csv_url, files=files, data=data)
+
+        self.assertEqual(response.status_code, 200)
+        result = response.json()
+        self.assertIn("results", result)
+        self.assertIn("columns", result)
+        with open(temp_csv_path, "r", encoding="utf-8-sig") as csv_file:
+            headers = csv_file.readline().strip().split(",")
+        self.assertEqual([column["column"] for column in result["columns"]], headers)
+        for column in result["columns"]:
+            for group in column["results"]:
+                if group:
+                    label, score = group
+                    self.assertIsInstance(label, str)
+                    self.assertGreaterEqual(score, 0.0)
+                    self.assertLessEqual(score, 1.0)
+
 
 if __name__ == '__main__':
     unittest.main()
\ No newline at end of file
@@ -0,0 +1,50 @@
+import unittest
+
+from tools.classifier.dedup import NearDuplicateIndex
+
+TEMPLATE = "尊敬的{}先生，您尾号{}的银行卡于2024年5月1日消费人民币{}元，如非本人操作请致电95588。"
+
+
+class TestNearDuplicateIndex(unittest.TestCase):
+    def setUp(self):
+        self.index = NearDuplicateIndex()
+
+    def test_template_reused(self):
+        """测试模板相同、仅姓名和金额不同的文本复用已有结果"""
+        self.index.add(TEMPLATE.format("张三", "1234", "300.00"), 'notice')
+        reused = self.index.get(TEMPLATE.format("李四", "5678", "1,200.00"))
+        self.assertIsNotNone(reused)
+        self.assertEqual(reused[0], 'notice')
+        self.assertGreaterEqual(reused[1], self.index.threshold)
+
+    def test_numbers_not_duplicates(self):
+        """测试手机号、身份证号、银行卡号互不视为重复"""
+        numbers = ['13800138000', '110101199003071234', '6222021234567890123']
+        for number in numbers:
+            self.index.add(number, number)
+        for number in numbers:
+            self.assertIsNone(self.index.get(number))
+        self.assertEqual(self.index.stats()['entries'], 0)
+        self.assertEqual(self.index.get('2024-05-01'), None)
+
+    def test_identifier_type_in_template(self):
+        """测试同一模板中编号类型不同（手机号换成身份证号、银行卡号）时不复用结果"""
+        template = "客户联系方式：{}，请尽快回访并登记处理结果。"
+        self.index.add(template.format('13800138000'), 'phone')
+        self.assertIsNone(self.index.get(template.format('110101199003071234')))
+        self.assertIsNone(self.index.get(template.format('6222021234567890123')))
+        self.assertEqual(self.index.get(template.format('13900139000'))[0], 'phone')
+
+    def test_namespace_and_eviction(self):
+        """测试命名空间变化时旧条目失效，超出容量时淘汰最久未命中的条目"""
+        index = NearDuplicateIndex(max_entries=1)
+        first = TEMPLATE.format("张三", "1234", "300.00")
+        index.add(first, 'old', namespace='v1')
+        self.assertIsNone(index.get(first, namespace='v2'))
+        index.add(first, 'a', namespace='v2')
+        index.add("今天是一个十分适合旅游的天气，我们不如出去走一走？", 'b', namespace='v2')
+        self.assertIsNone(index.get(first, namespace='v2'))
+        self.assertEqual(index.stats()['entries'], 1)
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,51 @@
+import unittest
+import requests
+import os
+import io
+import json
+import zipfile
+
+class TestImageBatchClassificationAPI(unittest.TestCase):
+    def setUp(self):
+        self.base_url = 'http://127.0.0.1:8000'
+        self.classify_image_batch_url = f'{self.base_url}/classify/image/batch'
+        self.image_path = "audio/food.jpeg"
+        self.assertTrue(os.path.exists(self.image_path), f"测试图片文件不存在: {self.image_path}")
+
+    def check_lines(self, response, filenames):
+        self.assertEqual(response.status_code, 200)
+        lines = [json.loads(line) for line in response.text.splitlines() if line.strip()]
+        self.assertEqual([line["filename"] for line in lines], filenames)
+        for line in lines:
+            self.assertIn("results", line)
+            for group in line["results"]:
+                self.assertEqual(len(group), 2)
+                label, score = group
+                self.assertIsInstance(label, str)
+                self.assertIsInstance(score, float)
+                self.assertGreaterEqual(score, 0.0)
+                self.assertLessEqual(score, 1.0)
+
+    def test_classify_image_batch_files(self):
+        """测试批量图片分类接口（多个图片文件）"""
+        with open(self.image_path, "rb") as img_file:
+            content = img_file.read()
+        files = [
+            ("images", ("food1.jpeg", content, "image/jpeg")),
+            ("images", ("food2.jpeg", content, "image/jpeg"))
+        ]
+        response = requests.post(self.classify_image_batch_url, files=files)
+        self.check_lines(response, ["food1.jpeg", "food2.jpeg"])
+
+    def test_classify_image_batch_archive(self):
+        """测试批量图片分类接口（zip 压缩包）"""
+        buffer = io.BytesIO()
+        with zipfile.ZipFile(buffer, 'w') as archive:
+            archive.write(self.image_path, "images/food.jpeg")
+            archive.writestr("images/readme.txt", "not an image")
+        files = {"archive": ("images.zip", buffer.getvalue(), "application/zip")}
+        response = requests.post(self.classify_image_batch_url, files=files)
+        self.check_lines(response, ["images/food.jpeg"])
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,27 @@
+import unittest
+import requests
+
+class TestMetricsAPI(unittest.TestCase):
+    def setUp(self):
+        self.base_url = 'http://127.0.0.1:8000'
+
+    def test_metrics_format(self):
+        """测试 /metrics 以 Prometheus 文本格式返回请求耗时与各阶段耗时"""
+        requests.post(f'{self.base_url}/classify/txt', json={"txt": "今天是一个十分适合旅游的天气"})
+        response = requests.get(f'{self.base_url}/metrics')
+        self.assertEqual(response.status_code, 200)
+        self.assertTrue(response.headers['content-type'].startswith('text/plain'))
+        text = response.text
+        self.assertIn('# TYPE http_request_duration_seconds histogram', text)
+        self.assertIn('http_request_duration_seconds_count{endpoint="/classify/txt",status="200"}', text)
+        self.assertIn('# TYPE request_stage_seconds histogram', text)
+        self.assertIn('request_stage_seconds_count{endpoint="/classify/txt",stage="prefilter",label_set="txt"}', text)
+        self.assertIn('# TYPE result_cache_lookups_total counter', text)
+        for line in text.splitlines():
+            if line and not line.startswith('#'):
+                name, value = line.rsplit(' ', 1)
+                float(value)
+        print("指标行数:", len(text.splitlines()))
+
+if __name__ == '__main__':
+    unittest.main()
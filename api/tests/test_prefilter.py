@@ -0,0 +1,58 @@
+import unittest
+
+from tools.classifier.prefilter import KeywordAutomaton, RulePrefilter
+from tools.default_labels import text_labels
+
+
+class TestKeywordAutomaton(unittest.TestCase):
+    def test_overlapping_keywords(self):
+        """测试互相包含、互相重叠的关键词都能在一次扫描中找出"""
+        automaton = KeywordAutomaton({'he': 'a', 'she': 'b', 'hers': 'c', '身份证号': 'd', '身份证号码': 'd'})
+        self.assertEqual(automaton.find('ushers'), [('she', 'b'), ('he', 'a'), ('hers', 'c')])
+        self.assertEqual([keyword for keyword, _ in automaton.find('请提供身份证号码')], ['身份证号', '身份证号码'])
+
+    def test_normalization(self):
+        """测试全半角与大小写归一化后匹配"""
+        automaton = KeywordAutomaton({'access_key': 'a'})
+        self.assertEqual(automaton.find('ＡＣＣＥＳＳ_ＫＥＹ=xxx'), [('access_key', 'a')])
+        self.assertEqual(automaton.find('无关文本'), [])
+
+
+class TestRulePrefilter(unittest.TestCase):
+    def setUp(self):
+        self.prefilter = RulePrefilter()
+
+    def test_keyword_hit(self):
+        """测试命中单一标签的关键词时直接给出该标签"""
+        result = self.prefilter.classify('txt', '请提供您的身份证号码', text_labels)
+        self.assertEqual(result['tier'], 'keyword')
+        self.assertEqual(result['labels'], ['个人身份信息'])
+        self.assertEqual(result['scores'], [self.prefilter.confidence])
+
+    def test_keyword_ambiguous(self):
+        """测试关键词命中多个标签时有歧义，交给模型，也不再尝试正则"""
+        self.assertIsNone(self.prefilter.classify('txt', '请填写身份证号和手机号', text_labels))
+        self.assertIsNone(self.prefilter.classify('txt', '身份证号和手机号：13800138000', text_labels))
+
+    def test_regex_hit_and_ambiguity(self):
+        """测试检测器校验通过时按正则命中，正则命中多个标签时有歧义"""
+        result = self.prefilter.classify('txt', '有事请打13800138000', text_labels)
+        self.assertEqual(result['tier'], 'regex')
+        self.assertEqual(result['labels'], ['联系方式'])
+        self.assertIsNone(self.prefilter.classify('txt', '证件11010519491231002X，电话13800138000', text_labels))
+
+    def test_label_not_in_group(self):
+        """测试规则给出的标签不在请求的标签组中时不生效"""
+        self.assertIsNone(self.prefilter.classify('txt', '请提供您的身份证号码', ['联系方式']))
+
+    def test_max_chars_and_stats(self):
+        """测试超长文本不做预分类，各层级计数正确"""
+        prefilter = RulePrefilter(max_chars=10)
+        self.assertIsNone(prefilter.classify('txt', '请提供您的身份证号码' * 2, text_labels))
+        self.assertIsNotNone(prefilter.classify('txt', '身份证号码', text_labels))
+        tiers = prefilter.stats()['txt']['tiers']
+        self.assertEqual(tiers['model']['count'], 1)
+        self.assertEqual(tiers['keyword']['count'], 1)
+
+if __name__ == '__main__':
+    unittest.main()
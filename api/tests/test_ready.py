@@ -0,0 +1,29 @@
+import unittest
+import requests
+
+class TestReadinessAPI(unittest.TestCase):
+    def setUp(self):
+        self.base_url = 'http://127.0.0.1:8000'
+
+    def test_health(self):
+        """测试健康检查：服务启动后立即可用"""
+        response = requests.get(f'{self.base_url}/health')
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.json()["status"], "healthy")
+
+    def test_ready(self):
+        """测试就绪检查：返回各模型状态，全部就绪时为 200，否则为 503"""
+        response = requests.get(f'{self.base_url}/ready')
+        self.assertIn(response.status_code, [200, 503])
+        result = response.json()
+        self.assertIn("models", result)
+        for name, status in result["models"].items():
+            self.assertIn(status["state"], ["disabled", "pending", "loading", "loaded", "warming", "ready", "failed"])
+        if response.status_code == 200:
+            self.assertEqual(result["status"], "ready")
+            for status in result["models"].values():
+                self.assertIn(status["state"], ["ready", "disabled"])
+        print("就绪状态:", result)
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,60 @@
+import unittest
+import requests
+import io
+
+class TestScanTableAPI(unittest.TestCase):
+    def setUp(self):
+        self.base_url = 'http://127.0.0.1:8000'
+        self.scan_table_url = f'{self.base_url}/scan/table'
+
+    def test_scan_csv(self):
+        """测试表格扫描：列名无意义时按采样值识别敏感列"""
+        lines = ['col1,col2,col3']
+        for i in range(500):
+            lines.append(f'11010519491231002X,1380013{i:04d},user{i}@example.com')
+        files = {"table_file": ("data.csv", io.BytesIO('\n'.join(lines).encode('utf-8')), "text/csv")}
+        response = requests.post(self.scan_table_url, files=files)
+
+        self.assertEqual(response.status_code, 200)
+        result = response.json()
+        self.assertEqual(result["rows"], 500)
+        columns = {column["column"]: column for column in result["columns"]}
+        self.assertEqual(columns["col1"]["detector"], "id_card")
+        self.assertEqual(columns["col1"]["label"], "个人身份信息")
+        self.assertEqual(columns["col1"]["source"], "detector")
+        self.assertEqual(columns["col2"]["detector"], "phone")
+        self.assertEqual(columns["col3"]["detector"], "email")
+        for column in result["columns"]:
+            self.assertIn(column["source"], ["detector", "model"])
+            self.assertIsInstance(column["levels"], dict)
+        print("表格扫描结果:", result)
+
+    def test_scan_excel_duplicate_headers(self):
+        """测试 Excel 表头重复或为空、数据行短于表头时按 read_csv 的规则重命名列"""
+        from openpyxl import Workbook
+
+        workbook = Workbook()
+        sheet = workbook.active
+        sheet.append(['phone', 'phone', None, None])
+        for i in range(50):
+            sheet.append([f'1380013{i:04d}', f'1390013{i:04d}'])
+        content = io.BytesIO()
+        workbook.save(content)
+        files = {"table_file": ("data.xlsx", io.BytesIO(content.getvalue()), "application/octet-stream")}
+        response = requests.post(self.scan_table_url, files=files)
+
+        self.assertEqual(response.status_code, 200)
+        result = response.json()
+        columns = {column["column"]: column for column in result["columns"]}
+        self.assertEqual(set(columns), {"phone", "phone.1", "Unnamed: 2", "Unnamed: 3"})
+        self.assertEqual(columns["phone.1"]["detector"], "phone")
+        print("Excel 表格扫描结果:", result)
+
+    def test_scan_unsupported_format(self):
+        """测试不支持的表格格式"""
+        files = {"table_file": ("data.txt", io.BytesIO(b"abc"), "text/plain")}
+        response = requests.post(self.scan_table_url, files=files)
+        self.assertEqual(response.status_code, 400)
+
+if __name__ == '__main__':
+    unittest.main()
@@ -25,5 +25,67 @@ class TestTxtClassificationAPI(unittest.TestCase):
             else:
                 self.assertEqual(group, [])
 
+    def test_classify_txt_prefilter(self):
+        """测试规则预分类：含无歧义关键词的文本由规则直接分类"""
+        response = requests.post(self.classify_txt_url, json={"txt": "请提供您的身份证号码"})
+        self.assertEqual(response.status_code, 200)
+        result = response.json()
+        self.assertEqual(result["tier"], "keyword")
+        self.assertEqual(result["results"][0][0], "个人身份信息")
+        print("规则预分类结果:", result)
+
+    def test_classify_txt_prefilter_ambiguous(self):
+        """测试关键词命中多个标签时不由规则分类"""
+        response = requests.post(self.classify_txt_url, json={"txt": "请填写身份证号和手机号"})
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.json()["tier"], "model")
+
+    def test_classify_near_duplicate_txt(self):
+        """测试近似重复文本复用：模板相同、仅姓名和数字不同的文本复用已有结果"""
+        template = "尊敬的{}先生，您尾号{}的银行卡于2024年5月1日消费人民币{}元，如非本人操作请致电95588。"
+        first = requests.post(self.classify_txt_url, json={"txt": template.format("张三", "1234", "300.00")})
+        self.assertEqual(first.status_code, 200)
+        second = requests.post(self.classify_txt_url, json={"txt": template.format("李四", "5678", "1,200.00")})
+        self.assertEqual(second.status_code, 200)
+        result = second.json()
+        self.assertIs(result["reused"], True)
+        self.assertEqual(result["results"], first.json()["results"])
+        self.assertGreaterEqual(result["similarity"], 0.8)
+        self.assertLessEqual(result["similarity"], 1.0)
+        print("近似重复文本分类结果:", result)
+
+    def test_classify_numbers_not_reused(self):
+        """测试手机号、身份证号、银行卡号不互相复用分类结果"""
+        for number in ["13800138000", "110101199003071234", "6222021234567890123"]:
+            response = requests.post(self.classify_txt_url, json={"txt": number})
+            self.assertEqual(response.status_code, 200)
+            self.assertFalse(response.json().get("reused", False))
+
+    def test_classify_long_txt(self):
+        """测试长文本分类：按窗口切分后聚合，返回使用的窗口数"""
+        data = {"txt": "今天是一个十分适合旅游的天气，我们不如出去走一走？" * 200}
+        response = requests.post(self.classify_txt_url, json=data)
+        self.assertEqual(response.status_code, 200)
+        result = response.json()
+        self.assertIn("results", result)
+        self.assertGreater(result["windows"], 1)
+        self.assertGreater(result["tokens"], 0)
+        self.assertIsInstance(result["truncated"], bool)
+        for group in result["results"]:
+            if group:
+                label, score = group
+                self.assertIsInstance(label, str)
+                self.assertGreaterEqual(score, 0.0)
+                self.assertLessEqual(score, 1.0)
+        print("长文本分类结果:", result)
+
+    def test_classify_txt_response_keys(self):
+        """测试长短文本的响应字段相同"""
+        short = requests.post(self.classify_txt_url, json={"txt": "请提供您的身份证号码"}).json()
+        long = requests.post(self.classify_txt_url, json={"txt": "会议纪要：讨论下季度的预算安排。" * 200}).json()
+        self.assertEqual(set(short), set(long))
+        self.assertIn("reused", long)
+        self.assertIn("tier", long)
+
 if __name__ == '__main__':
     unittest.main()
\ No newline at end of file
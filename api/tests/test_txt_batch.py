@@ -0,0 +1,53 @@
+import unittest
+import requests
+import json
+
+class TestTxtBatchClassificationAPI(unittest.TestCase):
+    def setUp(self):
+        self.base_url = 'http://127.0.0.1:8000'
+        self.classify_txt_batch_url = f'{self.base_url}/classify/txt/batch'
+
+    def check_lines(self, response, count):
+        self.assertEqual(response.status_code, 200)
+        lines = [json.loads(line) for line in response.text.splitlines() if line.strip()]
+        self.assertEqual([line["index"] for line in lines], list(range(count)))
+        for line in lines:
+            self.assertIn("results", line)
+            for group in line["results"]:
+                if group:
+                    label, score = group
+                    self.assertIsInstance(label, str)
+                    self.assertIsInstance(score, float)
+                    self.assertGreaterEqual(score, 0.0)
+                    self.assertLessEqual(score, 1.0)
+                else:
+                    self.assertEqual(group, [])
+        return lines
+
+    def test_classify_txt_batch_json(self):
+        """测试批量文本分类接口（JSON 数组）"""
+        data = ["今天是一个十分适合旅游的天气", "请提供您的身份证号码", ""]
+        response = requests.post(self.classify_txt_batch_url, json=data)
+        lines = self.check_lines(response, len(data))
+        self.assertEqual(lines[2]["results"], [])
+
+    def test_classify_txt_batch_ndjson_upload(self):
+        """测试批量文本分类接口（上传 NDJSON 文件）"""
+        content = '\n'.join(json.dumps({"txt": txt}, ensure_ascii=False) for txt in ["合同编号：A001", "会议纪要"])
+        files = {"file": ("texts.ndjson", content.encode('utf-8'), "application/x-ndjson")}
+        response = requests.post(self.classify_txt_batch_url, files=files)
+        self.check_lines(response, 2)
+
+    def test_classify_txt_batch_long_text(self):
+        """测试批量接口中的长文本按窗口分类，结果与单条接口一致"""
+        long_text = "今天是一个十分适合旅游的天气，我们不如出去走一走？" * 200
+        single = requests.post(f'{self.base_url}/classify/txt', json={"txt": long_text}).json()
+        response = requests.post(self.classify_txt_batch_url, json=["请提供您的身份证号码", long_text])
+        lines = self.check_lines(response, 2)
+        self.assertGreater(lines[1]["windows"], 1)
+        self.assertEqual(lines[1]["results"], single["results"])
+        self.assertEqual(set(lines[1]) - {"index"}, set(single))
+        self.assertEqual(set(lines[0]), set(lines[1]))
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,77 @@
+import unittest
+
+import numpy as np
+
+from tools.transformer.vad import detect_speech, iter_speech_chunks
+
+SAMPLING_RATE = 16000
+
+
+def level(db: float) -> float:
+    """dBFS 对应的均方根幅度"""
+    return 10 ** (db / 20)
+
+
+def speech(seconds: float, db: float, seed: int = 0) -> np.ndarray:
+    """合成语音：200 Hz 基频的谐波按每秒 4 个音节调制，均方根电平约为 db"""
+    rng = np.random.default_rng(seed)
+    t = np.arange(int(seconds * SAMPLING_RATE)) / SAMPLING_RATE
+    voiced = sum(np.sin(2 * np.pi * 200 * k * t + rng.uniform(0, 2 * np.pi)) / k for k in range(1, 6))
+    envelope = 0.6 + 0.4 * np.abs(np.sin(2 * np.pi * 2 * t))
+    wave = voiced * envelope
+    return (wave / np.sqrt(np.mean(wave ** 2)) * level(db)).astype(np.float32)
+
+
+def noise(seconds: float, db: float, seed: int = 1) -> np.ndarray:
+    """白噪声，均方根电平为 db"""
+    rng = np.random.default_rng(seed)
+    return (rng.standard_normal(int(seconds * SAMPLING_RATE)) * level(db)).astype(np.float32)
+
+
+def speech_seconds(segments: list) -> float:
+    return sum(end - start for start, end in segments) / SAMPLING_RATE
+
+
+class TestDetectSpeech(unittest.TestCase):
+    def test_silence_dropped(self):
+        """测试正常电平的语音保留、之间的静音丢弃"""
+        waveform = np.concatenate([noise(5, -70), speech(5, -20), noise(10, -70), speech(5, -20, seed=2)])
+        detected = speech_seconds(detect_speech(waveform, SAMPLING_RATE))
+        self.assertGreater(detected, 9)
+        self.assertLess(detected, 12)
+
+    def test_digital_silence(self):
+        """测试近乎静音的块不产生语音段"""
+        self.assertEqual(detect_speech(noise(10, -80), SAMPLING_RATE), [])
+        self.assertEqual(detect_speech(np.zeros(SAMPLING_RATE * 10, dtype=np.float32), SAMPLING_RATE), [])
+
+    def test_quiet_continuous_speech(self):
+        """测试低增益录音中连续的语音（约 -42 dBFS，几乎没有停顿）不被丢弃"""
+        waveform = speech(20, -42)
+        self.assertGreater(speech_seconds(detect_speech(waveform, SAMPLING_RATE)), 18)
+
+    def test_steady_block_kept(self):
+        """测试能量没有起伏、检测不到语音段但并非静音的块整块保留"""
+        t = np.arange(SAMPLING_RATE * 10) / SAMPLING_RATE
+        waveform = (np.sin(2 * np.pi * 300 * t) * level(-42) * np.sqrt(2)).astype(np.float32)
+        self.assertEqual(detect_speech(waveform, SAMPLING_RATE), [(0, len(waveform))])
+
+    def test_low_snr_speech(self):
+        """测试底噪较高、语音只高出底噪约 9 dB 时仍能检出语音"""
+        background = noise(20, -50)
+        waveform = background.copy()
+        waveform[SAMPLING_RATE * 5:SAMPLING_RATE * 15] += speech(10, -41)
+        detected = detect_speech(waveform, SAMPLING_RATE)
+        self.assertGreater(speech_seconds(detected), 9)
+        self.assertLess(speech_seconds(detected), 15)
+
+    def test_quiet_speech_chunks(self):
+        """测试低电平语音经分段后仍送入识别"""
+        waveform = np.concatenate([speech(30, -45), noise(30, -60)]) + noise(60, -60, seed=3)
+        blocks = [waveform[start:start + SAMPLING_RATE * 60] for start in range(0, len(waveform), SAMPLING_RATE * 60)]
+        chunks = list(iter_speech_chunks(blocks, SAMPLING_RATE))
+        self.assertGreater(sum(chunk['speech_seconds'] for chunk in chunks), 28)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,24 @@
+# gunicorn 配置：多 worker 共享模型权重
+# 用法：gunicorn -c gunicorn.conf.py api.main:app
+#
+# preload_app 使主进程在 fork 前导入 api.main 并加载模型（MODEL_PRELOAD），
+# worker 以写时复制方式共享权重内存，每个 worker 只持有各自的激活值和缓存。
+import os
+
+bind = os.environ.get('GUNICORN_BIND', '0.0.0.0:8000')
+workers = int(os.environ.get('GUNICORN_WORKERS', '2'))
+worker_class = 'uvicorn.workers.UvicornWorker'
+# 模型加载较慢，预加载后 worker 启动只需预热
+timeout = int(os.environ.get('GUNICORN_TIMEOUT', '300'))
+preload_app = os.environ.get('MODEL_PRELOAD', '1').strip().lower() in ('1', 'true', 'yes', 'on')
+os.environ['MODEL_PRELOAD'] = '1' if preload_app else '0'
+# 主进程在 fork 前已使用过 HF 分词器，关闭其并行以免每个 worker 启动时告警并自行关闭
+os.environ.setdefault('TOKENIZERS_PARALLELISM', 'false')
+
+
+def post_fork(server, worker):
+    """限制每个 worker 的 torch 线程数，worker 数乘以线程数不宜超过 CPU 核数"""
+    threads = int(os.environ.get('TORCH_THREADS_PER_WORKER', '0'))
+    if threads > 0:
+        import torch
+        torch.set_num_threads(threads)
@@ -0,0 +1,84 @@
+"""语音识别后端基准：对比各后端在样例音频上的实时率（RTF = 识别耗时 / 音频时长，越小越快）
+
+用法（在项目根目录运行）：
+    python model/bench_asr.py
+    python model/bench_asr.py --backends pytorch,int8,faster_whisper --repeat 3
+    python model/bench_asr.py --model /path/to/distilled-whisper --backends pytorch,int8
+
+每个后端先加载模型并预热一次，再逐个识别音频文件（开启语音活动检测，与服务一致），
+输出每个文件的耗时、实时率与转录文本开头，便于同时核对识别结果是否一致。
+无法加载的后端（如未安装 faster-whisper 或未转换 CTranslate2 模型）会跳过并打印原因。
+"""
+import argparse
+import glob
+import os
+import sys
+import time
+
+import numpy as np
+
+# 添加项目目录到系统路径
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.append(ROOT)
+from tools.transformer.asr_backends import ASR_BACKENDS
+from tools.transformer.audio import AudioRecognizer, SAMPLING_RATE, audio_duration, model_path
+
+
+def bench_backend(backend: str, files: list, args) -> dict:
+    started = time.perf_counter()
+    recognizer = AudioRecognizer(args.model, backend=backend)
+    load_seconds = time.perf_counter() - started
+    # 预热：一秒静音，关闭语音检测以确保实际运行一次解码
+    list(recognizer.transcribe_stream(np.zeros(SAMPLING_RATE, dtype=np.float32), vad=False))
+
+    print(f'\n后端：{backend}（加载 {load_seconds:.1f} 秒）')
+    print(f'{"文件":<48}{"时长(s)":>10}{"耗时(s)":>10}{"RTF":>8}  转录')
+    total_audio = total_seconds = 0.0
+    for path in files:
+        with open(path, 'rb') as f:
+            content = f.read()
+        duration = audio_duration(content)
+        elapsed = []
+        for _ in range(args.repeat):
+            started = time.perf_counter()
+            text = recognizer.transcribe(content)
+            elapsed.append(time.perf_counter() - started)
+        seconds = min(elapsed)
+        total_seconds += seconds
+        total_audio += duration or 0.0
+        rtf = f'{seconds / duration:.3f}' if duration else '-'
+        print(f'{os.path.basename(path):<48}{duration or 0:>10.1f}{seconds:>10.2f}{rtf:>8}  {text[:40]}')
+    rtf = total_seconds / total_audio if total_audio else float('nan')
+    print(f'合计：音频 {total_audio:.1f} 秒，耗时 {total_seconds:.2f} 秒，RTF {rtf:.3f}')
+    return {'load_seconds': load_seconds, 'rtf': rtf}
+
+
+def main():
+    parser = argparse.ArgumentParser(description='语音识别后端实时率基准')
+    parser.add_argument('--backends', default='pytorch,int8,faster_whisper',
+                        help=f'测试的后端，逗号分隔，可选：{"、".join(ASR_BACKENDS)}')
+    parser.add_argument('--model', default=model_path, help='Whisper 模型目录')
+    parser.add_argument('--audio', default=os.path.join(ROOT, 'audio', '*.wav'), help='音频文件的 glob 模式')
+    parser.add_argument('--repeat', type=int, default=1, help='每个文件重复识别的次数，取最短耗时')
+    args = parser.parse_args()
+
+    files = sorted(glob.glob(args.audio))
+    if not files:
+        parser.error(f'没有匹配的音频文件：{args.audio}')
+    summary = {}
+    for backend in args.backends.split(','):
+        if not backend:
+            continue
+        try:
+            summary[backend] = bench_backend(backend, files, args)
+        except Exception as e:
+            print(f'\n后端：{backend} 跳过：{e}')
+
+    if summary:
+        print(f'\n{"后端":<16}{"加载(s)":>10}{"RTF":>10}')
+        for backend, result in summary.items():
+            print(f'{backend:<16}{result["load_seconds"]:>10.1f}{result["rtf"]:>10.3f}')
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,139 @@
+"""多 worker 内存基准：对比每个 worker 各自加载模型与 fork 前预加载（写时复制共享）两种方式
+
+用法（在项目根目录运行）：
+    python model/bench_memory.py --workers 4
+    python model/bench_memory.py --workers 4 --modes preload --requests 20
+    python model/bench_memory.py --pid <gunicorn 主进程 pid>   # 只测量已运行的服务
+
+对每种方式启动一次 gunicorn，等待所有 worker 就绪并发送若干请求后，读取 /proc/<pid>/smaps_rollup：
+    RSS      进程驻留内存，共享页在每个进程中都会计入
+    PSS      按共享进程数均摊后的内存，所有进程的 PSS 之和约等于实际占用
+    Shared   与其他进程共享的页
+    Private  进程独占的页（worker 自己的激活值、缓存等）
+"""
+import argparse
+import os
+import signal
+import subprocess
+import sys
+import time
+
+import requests
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+FIELDS = ('Rss', 'Pss', 'Shared_Clean', 'Shared_Dirty', 'Private_Clean', 'Private_Dirty')
+
+
+def read_memory(pid: int) -> dict:
+    """读取进程的内存统计（MB）"""
+    values = dict.fromkeys(FIELDS, 0)
+    with open(f'/proc/{pid}/smaps_rollup') as f:
+        for line in f:
+            name, _, rest = line.partition(':')
+            if name in values:
+                values[name] = int(rest.split()[0]) / 1024
+    return {
+        'rss': values['Rss'],
+        'pss': values['Pss'],
+        'shared': values['Shared_Clean'] + values['Shared_Dirty'],
+        'private': values['Private_Clean'] + values['Private_Dirty']
+    }
+
+
+def child_pids(pid: int) -> list:
+    children = []
+    for name in os.listdir('/proc'):
+        if not name.isdigit():
+            continue
+        try:
+            with open(f'/proc/{name}/stat') as f:
+                # 进程名可能含空格，从最后一个右括号之后解析
+                fields = f.read().rsplit(')', 1)[1].split()
+        except OSError:
+            continue
+        if int(fields[1]) == pid:
+            children.append(int(name))
+    return sorted(children)
+
+
+def report(master: int, title: str) -> dict:
+    rows = [('master', master, read_memory(master))]
+    rows += [('worker', pid, read_memory(pid)) for pid in child_pids(master)]
+    print(f'\n{title}')
+    print(f'{"进程":<8}{"pid":>8}{"RSS(MB)":>12}{"PSS(MB)":>12}{"Shared(MB)":>12}{"Private(MB)":>13}')
+    for role, pid, memory in rows:
+        print(f'{role:<8}{pid:>8}{memory["rss"]:>12.1f}{memory["pss"]:>12.1f}'
+              f'{memory["shared"]:>12.1f}{memory["private"]:>13.1f}')
+    workers = [memory for role, _, memory in rows if role == 'worker']
+    total = {key: sum(memory[key] for _, _, memory in rows) for key in ('rss', 'pss', 'private')}
+    print(f'{"合计":<8}{"":>8}{total["rss"]:>12.1f}{total["pss"]:>12.1f}{"":>12}{total["private"]:>13.1f}')
+    if workers:
+        print(f'worker 平均 RSS {sum(m["rss"] for m in workers) / len(workers):.1f} MB，'
+              f'平均独占 {sum(m["private"] for m in workers) / len(workers):.1f} MB，'
+              f'全部进程 PSS 之和 {total["pss"]:.1f} MB')
+    return total
+
+
+def wait_ready(url: str, workers: int, timeout: float) -> bool:
+    """/ready 由任意一个 worker 响应，连续多次返回 200 才认为所有 worker 均已就绪"""
+    deadline = time.time() + timeout
+    streak = 0
+    while time.time() < deadline:
+        try:
+            streak = streak + 1 if requests.get(f'{url}/ready', timeout=5).status_code == 200 else 0
+        except requests.RequestException:
+            streak = 0
+        if streak >= workers * 5:
+            return True
+        time.sleep(0.5)
+    return False
+
+
+def send_requests(url: str, count: int):
+    """发送若干分类请求，使各 worker 分配推理所需的激活内存"""
+    for index in range(count):
+        try:
+            requests.post(f'{url}/classify/txt', json={'txt': f'请提供您的身份证号码和手机号 {index}'}, timeout=60)
+        except requests.RequestException as e:
+            print(f'请求失败：{e}')
+
+
+def run_mode(mode: str, args) -> dict:
+    env = dict(os.environ, MODEL_PRELOAD='1' if mode == 'preload' else '0',
+               GUNICORN_WORKERS=str(args.workers), GUNICORN_BIND=f'127.0.0.1:{args.port}')
+    process = subprocess.Popen(
+        [sys.executable, '-m', 'gunicorn', '-c', 'gunicorn.conf.py', 'api.main:app'],
+        cwd=ROOT, env=env, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL
+    )
+    url = f'http://127.0.0.1:{args.port}'
+    try:
+        if not wait_ready(url, args.workers, args.timeout):
+            raise RuntimeError(f'{mode}：服务在 {args.timeout} 秒内未就绪')
+        send_requests(url, args.requests)
+        return report(process.pid, f'{mode}（{args.workers} 个 worker）')
+    finally:
+        process.send_signal(signal.SIGTERM)
+        process.wait(timeout=60)
+
+
+def main():
+    parser = argparse.ArgumentParser(description='多 worker 内存基准')
+    parser.add_argument('--workers', type=int, default=4, help='gunicorn worker 数')
+    parser.add_argument('--modes', default='per-worker,preload', help='测试的方式：per-worker、preload，逗号分隔')
+    parser.add_argument('--requests', type=int, default=20, help='测量前发送的分类请求数')
+    parser.add_argument('--port', type=int, default=8765, help='测试服务监听的端口')
+    parser.add_argument('--timeout', type=float, default=900, help='等待服务就绪的秒数')
+    parser.add_argument('--pid', type=int, default=None, help='只测量已运行的 gunicorn 主进程')
+    args = parser.parse_args()
+
+    if args.pid:
+        report(args.pid, f'gunicorn 主进程 {args.pid}')
+        return
+    totals = {mode: run_mode(mode, args) for mode in args.modes.split(',') if mode}
+    if len(totals) == 2:
+        before, after = totals['per-worker'], totals['preload']
+        print(f'\n全部进程 PSS 之和：{before["pss"]:.1f} MB -> {after["pss"]:.1f} MB')
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,27 @@
+import argparse
+import os
+import sys
+
+from transformers import AutoModelForSequenceClassification, AutoTokenizer
+
+# 添加项目目录到系统路径
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from tools.classifier.backends import default_onnx_path, export_onnx
+from tools.classifier.classifier import model_path
+
+# 将零样本分类模型导出为 ONNX，供 CLASSIFY_BACKEND=onnx 使用
+parser = argparse.ArgumentParser(description='导出零样本分类模型为 ONNX')
+parser.add_argument('--model', default=model_path, help='分类模型目录')
+parser.add_argument('--output', default=None, help='ONNX 文件路径，默认为 <模型目录>/onnx/model.onnx')
+parser.add_argument('--opset', type=int, default=17, help='ONNX 算子集版本')
+parser.add_argument('--quantize', action='store_true', help='同时导出 INT8 动态量化版本（model_int8.onnx）')
+args = parser.parse_args()
+
+output = args.output or default_onnx_path(args.model)
+print(f"正在导出分类模型：{args.model}")
+model = AutoModelForSequenceClassification.from_pretrained(args.model)
+tokenizer = AutoTokenizer.from_pretrained(args.model)
+quantized = export_onnx(model, tokenizer, output, opset=args.opset, quantize=args.quantize)
+print(f"ONNX 模型已保存到：{output}")
+if quantized:
+    print(f"INT8 ONNX 模型已保存到：{quantized}")
@@ -0,0 +1,225 @@
+import hashlib
+import json
+import logging
+import os
+import sqlite3
+import threading
+import time
+import unicodedata
+from collections import OrderedDict
+from typing import Any, Optional, Union
+
+from tools.default_labels import get_all_labels, label_descriptions
+from tools.settings import (
+    RESULT_CACHE_BACKEND, RESULT_CACHE_MAX_ENTRIES, RESULT_CACHE_TTL, RESULT_CACHE_SQLITE_PATH
+)
+
+# 配置日志
+logging.basicConfig(
+    level=logging.INFO,
+    format='%(asctime)s - %(name)s - %(levelname)s - %(message)s'
+)
+logger = logging.getLogger(__name__)
+
+
+def compute_labels_version(labels: Optional[Any] = None) -> str:
+    """标签配置的版本号：对本进程已加载的标签集（及级联初筛使用的标签描述）取哈希
+
+    版本号只由进程实际使用的标签决定，运行中修改 default_labels.py 不会让旧标签的结果写入新版本的缓存键。
+    """
+    if labels is None:
+        labels = {'labels': get_all_labels(), 'descriptions': label_descriptions}
+    content = json.dumps(labels, ensure_ascii=False, sort_keys=True)
+    return hashlib.sha256(content.encode('utf-8')).hexdigest()[:16]
+
+
+class MemoryCacheBackend:
+    def __init__(self, max_entries: int = RESULT_CACHE_MAX_ENTRIES, ttl: float = RESULT_CACHE_TTL):
+        """进程内 LRU 缓存，容量满时淘汰最久未使用的条目，超过 ttl 秒的条目视为过期"""
+        self.max_entries = max(1, max_entries)
+        self.ttl = ttl
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key: str) -> Optional[Any]:
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                return None
+            expires_at, value = entry
+            if expires_at < time.time():
+                del self._entries[key]
+                return None
+            self._entries.move_to_end(key)
+            return value
+
+    def set(self, key: str, value: Any):
+        with self._lock:
+            self._entries[key] = (time.time() + self.ttl, value)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+    def __len__(self):
+        return len(self._entries)
+
+
+class SQLiteCacheBackend:
+    def __init__(self, path: str = RESULT_CACHE_SQLITE_PATH, max_entries: int = RESULT_CACHE_MAX_ENTRIES,
+                 ttl: float = RESULT_CACHE_TTL):
+        """基于 SQLite 的磁盘缓存，可在同一台机器的多个 uvicorn worker 之间共享
+
+        值以 JSON 存储；写入时按最近访问时间淘汰超出容量的条目。
+        连接按进程创建，gunicorn --preload 在 fork 前创建的实例在 worker 中会重新连接。
+        """
+        self.path = path
+        self.max_entries = max(1, max_entries)
+        self.ttl = ttl
+        self._lock = threading.Lock()
+        self._pid = None
+        self._connect()
+
+    def _connect(self):
+        self._pid = os.getpid()
+        self._conn = sqlite3.connect(self.path, timeout=5, check_same_thread=False, isolation_level=None)
+        self._conn.execute('PRAGMA journal_mode=WAL')
+        self._conn.execute('PRAGMA synchronous=NORMAL')
+        self._conn.execute(
+            'CREATE TABLE IF NOT EXISTS result_cache ('
+            'key TEXT PRIMARY KEY, value TEXT NOT NULL, expires_at REAL NOT NULL, accessed_at REAL NOT NULL)'
+        )
+        self._conn.execute('CREATE INDEX IF NOT EXISTS result_cache_accessed ON result_cache (accessed_at)')
+
+    @property
+    def conn(self) -> sqlite3.Connection:
+        # SQLite 连接不能跨 fork 使用
+        if self._pid != os.getpid():
+            self._connect()
+        return self._conn
+
+    def get(self, key: str) -> Optional[Any]:
+        now = time.time()
+        with self._lock:
+            row = self.conn.execute(
+                'SELECT value, expires_at FROM result_cache WHERE key = ?', (key,)
+            ).fetchone()
+            if row is None:
+                return None
+            if row[1] < now:
+                self.conn.execute('DELETE FROM result_cache WHERE key = ?', (key,))
+                return None
+            self.conn.execute('UPDATE result_cache SET accessed_at = ? WHERE key = ?', (now, key))
+        return json.loads(row[0])
+
+    def set(self, key: str, value: Any):
+        now = time.time()
+        with self._lock:
+            self.conn.execute(
+                'INSERT OR REPLACE INTO result_cache (key, value, expires_at, accessed_at) VALUES (?, ?, ?, ?)',
+                (key, json.dumps(value, ensure_ascii=False), now + self.ttl, now)
+            )
+            self.conn.execute('DELETE FROM result_cache WHERE expires_at < ?', (now,))
+            self.conn.execute(
+                'DELETE FROM result_cache WHERE key IN ('
+                'SELECT key FROM result_cache ORDER BY accessed_at DESC LIMIT -1 OFFSET ?)',
+                (self.max_entries,)
+            )
+
+    def clear(self):
+        with self._lock:
+            self.conn.execute('DELETE FROM result_cache')
+
+    def __len__(self):
+        with self._lock:
+            return self.conn.execute('SELECT COUNT(*) FROM result_cache').fetchone()[0]
+
+
+def normalize_text(text: str) -> str:
+    """文本缓存键的归一化：全半角统一并合并空白"""
+    return ' '.join(unicodedata.normalize('NFKC', text).split())
+
+
+class ResultCache:
+    def __init__(self, model_id: str, backend: str = RESULT_CACHE_BACKEND,
+                 max_entries: int = RESULT_CACHE_MAX_ENTRIES, ttl: float = RESULT_CACHE_TTL,
+                 sqlite_path: str = RESULT_CACHE_SQLITE_PATH, labels_version: Optional[str] = None):
+        """分类结果缓存
+
+        缓存键由输入内容的哈希、标签配置版本和模型标识组成，
+        修改 default_labels.py 并重启后旧条目不再命中。
+
+        Args:
+            model_id: 模型标识，模型或分类参数变化时应随之变化
+            backend: 'memory'、'sqlite' 或 'off'
+            max_entries: 最大条目数
+            ttl: 条目有效期（秒）
+            sqlite_path: sqlite 后端的数据库文件路径
+            labels_version: 标签配置版本，默认为本进程加载的 tools/default_labels.py 标签集的哈希
+        """
+        if backend not in ('memory', 'sqlite', 'off'):
+            raise ValueError(f'不支持的缓存后端：{backend}')
+        self.model_id = model_id
+        self.backend_name = backend
+        if backend == 'sqlite':
+            self.backend = SQLiteCacheBackend(sqlite_path, max_entries, ttl)
+        elif backend == 'memory':
+            self.backend = MemoryCacheBackend(max_entries, ttl)
+        else:
+            self.backend = None
+        self.labels_version = labels_version or compute_labels_version()
+        self.hits = 0
+        self.misses = 0
+        logger.info(f'结果缓存后端：{backend}，标签版本：{self.labels_version}')
+
+    @property
+    def enabled(self) -> bool:
+        return self.backend is not None
+
+    def namespace(self, kind: str) -> str:
+        """接口类型、模型标识与标签配置版本组成的命名空间"""
+        return f'{kind}:{self.model_id}:{self.labels_version}'
+
+    def make_key(self, kind: str, content: Union[bytes, str]) -> str:
+        """根据接口类型和输入内容生成缓存键，文本会先归一化"""
+        if isinstance(content, str):
+            content = normalize_text(content).encode('utf-8')
+        digest = hashlib.sha256(content).hexdigest()
+        return f'{self.namespace(kind)}:{digest}'
+
+    def get(self, key: str) -> Optional[Any]:
+        if self.backend is None:
+            return None
+        try:
+            value = self.backend.get(key)
+        except Exception as e:
+            logger.warning(f'读取结果缓存失败：{str(e)}')
+            value = None
+        if value is None:
+            self.misses += 1
+        else:
+            self.hits += 1
+        return value
+
+    def set(self, key: str, value: Any):
+        if self.backend is None:
+            return
+        try:
+            self.backend.set(key, value)
+        except Exception as e:
+            logger.warning(f'写入结果缓存失败：{str(e)}')
+
+    def stats(self) -> dict:
+        """返回命中、未命中次数与当前条目数"""
+        total = self.hits + self.misses
+        return {
+            "backend": self.backend_name,
+            "labels_version": self.labels_version,
+            "entries": len(self.backend) if self.backend is not None else 0,
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_rate": self.hits / total if total else 0.0
+        }
@@ -0,0 +1,125 @@
+import logging
+import os
+from typing import Dict, Optional
+
+import numpy as np
+import torch
+
+from tools.settings import ONNX_INTRA_OP_THREADS
+
+# 配置日志
+logging.basicConfig(
+    level=logging.INFO,
+    format='%(asctime)s - %(name)s - %(levelname)s - %(message)s'
+)
+logger = logging.getLogger(__name__)
+
+# 推理后端：pytorch 原始精度，int8 动态量化，onnx 导出的 ONNX Runtime 计算图
+BACKENDS = ('pytorch', 'int8', 'onnx')
+ONNX_FILE_NAME = 'model.onnx'
+
+
+def default_onnx_path(model_path: str) -> str:
+    """导出的 ONNX 模型默认放在模型目录下的 onnx/ 子目录"""
+    return os.path.join(model_path, 'onnx', ONNX_FILE_NAME)
+
+
+def entailment_id(config) -> int:
+    """与 zero-shot pipeline 相同的规则，从 label2id 中找到蕴含类别的下标"""
+    for label, index in config.label2id.items():
+        if label.lower().startswith('entail'):
+            return index
+    return -1
+
+
+def quantize_int8(model: torch.nn.Module) -> torch.nn.Module:
+    """对全连接层做动态 INT8 量化：权重离线量化，激活在推理时按批量化，只适用于 CPU
+
+    原地替换全连接层，不保留 fp32 副本，其他仍引用该模型的对象（如 pipeline）看到的也是量化后的模型
+    """
+    model = torch.ao.quantization.quantize_dynamic(model, {torch.nn.Linear}, dtype=torch.qint8, inplace=True)
+    model.eval()
+    logger.info('模型已动态量化为 INT8')
+    return model
+
+
+class OnnxSequenceClassifier:
+    def __init__(self, onnx_path: str, intra_op_threads: int = ONNX_INTRA_OP_THREADS):
+        """ONNX Runtime 推理会话，开启全部图优化（算子融合、常量折叠等）
+
+        Args:
+            onnx_path: model/export_onnx.py 导出的 ONNX 模型路径
+            intra_op_threads: 单个算子的线程数，0 表示由 ONNX Runtime 决定
+        """
+        try:
+            import onnxruntime as ort
+        except ImportError as e:
+            raise ImportError('使用 onnx 后端需要安装 onnxruntime：pip install onnxruntime') from e
+        if not os.path.exists(onnx_path):
+            raise ValueError(f'ONNX 模型不存在：{onnx_path}，请先运行 python model/export_onnx.py')
+        options = ort.SessionOptions()
+        options.graph_optimization_level = ort.GraphOptimizationLevel.ORT_ENABLE_ALL
+        if intra_op_threads > 0:
+            options.intra_op_num_threads = intra_op_threads
+        self.onnx_path = onnx_path
+        self.session = ort.InferenceSession(onnx_path, options, providers=['CPUExecutionProvider'])
+        self.input_names = [node.name for node in self.session.get_inputs()]
+        logger.info(f'ONNX Runtime 会话初始化成功：{onnx_path}，输入：{self.input_names}')
+
+    def __call__(self, inputs: Dict[str, np.ndarray]) -> np.ndarray:
+        """执行前向计算，只传入计算图需要的输入，返回 float32 logits"""
+        feed = {name: inputs[name].astype(np.int64) for name in self.input_names}
+        return self.session.run(['logits'], feed)[0].astype(np.float32)
+
+
+def export_onnx(model, tokenizer, output_path: str, opset: int = 17,
+                quantize: bool = False) -> Optional[str]:
+    """把序列分类模型导出为 ONNX，批大小和序列长度均为动态维度
+
+    Args:
+        model: AutoModelForSequenceClassification 模型
+        tokenizer: 配套的分词器
+        output_path: 导出的 ONNX 文件路径
+        opset: ONNX 算子集版本
+        quantize: 是否额外导出 INT8 动态量化版本（文件名加 _int8 后缀）
+
+    Returns:
+        str: 量化版本的路径，未量化时为 None
+    """
+    os.makedirs(os.path.dirname(os.path.abspath(output_path)), exist_ok=True)
+    model.eval()
+    sample = tokenizer('示例文本', 'This example is 示例.', return_tensors='pt')
+    input_names = [name for name in ('input_ids', 'attention_mask', 'token_type_ids') if name in sample]
+    dynamic_axes = {name: {0: 'batch', 1: 'sequence'} for name in input_names}
+    dynamic_axes['logits'] = {0: 'batch'}
+
+    class LogitsOnly(torch.nn.Module):
+        # 导出计算图只保留 logits 输出，并固定输入的顺序
+        def __init__(self, inner):
+            super().__init__()
+            self.inner = inner
+
+        def forward(self, *args):
+            return self.inner(**dict(zip(input_names, args))).logits
+
+    with torch.inference_mode():
+        torch.onnx.export(
+            LogitsOnly(model),
+            tuple(sample[name] for name in input_names),
+            output_path,
+            input_names=input_names,
+            output_names=['logits'],
+            dynamic_axes=dynamic_axes,
+            opset_version=opset,
+            do_constant_folding=True
+        )
+    logger.info(f'ONNX 模型已导出：{output_path}')
+    if not quantize:
+        return None
+    from onnxruntime.quantization import QuantType, quantize_dynamic
+
+    root, extension = os.path.splitext(output_path)
+    quantized_path = f'{root}_int8{extension}'
+    quantize_dynamic(output_path, quantized_path, weight_type=QuantType.QInt8)
+    logger.info(f'INT8 量化的 ONNX 模型已导出：{quantized_path}')
+    return quantized_path
@@ -0,0 +1,188 @@
+import asyncio
+import logging
+import time
+from typing import Optional
+
+from tools.executor import InferenceExecutor, InferenceQueueFull
+from tools.metrics import registry, SIZE_BUCKETS, LATENCY_BUCKETS
+from tools.settings import BATCH_MAX_SIZE, BATCH_MAX_WAIT_MS, INFER_TXT_QUEUE
+
+# 配置日志
+logging.basicConfig(
+    level=logging.INFO,
+    format='%(asctime)s - %(name)s - %(levelname)s - %(message)s'
+)
+logger = logging.getLogger(__name__)
+
+
+class ClassifyBatcher:
+    def __init__(self, classifier, max_batch_size: int = BATCH_MAX_SIZE,
+                 max_wait_ms: float = BATCH_MAX_WAIT_MS,
+                 executor: Optional[InferenceExecutor] = None,
+                 max_pending: int = INFER_TXT_QUEUE):
+        """初始化微批处理调度器
+
+        并发到达的 classify 调用先进入队列，调度器在 max_wait_ms 内
+        最多收集 max_batch_size 个请求，合并为一次 classify_many 调用，
+        再把结果分别交还给各调用方。
+
+        Args:
+            classifier: txtClassifier 实例
+            max_batch_size: 单批最多合并的请求数
+            max_wait_ms: 凑批的最长等待时间（毫秒）
+            executor: 执行批次的推理执行器，为空时使用事件循环默认线程池
+            max_pending: 允许排队的请求数上限，超过时抛出 InferenceQueueFull
+        """
+        self.classifier = classifier
+        self.max_batch_size = max(1, max_batch_size)
+        self.max_wait = max(0.0, max_wait_ms) / 1000
+        self.executor = executor
+        self.max_pending = max(1, max_pending)
+        # 同时在执行的批次数与执行器并发数一致，执行期间继续凑下一批
+        self.concurrency = executor.max_workers if executor is not None else 1
+        self._slots: Optional[asyncio.Semaphore] = None
+        self.batch_size_histogram = registry.histogram(
+            'classify_batch_size', '微批处理调度器每批合并的请求数', buckets=SIZE_BUCKETS
+        ).labels()
+        self.queue_wait_histogram = registry.histogram(
+            'classify_queue_wait_seconds', '请求在微批处理调度器中排队等待的时间（秒）', buckets=LATENCY_BUCKETS
+        ).labels()
+        self._queue: Optional[asyncio.Queue] = None
+        self._worker: Optional[asyncio.Task] = None
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._running = set()
+
+    async def classify(self, sequence: str, labels: list) -> dict:
+        """提交一次分类请求并等待其所在批次完成
+
+        Args:
+            sequence: 待分类的文本
+            labels: 标签列表
+
+        Returns:
+            dict: 分类结果，格式同 txtClassifier.classify
+
+        Raises:
+            InferenceQueueFull: 排队请求数已达上限
+        """
+        if not sequence or not labels:
+            logger.warning('输入的文本或标签为空')
+            return {}
+        return (await self.classify_multi(sequence, [labels]))[0]
+
+    async def classify_multi(self, sequence: str, label_groups: list) -> list:
+        """按多个标签组对同一文本分类，各标签组作为一个整体排队，保证进入同一批次
+
+        Args:
+            sequence: 待分类的文本
+            label_groups: 标签列表的列表
+
+        Returns:
+            list: 每个标签组的分类结果，格式同 txtClassifier.classify
+
+        Raises:
+            InferenceQueueFull: 排队请求数已达上限
+        """
+        if not sequence or not label_groups:
+            return [{} for _ in label_groups]
+        self._ensure_worker()
+        if self._queue.qsize() >= self.max_pending:
+            raise InferenceQueueFull('classify_batcher')
+        future = asyncio.get_running_loop().create_future()
+        items = [(sequence, list(labels)) for labels in label_groups]
+        await self._queue.put((items, future, time.perf_counter()))
+        return await future
+
+    def stats(self) -> dict:
+        """返回批大小与排队等待时间的直方图"""
+        return {
+            "max_batch_size": self.max_batch_size,
+            "max_wait_ms": self.max_wait * 1000,
+            "max_pending": self.max_pending,
+            "pending": self._queue.qsize() if self._queue is not None else 0,
+            "batch_size": self.batch_size_histogram.snapshot(),
+            "queue_wait_seconds": self.queue_wait_histogram.snapshot()
+        }
+
+    async def close(self):
+        """停止后台调度任务"""
+        if self._worker is not None:
+            self._worker.cancel()
+            try:
+                await self._worker
+            except asyncio.CancelledError:
+                pass
+            self._worker = None
+
+    def _ensure_worker(self):
+        """在当前事件循环中按需启动后台调度任务"""
+        loop = asyncio.get_running_loop()
+        if self._loop is not loop:
+            # 队列与调度任务绑定创建时的事件循环，事件循环更换（如测试客户端）时重新创建
+            self._loop = loop
+            self._queue = asyncio.Queue()
+            self._slots = asyncio.Semaphore(self.concurrency)
+            self._worker = None
+        if self._worker is None or self._worker.done():
+            self._worker = loop.create_task(self._run())
+
+    async def _collect(self) -> list:
+        """阻塞等待第一个请求，随后在等待窗口内尽量凑满一批"""
+        loop = asyncio.get_running_loop()
+        batch = [await self._queue.get()]
+        deadline = loop.time() + self.max_wait
+        while len(batch) < self.max_batch_size:
+            timeout = deadline - loop.time()
+            if timeout <= 0:
+                break
+            try:
+                batch.append(await asyncio.wait_for(self._queue.get(), timeout))
+            except asyncio.TimeoutError:
+                break
+        return batch
+
+    async def _run(self):
+        while True:
+            await self._slots.acquire()
+            try:
+                batch = await self._collect()
+            except BaseException:
+                self._slots.release()
+                raise
+            task = asyncio.get_running_loop().create_task(self._execute(batch))
+            self._running.add(task)
+            task.add_done_callback(self._on_batch_done)
+
+    def _on_batch_done(self, task: asyncio.Task):
+        self._running.discard(task)
+        self._slots.release()
+
+    async def _execute(self, batch: list):
+        # 调用方已取消的请求不再参与计算
+        batch = [entry for entry in batch if not entry[1].cancelled()]
+        if not batch:
+            return
+        now = time.perf_counter()
+        for _, _, enqueued_at in batch:
+            self.queue_wait_histogram.observe(now - enqueued_at)
+        self.batch_size_histogram.observe(len(batch))
+
+        # 同一请求的多个标签组展开后与其他请求合并，classify_many 中同一文本只分词一次
+        items = [item for entry_items, _, _ in batch for item in entry_items]
+        try:
+            if self.executor is not None:
+                results = await self.executor.run(self.classifier.classify_many, items)
+            else:
+                loop = asyncio.get_running_loop()
+                results = await loop.run_in_executor(None, self.classifier.classify_many, items)
+        except Exception as e:
+            logger.error(f'批量分类失败：{str(e)}')
+            for _, future, _ in batch:
+                if not future.done():
+                    future.set_exception(e)
+            return
+        offset = 0
+        for entry_items, future, _ in batch:
+            if not future.done():
+                future.set_result(results[offset:offset + len(entry_items)])
+            offset += len(entry_items)
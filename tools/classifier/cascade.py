@@ -0,0 +1,120 @@
+import logging
+import math
+import re
+import threading
+import unicodedata
+from collections import Counter
+from typing import Dict, Iterable, List, Optional, Sequence, Tuple
+
+import numpy as np
+
+from tools.default_labels import label_descriptions
+
+# 配置日志
+logging.basicConfig(
+    level=logging.INFO,
+    format='%(asctime)s - %(name)s - %(levelname)s - %(message)s'
+)
+logger = logging.getLogger(__name__)
+
+# 按非文字字符（空白、标点）切分后再取 n-gram，n-gram 不跨越标点
+SEPARATORS = re.compile(r'[\W_]+')
+
+
+def char_ngrams(text: str, ngram_range: Tuple[int, int] = (1, 3)) -> Counter:
+    """统计文本的字符 n-gram，文本先做全半角统一并转小写"""
+    text = unicodedata.normalize('NFKC', text).lower()
+    grams = Counter()
+    low, high = ngram_range
+    for segment in SEPARATORS.split(text):
+        for n in range(low, high + 1):
+            for i in range(len(segment) - n + 1):
+                grams[segment[i:i + n]] += 1
+    return grams
+
+
+class NgramLabelScorer:
+    def __init__(self, descriptions: Optional[Dict[str, str]] = None, ngram_range: Tuple[int, int] = (1, 3)):
+        """字符 n-gram TF-IDF 标签初筛器
+
+        每个标签以"标签名 + 描述"作为文档，按标签集计算 TF-IDF 矩阵（只计算一次），
+        输入文本与各标签的余弦相似度即为初筛得分，无需调用模型。
+
+        Args:
+            descriptions: 标签 -> 描述关键词，默认使用 default_labels.label_descriptions
+            ngram_range: n-gram 的最小和最大长度
+        """
+        self.descriptions = label_descriptions if descriptions is None else descriptions
+        self.ngram_range = ngram_range
+        self._indexes: Dict[Tuple[str, ...], Tuple[Dict[str, int], np.ndarray, np.ndarray]] = {}
+        self._lock = threading.Lock()
+
+    def _index(self, labels: Sequence[str]) -> Tuple[Dict[str, int], np.ndarray, np.ndarray]:
+        """返回标签集的 (词表, idf, 按行 L2 归一化的 TF-IDF 矩阵)，同一标签集只计算一次"""
+        key = tuple(labels)
+        index = self._indexes.get(key)
+        if index is not None:
+            return index
+        documents = [char_ngrams(f'{label} {self.descriptions.get(label, "")}', self.ngram_range)
+                     for label in labels]
+        vocabulary = {gram: i for i, gram in enumerate(sorted(set().union(*documents)))}
+        frequency = np.zeros(len(vocabulary))
+        for document in documents:
+            for gram in document:
+                frequency[vocabulary[gram]] += 1
+        idf = np.log((1 + len(documents)) / (1 + frequency)) + 1
+        matrix = np.zeros((len(documents), len(vocabulary)))
+        for row, document in enumerate(documents):
+            for gram, count in document.items():
+                matrix[row, vocabulary[gram]] = (1 + math.log(count)) * idf[vocabulary[gram]]
+        matrix /= np.maximum(np.linalg.norm(matrix, axis=1, keepdims=True), 1e-12)
+        index = (vocabulary, idf, matrix)
+        with self._lock:
+            self._indexes[key] = index
+        return index
+
+    def score(self, sequence: str, labels: Sequence[str]) -> np.ndarray:
+        """返回文本与每个标签的余弦相似度"""
+        vocabulary, idf, matrix = self._index(labels)
+        query = np.zeros(len(vocabulary))
+        for gram, count in char_ngrams(sequence, self.ngram_range).items():
+            column = vocabulary.get(gram)
+            if column is not None:
+                query[column] = (1 + math.log(count)) * idf[column]
+        norm = np.linalg.norm(query)
+        if norm == 0:
+            return np.zeros(len(labels))
+        return matrix @ (query / norm)
+
+    def top_k(self, sequence: str, labels: Sequence[str], k: int) -> List[str]:
+        """返回初筛得分最高的 k 个标签，得分相同时保持标签的原有顺序"""
+        if k <= 0 or len(labels) <= k:
+            return list(labels)
+        scores = self.score(sequence, labels)
+        order = np.argsort(-scores, kind='stable')[:k]
+        return [labels[i] for i in order]
+
+
+def recall_at_k(scorer: NgramLabelScorer, samples: Iterable[Tuple[str, str]], labels: Sequence[str],
+                ks: Sequence[int]) -> Dict[int, float]:
+    """评估初筛的召回率：期望标签出现在初筛前 k 个标签中的样本比例
+
+    Args:
+        scorer: 初筛器
+        samples: (文本, 期望标签) 列表，期望标签可以是零样本模型的 top1，也可以是人工标注
+        labels: 标签集
+        ks: 需要评估的 k 值
+
+    Returns:
+        dict: k -> recall@k
+    """
+    samples = list(samples)
+    hits = dict.fromkeys(ks, 0)
+    for sequence, expected in samples:
+        scores = scorer.score(sequence, labels)
+        order = np.argsort(-scores, kind='stable')
+        rank = int(np.flatnonzero(np.array(labels)[order] == expected)[0]) if expected in labels else len(labels)
+        for k in ks:
+            if rank < k:
+                hits[k] += 1
+    return {k: hits[k] / len(samples) if samples else 0.0 for k in ks}
@@ -1,6 +1,24 @@
 import logging
 import os
-from transformers import pipeline, AutoModelForSequenceClassification, AutoTokenizer
+import time
+import numpy as np
+import torch
+from typing import Dict, Iterable, List, Optional, Tuple
+from transformers import pipeline, AutoConfig, AutoModelForSequenceClassification, AutoTokenizer
+
+from tools.classifier.backends import (
+    BACKENDS, OnnxSequenceClassifier, default_onnx_path, entailment_id, quantize_int8
+)
+from tools.classifier.cascade import NgramLabelScorer
+from tools.classifier.embedding import EmbeddingEngine
+from tools.default_labels import LABEL_SEPARATOR, split_label_factors
+from tools.metrics import registry, model_stage_seconds, timer, SIZE_BUCKETS
+from tools.settings import (
+    CLASSIFY_PAIR_BATCH_SIZE, CLASSIFY_ENGINE, EMBEDDING_RERANK_TOP_K, CLASSIFY_HIERARCHICAL,
+    CLASSIFY_BACKEND, CLASSIFY_ONNX_PATH,
+    LONG_TEXT_WINDOW_TOKENS, LONG_TEXT_OVERLAP_TOKENS, LONG_TEXT_AGGREGATION, LONG_TEXT_MAX_TOKENS,
+    CLASSIFY_CASCADE_TOP_K
+)
 
 # 配置日志
 logging.basicConfig(
@@ -9,19 +27,98 @@ logging.basicConfig(
 )
 logger = logging.getLogger(__name__)
 model_path = "/etc/model/nlp_structbert_zero-shot-classification_chinese-base"
+# 与 zero-shot-classification pipeline 的默认假设模板保持一致
+hypothesis_template = "This example is {}."
+# 长文本窗口得分的聚合方式
+AGGREGATIONS = ('max', 'mean', 'vote')
+# 零样本推理的计数与每次前向计算的文本-假设对数
+pairs_total = registry.counter('classify_pairs_total', '零样本推理计算的文本-假设对总数').labels()
+items_total = registry.counter('classify_items_total', '零样本推理分类的 (文本, 标签组) 总数').labels()
+forward_pairs = registry.histogram(
+    'classify_forward_pairs', '每次前向计算的文本-假设对数', buckets=SIZE_BUCKETS + (128, 256)
+).labels()
+tokenize_seconds = model_stage_seconds.labels('txt', 'tokenize')
+forward_seconds = model_stage_seconds.labels('txt', 'forward')
+postprocess_seconds = model_stage_seconds.labels('txt', 'postprocess')
+
+
+def aggregate_window_results(results: List[dict], aggregation: str) -> dict:
+    """聚合同一文本各窗口的分类结果
+
+    max 取各标签在所有窗口中的最高分；mean 取平均分；vote 以各窗口的 top1 投票，
+    分数为得票比例，票数相同时按平均分排序。窗口的标签集不同时（如层级分类），缺失的标签记 0 分。
+    """
+    labels = []
+    for result in results:
+        labels.extend(label for label in result['labels'] if label not in labels)
+    scores = np.array([
+        [dict(zip(result['labels'], result['scores'])).get(label, 0.0) for label in labels]
+        for result in results
+    ])
+    mean = scores.mean(axis=0)
+    if aggregation == 'max':
+        aggregated = scores.max(axis=0)
+    elif aggregation == 'mean':
+        aggregated = mean
+    else:
+        aggregated = np.bincount(scores.argmax(axis=1), minlength=len(labels)) / len(results)
+    order = sorted(range(len(labels)), key=lambda i: (aggregated[i], mean[i]), reverse=True)
+    return {
+        'labels': [labels[i] for i in order],
+        'scores': [float(aggregated[i]) for i in order]
+    }
+
 
 class txtClassifier:
-    def __init__(self, model_path: str=model_path):
+    def __init__(self, model_path: str=model_path, hypothesis_template: str = hypothesis_template,
+                 pair_batch_size: int = CLASSIFY_PAIR_BATCH_SIZE, engine: str = CLASSIFY_ENGINE,
+                 rerank_top_k: int = EMBEDDING_RERANK_TOP_K, hierarchical: str = CLASSIFY_HIERARCHICAL,
+                 backend: str = CLASSIFY_BACKEND, onnx_path: str = CLASSIFY_ONNX_PATH,
+                 cascade_top_k: int = CLASSIFY_CASCADE_TOP_K):
         """初始化分类器
         
         Args:
             model_path: 模型路径或名称
+            hypothesis_template: 由标签生成假设句的模板
+            pair_batch_size: 批量分类时单次前向计算的 (文本, 假设) 对数量上限
+            engine: 分类引擎，'nli' 逐标签零样本推理，'embedding' 句向量相似度
+            rerank_top_k: embedding 引擎召回前 k 个标签后用零样本模型重排，0 表示不重排
+            hierarchical: 组合标签的层级分类模式，'off'、'parallel' 或 'sequential'
+            backend: 推理后端，'pytorch'、'int8'（动态量化）或 'onnx'（ONNX Runtime）
+            onnx_path: onnx 后端的模型文件，为空时使用 <model_path>/onnx/model.onnx
+            cascade_top_k: 零样本推理前先用字符 n-gram TF-IDF 初筛标签，只保留前 k 个，0 表示不初筛
         """
+        if engine not in ('nli', 'embedding'):
+            raise ValueError(f'不支持的分类引擎：{engine}')
+        if hierarchical not in ('off', 'parallel', 'sequential'):
+            raise ValueError(f'不支持的层级分类模式：{hierarchical}')
+        if backend not in BACKENDS:
+            raise ValueError(f'不支持的推理后端：{backend}')
+        self.model_path = model_path
+        self.hypothesis_template = hypothesis_template
+        self.pair_batch_size = pair_batch_size
+        self.engine = engine
+        self.rerank_top_k = rerank_top_k
+        self._embedding_engine = None
+        self.hierarchical = hierarchical
+        self.backend = backend
+        self.onnx_model: Optional[OnnxSequenceClassifier] = None
+        self.cascade_top_k = cascade_top_k
+        self.label_scorer = NgramLabelScorer() if cascade_top_k > 0 else None
+        # 标签集 -> (意图列表, 行业列表)，不可拆分的标签集对应 None
+        self._label_factors: Dict[Tuple[str, ...], Optional[Tuple[list, list]]] = {}
  
-        logger.info(f'正在初始化分类器，使用模型：{model_path}')
+        logger.info(f'正在初始化分类器，使用模型：{model_path}，推理后端：{backend}')
         try:
+            if backend == 'onnx':
+                # ONNX Runtime 只需要配置和分词器，不加载 PyTorch 权重
+                self.onnx_model = OnnxSequenceClassifier(onnx_path or default_onnx_path(model_path))
+                self.config = AutoConfig.from_pretrained(model_path)
+                self.tokenizer = AutoTokenizer.from_pretrained(model_path)
+                self.entailment_id = entailment_id(self.config)
+                self.model = None
             # 检查本地模型
-            if os.path.exists(model_path):
+            elif os.path.exists(model_path):
                 logger.info(f'发现本地模型：{model_path}')
                 model = AutoModelForSequenceClassification.from_pretrained(model_path)
                 tokenizer = AutoTokenizer.from_pretrained(model_path)
@@ -43,6 +140,28 @@ class txtClassifier:
                     model=model,
                     tokenizer=tokenizer
                 )
+            if self.onnx_model is None:
+                self.model = self.classifier.model
+                self.tokenizer = self.classifier.tokenizer
+                self.entailment_id = self.classifier.entailment_id
+                self.config = self.model.config
+                if backend == 'int8':
+                    self.model = quantize_int8(self.model)
+                # 推理直接调用模型，不再需要 pipeline
+                self.classifier = None
+            self.max_length = min(
+                self.tokenizer.model_max_length,
+                getattr(self.config, 'max_position_embeddings', self.tokenizer.model_max_length)
+            )
+            # 标签 -> 假设句 token id（不含特殊符号），标签集固定，只需编码一次
+            self._hypothesis_cache: Dict[str, List[int]] = {}
+            # 输入已预先分词，直接对 token id 调用 pad，无需提示改用 __call__
+            self.tokenizer.deprecation_warnings['Asking-to-pad-a-fast-tokenizer'] = True
+            if self.engine == 'embedding':
+                self.get_embedding_engine()
+            if LONG_TEXT_WINDOW_TOKENS and LONG_TEXT_OVERLAP_TOKENS > LONG_TEXT_WINDOW_TOKENS // 2:
+                logger.warning(f'LONG_TEXT_OVERLAP_TOKENS={LONG_TEXT_OVERLAP_TOKENS} 超过窗口的一半，'
+                               f'按 {LONG_TEXT_WINDOW_TOKENS // 2} 处理')
             logger.info('分类器初始化成功')
         except Exception as e:
             logger.error(f'分类器初始化失败：{str(e)}')
@@ -66,7 +185,7 @@ class txtClassifier:
         logger.info(f'开始分类，文本：{sequence[:50]}，标签：{labels}')
         
         try:
-            result = self.classifier(sequence, candidate_labels=labels)
+            result = self.classify_many([(sequence, labels)])[0]
             
             if num is not None:
                 result['labels'] = result['labels'][:num]
@@ -79,6 +198,441 @@ class txtClassifier:
             logger.error(f'分类过程出错：{str(e)}')
             raise
 
+    def preload_labels(self, label_sets: Iterable[list]):
+        """预先编码固定标签集的假设句，请求时只需对输入文本分词
+
+        Args:
+            label_sets: 标签列表的集合，如 get_all_labels().values()
+        """
+        count = 0
+        for labels in label_sets:
+            count += len(self._encode_hypotheses(labels))
+        logger.info(f'已缓存 {len(self._hypothesis_cache)} 个标签的假设句编码（共 {count} 个）')
+
+    def _encode_hypotheses(self, labels: list) -> List[List[int]]:
+        """返回各标签假设句的 token id，未缓存的标签编码后写入缓存"""
+        encoded = []
+        for label in labels:
+            ids = self._hypothesis_cache.get(label)
+            if ids is None:
+                ids = self.tokenizer(
+                    self.hypothesis_template.format(label),
+                    add_special_tokens=False
+                )['input_ids']
+                self._hypothesis_cache[label] = ids
+            encoded.append(ids)
+        return encoded
+
+    def classify_batch(self, sequences: List[str], labels: list) -> List[dict]:
+        """使用同一组标签对多条文本批量分类
+
+        Args:
+            sequences: 待分类的文本列表
+            labels: 标签列表
+
+        Returns:
+            list: 与 sequences 一一对应的分类结果，格式同 classify
+        """
+        return self.classify_many([(sequence, labels) for sequence in sequences])
+
+    def classify_many(self, items: List[Tuple[str, list]]) -> List[dict]:
+        """将多个 (文本, 标签列表) 请求合并为一批，使用当前引擎分类
+
+        Args:
+            items: (文本, 标签列表) 列表，各请求的标签可以不同
+
+        Returns:
+            list: 与 items 一一对应的分类结果，空文本或空标签对应 {}
+        """
+        if self.hierarchical != 'off':
+            return self._classify_many_hierarchical(items)
+        return self._classify_many_flat(items)
+
+    def classify_multi(self, sequence: str, label_groups: List[list]) -> List[list]:
+        """按多个标签组对同一文本分类
+
+        所有标签组的 (文本, 假设) 对合并为一次批量前向计算，文本只分词一次，
+        各组共有的标签只计算一次，softmax 仍在每个标签组内分别计算。
+
+        Args:
+            sequence: 待分类的文本
+            label_groups: 标签列表的列表
+
+        Returns:
+            list: 每个标签组得分最高的 [标签, 分数]，文本或标签组为空时该组为 []
+        """
+        results = self.classify_many([(sequence, labels) for labels in label_groups])
+        return [
+            [result['labels'][0], result['scores'][0]] if result and result.get('labels') else []
+            for result in results
+        ]
+
+    def _classify_many_flat(self, items: List[Tuple[str, list]]) -> List[dict]:
+        if self.engine == 'embedding':
+            return self._classify_many_embedding(items)
+        if self.label_scorer is not None:
+            items = self._prune_labels(items)
+        return self._classify_many_nli(items)
+
+    def _prune_labels(self, items: List[Tuple[str, list]]) -> List[Tuple[str, list]]:
+        """级联模式：标签数超过 cascade_top_k 时只保留初筛得分最高的 k 个标签做零样本推理
+
+        返回结果只包含这 k 个标签，分数在 k 个标签上归一化。
+        """
+        pruned = []
+        for sequence, labels in items:
+            if sequence and labels:
+                labels = self.label_scorer.top_k(sequence, labels, self.cascade_top_k)
+            pruned.append((sequence, labels))
+        return pruned
+
+    def window_size(self, labels: list, window_tokens: int = LONG_TEXT_WINDOW_TOKENS) -> int:
+        """单个窗口可容纳的文本 token 数：模型最大长度减去最长假设句和特殊符号，window_tokens 可进一步缩小"""
+        longest = max(len(ids) for ids in self._encode_hypotheses(labels))
+        size = self.max_length - longest - self.tokenizer.num_special_tokens_to_add(pair=True)
+        if window_tokens:
+            size = min(size, window_tokens)
+        return max(1, size)
+
+    def may_need_windows(self, sequence: str, label_groups: List[list],
+                         window_tokens: int = LONG_TEXT_WINDOW_TOKENS) -> bool:
+        """不分词判断文本是否可能超过单个窗口：每个 token 至少对应一个字符，字符数不超过窗口时一定不超"""
+        return any(len(sequence) > self.window_size(labels, window_tokens) for labels in label_groups if labels)
+
+    def split_windows(self, sequence: str, window: int, overlap: int = LONG_TEXT_OVERLAP_TOKENS,
+                      max_tokens: int = LONG_TEXT_MAX_TOKENS) -> Tuple[List[str], int, bool]:
+        """按 token 把文本切分为相互重叠的窗口
+
+        Args:
+            sequence: 待切分的文本
+            window: 每个窗口的 token 数
+            overlap: 相邻窗口重叠的 token 数，最多为窗口的一半
+            max_tokens: 最多处理的 token 数，超出部分丢弃，0 表示不限制
+
+        Returns:
+            tuple: (窗口文本列表, 处理的 token 数, 是否因超出 max_tokens 被截断)
+        """
+        if self.tokenizer.is_fast:
+            offsets = self.tokenizer(
+                sequence, add_special_tokens=False, return_offsets_mapping=True
+            )['offset_mapping']
+        else:
+            # 慢速分词器不提供字符偏移，按字符切分
+            offsets = [(i, i + 1) for i in range(len(sequence))]
+        total = len(offsets)
+        used = min(total, max_tokens) if max_tokens else total
+        # 重叠不小于窗口时步长会退化为 1 个 token，窗口数随文本长度线性增长
+        step = max(1, window - min(max(0, overlap), window // 2))
+        windows = []
+        for start in range(0, used, step):
+            end = min(start + window, used)
+            windows.append(sequence[offsets[start][0]:offsets[end - 1][1]])
+            if end >= used:
+                break
+        return windows, used, used < total
+
+    def classify_long_many(self, items: List[Tuple[str, list]], aggregation: str = LONG_TEXT_AGGREGATION,
+                           window_tokens: int = LONG_TEXT_WINDOW_TOKENS, overlap: int = LONG_TEXT_OVERLAP_TOKENS,
+                           max_tokens: int = LONG_TEXT_MAX_TOKENS) -> List[dict]:
+        """长文本分类：每条文本切分为 token 窗口，所有窗口合并为一批分类后再按文本聚合得分
+
+        Args:
+            items: (文本, 标签列表) 列表
+            aggregation: 窗口得分的聚合方式，'max'、'mean' 或 'vote'
+            window_tokens: 窗口的 token 数上限，0 表示按模型最大长度自动计算
+            overlap: 相邻窗口重叠的 token 数
+            max_tokens: 每条文本最多处理的 token 数，用于限制单个请求的耗时，0 表示不限制
+
+        Returns:
+            list: 与 items 一一对应的分类结果，在 classify 结果的基础上增加
+                windows（窗口数）、tokens（处理的 token 数）和 truncated（是否截断）
+        """
+        if aggregation not in AGGREGATIONS:
+            raise ValueError(f'不支持的聚合方式：{aggregation}')
+        window_items = []
+        spans = []
+        for sequence, labels in items:
+            if not sequence or not labels:
+                spans.append(None)
+                continue
+            windows, used, truncated = self.split_windows(
+                sequence, self.window_size(labels, window_tokens), overlap, max_tokens
+            )
+            start = len(window_items)
+            window_items.extend((window, labels) for window in windows)
+            spans.append((start, len(window_items), used, truncated))
+        logger.info(f'长文本分类，文本数：{len(items)}，窗口数：{len(window_items)}')
+
+        window_results = self.classify_many(window_items)
+        results = []
+        for (sequence, _), span in zip(items, spans):
+            if span is None:
+                results.append({})
+                continue
+            start, end, used, truncated = span
+            result = aggregate_window_results(window_results[start:end], aggregation)
+            result.update(sequence=sequence, windows=end - start, tokens=used, truncated=truncated)
+            results.append(result)
+        return results
+
+    def get_label_factors(self, labels: list) -> Optional[Tuple[list, list]]:
+        """返回组合标签集的 (意图列表, 行业列表)
+
+        只有按分隔符可拆分、且拆分后因子总数少于标签数时才返回，否则为 None
+        """
+        key = tuple(labels)
+        if key not in self._label_factors:
+            factors = split_label_factors(labels)
+            if factors is not None and len(factors[0]) + len(factors[1]) >= len(labels):
+                factors = None
+            self._label_factors[key] = factors
+        return self._label_factors[key]
+
+    def _classify_many_hierarchical(self, items: List[Tuple[str, list]]) -> List[dict]:
+        """层级分类：组合标签先对意图、行业两组因子分别打分，再相乘得到组合标签的分数
+
+        推理的文本-假设对数从 |意图|×|行业| 降为 |意图|+|行业|，
+        不可拆分的标签集按普通方式分类。
+        """
+        results = [{} for _ in items]
+        flat_indexes = []
+        factored = []
+        for index, (sequence, labels) in enumerate(items):
+            factors = self.get_label_factors(labels) if sequence and labels else None
+            if factors is None:
+                flat_indexes.append(index)
+            else:
+                factored.append((index, factors))
+
+        for index, result in zip(flat_indexes, self._classify_many_flat([items[i] for i in flat_indexes])):
+            results[index] = result
+        if not factored:
+            return results
+
+        if self.hierarchical == 'parallel':
+            factor_items = []
+            for index, (intents, industries) in factored:
+                factor_items.append((items[index][0], intents))
+                factor_items.append((items[index][0], industries))
+            factor_results = self._classify_many_flat(factor_items)
+            for position, (index, _) in enumerate(factored):
+                sequence, labels = items[index]
+                results[index] = self._combine_factors(
+                    sequence, labels, factor_results[2 * position], factor_results[2 * position + 1]
+                )
+        else:
+            intent_results = self._classify_many_flat(
+                [(items[index][0], intents) for index, (intents, _) in factored]
+            )
+            industry_items = []
+            for (index, _), intent_result in zip(factored, intent_results):
+                prefix = intent_result['labels'][0] + LABEL_SEPARATOR
+                industry_items.append((
+                    items[index][0],
+                    [label[len(prefix):] for label in items[index][1] if label.startswith(prefix)]
+                ))
+            industry_results = self._classify_many_flat(industry_items)
+            for (index, _), intent_result, industry_result in zip(factored, intent_results, industry_results):
+                sequence, labels = items[index]
+                results[index] = self._combine_factors(sequence, labels, intent_result, industry_result)
+        return results
+
+    @staticmethod
+    def _combine_factors(sequence: str, labels: list, intent_result: dict, industry_result: dict) -> dict:
+        """将两组因子的分数相乘并在已配置的组合标签上归一化"""
+        intent_scores = dict(zip(intent_result['labels'], intent_result['scores']))
+        industry_scores = dict(zip(industry_result['labels'], industry_result['scores']))
+        combined = []
+        for label in labels:
+            intent, industry = label.split(LABEL_SEPARATOR)
+            if intent in intent_scores and industry in industry_scores:
+                combined.append((label, intent_scores[intent] * industry_scores[industry]))
+        total = sum(score for _, score in combined) or 1.0
+        combined.sort(key=lambda pair: pair[1], reverse=True)
+        return {
+            'sequence': sequence,
+            'labels': [label for label, _ in combined],
+            'scores': [score / total for _, score in combined]
+        }
+
+    def get_embedding_engine(self):
+        """返回向量分类引擎，首次调用时创建"""
+        if self._embedding_engine is None:
+            self._embedding_engine = EmbeddingEngine(
+                encoder=self.model.base_model if self.model is not None else None,
+                tokenizer=self.tokenizer
+            )
+        return self._embedding_engine
+
+    def compare_engines(self, sequences: List[str], labels: list,
+                        expected: Optional[List[str]] = None) -> dict:
+        """对比零样本推理与向量引擎的准确率和耗时
+
+        Args:
+            sequences: 评测文本列表
+            labels: 标签列表
+            expected: 各文本的期望标签，提供时额外计算两种引擎的准确率
+
+        Returns:
+            dict: 平均耗时、加速比、两种引擎 top1 一致率及准确率
+        """
+        items = [(sequence, labels) for sequence in sequences]
+        engine = self.get_embedding_engine()
+        # 预热：标签矩阵编码只在首次发生，不计入耗时
+        engine.label_matrix(labels)
+        self._encode_hypotheses(labels)
+
+        start = time.perf_counter()
+        nli_results = self._classify_many_nli(items)
+        nli_seconds = time.perf_counter() - start
+        start = time.perf_counter()
+        embedding_results = self._classify_many_embedding(items)
+        embedding_seconds = time.perf_counter() - start
+
+        nli_top = [result['labels'][0] for result in nli_results]
+        embedding_top = [result['labels'][0] for result in embedding_results]
+        report = {
+            'samples': len(sequences),
+            'nli_latency_ms': nli_seconds * 1000 / len(sequences),
+            'embedding_latency_ms': embedding_seconds * 1000 / len(sequences),
+            'speedup': nli_seconds / embedding_seconds if embedding_seconds else None,
+            'top1_agreement': float(np.mean([a == b for a, b in zip(nli_top, embedding_top)]))
+        }
+        if expected is not None:
+            report['nli_accuracy'] = float(np.mean([a == b for a, b in zip(nli_top, expected)]))
+            report['embedding_accuracy'] = float(np.mean([a == b for a, b in zip(embedding_top, expected)]))
+        logger.info(f'引擎对比结果：{report}')
+        return report
+
+    def _classify_many_embedding(self, items: List[Tuple[str, list]]) -> List[dict]:
+        """按标签集分组做向量相似度分类，可选用零样本模型重排前 k 个标签"""
+        results = [{} for _ in items]
+        groups: Dict[Tuple[str, ...], List[int]] = {}
+        for index, (sequence, labels) in enumerate(items):
+            if not sequence or not labels:
+                logger.warning('输入的文本或标签为空')
+                continue
+            groups.setdefault(tuple(labels), []).append(index)
+
+        engine = self.get_embedding_engine()
+        top_k = self.rerank_top_k or None
+        for labels, indexes in groups.items():
+            batch = engine.classify_batch([items[i][0] for i in indexes], list(labels), top_k=top_k)
+            for index, result in zip(indexes, batch):
+                results[index] = result
+
+        if top_k:
+            # 重排时只对召回的前 k 个标签做零样本推理，返回结果也只包含这 k 个标签
+            indexes = [i for i, result in enumerate(results) if result]
+            reranked = self._classify_many_nli([(items[i][0], results[i]['labels']) for i in indexes])
+            for index, result in zip(indexes, reranked):
+                results[index] = result
+        return results
+
+    def _classify_many_nli(self, items: List[Tuple[str, list]]) -> List[dict]:
+        """零样本推理：所有请求的 (文本, 假设) 对被拼成填充后的张量批次，
+        每批最多 pair_batch_size 对，再按请求拆分并各自做 softmax。
+        每条文本只分词一次，假设句使用缓存的编码；同一文本的多个标签组含有相同标签时，该 (文本, 假设) 对只计算一次。
+        """
+        results = [{} for _ in items]
+        pairs = []
+        pair_index = {}
+        rows = []
+        premise_cache = {}
+        with timer(tokenize_seconds):
+            for index, (sequence, labels) in enumerate(items):
+                if not sequence or not labels:
+                    logger.warning('输入的文本或标签为空')
+                    continue
+                premise_ids = premise_cache.get(sequence)
+                if premise_ids is None:
+                    premise_ids = self.tokenizer(sequence, add_special_tokens=False)['input_ids']
+                    premise_cache[sequence] = premise_ids
+                indexes = []
+                for label, hypothesis_ids in zip(labels, self._encode_hypotheses(labels)):
+                    position = pair_index.get((sequence, label))
+                    if position is None:
+                        position = pair_index[(sequence, label)] = len(pairs)
+                        pairs.append((premise_ids, hypothesis_ids))
+                    indexes.append(position)
+                rows.append((index, indexes))
+        if not pairs:
+            return results
+
+        logger.info(f'开始批量分类，请求数：{len(rows)}，文本-假设对数：{len(pairs)}')
+        items_total.inc(len(rows))
+        pairs_total.inc(len(pairs))
+        try:
+            logits = self._forward_pairs(pairs)
+            with timer(postprocess_seconds):
+                for index, indexes in rows:
+                    sequence, labels = items[index]
+                    results[index] = self._postprocess(sequence, labels, logits[indexes])
+            logger.info('批量分类完成')
+            return results
+        except Exception as e:
+            logger.error(f'批量分类过程出错：{str(e)}')
+            raise
+
+    def _forward_pairs(self, pairs: List[Tuple[List[int], List[int]]]) -> np.ndarray:
+        """分块对已编码的 (文本, 假设) 对做前向计算，返回按输入顺序排列的 logits
+
+        按长度排序后再分块，减少每批的填充量。
+        """
+        order = sorted(range(len(pairs)), key=lambda i: len(pairs[i][0]) + len(pairs[i][1]))
+        logits = [None] * len(pairs)
+        for start in range(0, len(order), self.pair_batch_size):
+            chunk = order[start:start + self.pair_batch_size]
+            forward_pairs.observe(len(chunk))
+            with timer(tokenize_seconds):
+                inputs = self._build_inputs([pairs[i] for i in chunk])
+            with timer(forward_seconds):
+                chunk_logits = self._run_model(inputs)
+            for i, row in zip(chunk, chunk_logits):
+                logits[i] = row
+        return np.stack(logits)
+
+    def _build_inputs(self, pairs: List[Tuple[List[int], List[int]]]):
+        """拼接特殊符号并填充为张量，超长时只截断文本，保留完整假设句"""
+        encoded = [
+            self.tokenizer.prepare_for_model(
+                premise_ids,
+                hypothesis_ids,
+                truncation='only_first',
+                max_length=self.max_length
+            )
+            for premise_ids, hypothesis_ids in pairs
+        ]
+        if self.onnx_model is not None:
+            return self.tokenizer.pad(encoded, padding=True, return_tensors='np')
+        inputs = self.tokenizer.pad(encoded, padding=True, return_tensors='pt')
+        return inputs.to(self.model.device)
+
+    def _run_model(self, inputs) -> np.ndarray:
+        """按推理后端执行一次前向计算，返回 logits"""
+        if self.onnx_model is not None:
+            return self.onnx_model(inputs)
+        with torch.inference_mode():
+            return self.model(**inputs).logits.float().cpu().numpy()
+
+    def _postprocess(self, sequence: str, labels: list, logits: np.ndarray) -> dict:
+        """与 zero-shot pipeline 相同的打分规则：多标签时对蕴含 logit 做 softmax"""
+        if len(labels) == 1:
+            contradiction_id = -1 if self.entailment_id == 0 else 0
+            entail_contr = logits[:, [contradiction_id, self.entailment_id]]
+            entail_contr = np.exp(entail_contr - entail_contr.max(-1, keepdims=True))
+            scores = (entail_contr / entail_contr.sum(-1, keepdims=True))[:, 1]
+        else:
+            entail = logits[:, self.entailment_id]
+            entail = np.exp(entail - entail.max())
+            scores = entail / entail.sum()
+        order = list(reversed(scores.argsort()))
+        return {
+            'sequence': sequence,
+            'labels': [labels[i] for i in order],
+            'scores': scores[order].tolist()
+        }
+
 if __name__ == '__main__':
     # 测试代码
 
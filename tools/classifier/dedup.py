@@ -0,0 +1,212 @@
+import logging
+import re
+import threading
+import unicodedata
+import zlib
+from collections import OrderedDict
+from typing import Any, Dict, Optional, Set, Tuple
+
+import numpy as np
+
+from tools.settings import (
+    DEDUP_THRESHOLD, DEDUP_MAX_ENTRIES, DEDUP_SHINGLE_SIZE, DEDUP_NUM_PERM, DEDUP_BANDS
+)
+
+# 配置日志
+logging.basicConfig(
+    level=logging.INFO,
+    format='%(asctime)s - %(name)s - %(levelname)s - %(message)s'
+)
+logger = logging.getLogger(__name__)
+
+# MinHash 使用的梅森素数，哈希值与系数都小于它，乘积不会超出 uint64
+MERSENNE_PRIME = (1 << 31) - 1
+DIGITS = re.compile(r'\d+(?:[.,:/-]\d+)*')
+DIGIT_RUN = re.compile(r'\d+')
+IDENTIFIER = re.compile(r'<\d+>')
+SEED = 1
+# 连续数字达到该位数时视为编号（手机号、证件号、银行卡号等），占位符保留位数
+IDENTIFIER_DIGITS = 5
+# 归一化后的 n-gram 少于该数量，或数字占比超过该比例的文本不做近似重复匹配
+MIN_SHINGLES = 8
+MAX_DIGIT_RATIO = 0.5
+
+
+def _digit_placeholder(match: re.Match) -> str:
+    longest = max(len(run) for run in DIGIT_RUN.findall(match.group()))
+    return '0' if longest < IDENTIFIER_DIGITS else f'<{longest}>'
+
+
+def normalize_for_fingerprint(text: str) -> str:
+    """指纹归一化：全半角统一、转小写、去除空白，数字替换为占位符
+
+    模板化文本（通知、格式函件）通常只有姓名、金额、尾号等不同，这类短数字（含小数、千分位、日期）
+    替换为同一占位符；编号类长数字的位数是区分手机号、证件号、卡号的依据，占位符保留位数。
+    """
+    text = unicodedata.normalize('NFKC', text).lower()
+    text = DIGITS.sub(_digit_placeholder, text)
+    return ''.join(text.split())
+
+
+def digit_ratio(text: str) -> float:
+    """去除空白后数字字符所占的比例"""
+    text = ''.join(unicodedata.normalize('NFKC', text).split())
+    return sum(char.isdigit() for char in text) / len(text) if text else 0.0
+
+
+def shingles(text: str, size: int = DEDUP_SHINGLE_SIZE) -> Set[str]:
+    """字符 n-gram 集合，文本短于 n 时整段作为一个元素"""
+    if len(text) <= size:
+        return {text}
+    return {text[i:i + size] for i in range(len(text) - size + 1)}
+
+
+class MinHasher:
+    def __init__(self, num_perm: int = DEDUP_NUM_PERM, seed: int = SEED):
+        """MinHash 签名：对集合元素做 num_perm 个随机线性哈希，各取最小值
+
+        两个集合签名中相同位置取值相等的比例是二者 Jaccard 相似度的无偏估计。
+        """
+        rng = np.random.RandomState(seed)
+        self.num_perm = num_perm
+        self.a = rng.randint(1, MERSENNE_PRIME, size=num_perm, dtype=np.uint64)
+        self.b = rng.randint(0, MERSENNE_PRIME, size=num_perm, dtype=np.uint64)
+
+    def signature(self, items: Set[str]) -> np.ndarray:
+        hashes = np.fromiter(
+            (zlib.crc32(item.encode('utf-8')) % MERSENNE_PRIME for item in items),
+            dtype=np.uint64, count=len(items)
+        )
+        permuted = (hashes[:, None] * self.a + self.b) % MERSENNE_PRIME
+        return permuted.min(axis=0).astype(np.uint32)
+
+
+class NearDuplicateIndex:
+    def __init__(self, threshold: float = DEDUP_THRESHOLD, max_entries: int = DEDUP_MAX_ENTRIES,
+                 shingle_size: int = DEDUP_SHINGLE_SIZE, num_perm: int = DEDUP_NUM_PERM,
+                 bands: int = DEDUP_BANDS):
+        """近似重复文本索引（MinHash + LSH），用于复用模板化文本的分类结果
+
+        签名按 bands 段分桶，至少一段完全相同的文本才作为候选，再用完整签名估计相似度。
+        索引容量有限，超出时淘汰最久未命中的条目。命名空间（模型与标签版本）变化时清空索引。
+
+        Args:
+            threshold: 复用结果所需的最低 Jaccard 相似度
+            max_entries: 最多保存的文本数
+            shingle_size: 字符 n-gram 的长度
+            num_perm: MinHash 的哈希函数个数
+            bands: LSH 的分段数，需整除 num_perm
+        """
+        if num_perm % bands:
+            raise ValueError(f'LSH 分段数 {bands} 不能整除哈希函数个数 {num_perm}')
+        self.threshold = threshold
+        self.max_entries = max(1, max_entries)
+        self.shingle_size = shingle_size
+        self.bands = bands
+        self.rows = num_perm // bands
+        self.hasher = MinHasher(num_perm)
+        self._entries: OrderedDict = OrderedDict()
+        self._buckets: Dict[Tuple[int, bytes], Set[int]] = {}
+        self._next_id = 0
+        self._namespace = None
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.skipped = 0
+
+    def indexable(self, text: str) -> bool:
+        """过短或以数字为主的文本不做近似重复匹配：这类文本的差异集中在数字本身，指纹无法区分"""
+        normalized = normalize_for_fingerprint(text)
+        if len(normalized) - self.shingle_size + 1 < MIN_SHINGLES:
+            return False
+        return digit_ratio(text) <= MAX_DIGIT_RATIO
+
+    def fingerprint(self, text: str) -> Tuple[np.ndarray, tuple]:
+        """返回 MinHash 签名与文本中编号类数字的位数序列，位数序列不同的文本不视为重复"""
+        normalized = normalize_for_fingerprint(text)
+        return self.hasher.signature(shingles(normalized, self.shingle_size)), tuple(IDENTIFIER.findall(normalized))
+
+    def _band_keys(self, signature: np.ndarray):
+        for band in range(self.bands):
+            yield band, signature[band * self.rows:(band + 1) * self.rows].tobytes()
+
+    def _check_namespace(self, namespace: str):
+        if namespace != self._namespace:
+            if self._namespace is not None:
+                logger.info('模型或标签配置已变化，清空近似重复索引')
+            self._entries.clear()
+            self._buckets.clear()
+            self._namespace = namespace
+
+    def get(self, text: str, namespace: str = '') -> Optional[Tuple[Any, float]]:
+        """查找近似重复的已分类文本
+
+        Args:
+            text: 待分类的文本
+            namespace: 结果所属的命名空间，变化时旧条目全部失效
+
+        Returns:
+            tuple: (复用的结果, 估计的相似度)，没有足够相似的文本或文本不适合匹配时为 None
+        """
+        if not self.indexable(text):
+            with self._lock:
+                self.skipped += 1
+            return None
+        signature, shape = self.fingerprint(text)
+        with self._lock:
+            self._check_namespace(namespace)
+            candidates = set()
+            for key in self._band_keys(signature):
+                candidates.update(self._buckets.get(key, ()))
+            # 模板相同但编号类型不同（如手机号换成证件号）的文本不能复用结果
+            candidates = [entry_id for entry_id in candidates if self._entries[entry_id][2] == shape]
+            if not candidates:
+                self.misses += 1
+                return None
+            signatures = np.stack([self._entries[entry_id][0] for entry_id in candidates])
+            similarities = (signatures == signature).mean(axis=1)
+            best = int(similarities.argmax())
+            best_id, best_similarity = candidates[best], float(similarities[best])
+            if best_similarity < self.threshold:
+                self.misses += 1
+                return None
+            self._entries.move_to_end(best_id)
+            self.hits += 1
+            return self._entries[best_id][1], best_similarity
+
+    def add(self, text: str, value: Any, namespace: str = ''):
+        """记录文本及其分类结果，不适合匹配的文本不写入索引"""
+        if not self.indexable(text):
+            return
+        signature, shape = self.fingerprint(text)
+        with self._lock:
+            self._check_namespace(namespace)
+            entry_id = self._next_id
+            self._next_id += 1
+            self._entries[entry_id] = (signature, value, shape)
+            for key in self._band_keys(signature):
+                self._buckets.setdefault(key, set()).add(entry_id)
+            while len(self._entries) > self.max_entries:
+                self._evict()
+
+    def _evict(self):
+        entry_id, (signature, _, _) = self._entries.popitem(last=False)
+        for key in self._band_keys(signature):
+            bucket = self._buckets.get(key)
+            if bucket is not None:
+                bucket.discard(entry_id)
+                if not bucket:
+                    del self._buckets[key]
+
+    def stats(self) -> dict:
+        """返回命中、未命中次数与当前条目数"""
+        total = self.hits + self.misses
+        return {
+            "threshold": self.threshold,
+            "entries": len(self._entries),
+            "max_entries": self.max_entries,
+            "hits": self.hits,
+            "misses": self.misses,
+            "skipped": self.skipped,
+            "hit_rate": self.hits / total if total else 0.0
+        }
@@ -0,0 +1,140 @@
+import logging
+import os
+from typing import Dict, List, Optional, Tuple
+
+import numpy as np
+import torch
+from transformers import AutoModel, AutoTokenizer
+
+from tools.settings import EMBEDDING_MODEL_PATH, EMBEDDING_TEMPERATURE
+
+# 配置日志
+logging.basicConfig(
+    level=logging.INFO,
+    format='%(asctime)s - %(name)s - %(levelname)s - %(message)s'
+)
+logger = logging.getLogger(__name__)
+
+
+class EmbeddingEngine:
+    def __init__(self, model_path: str = EMBEDDING_MODEL_PATH, encoder=None, tokenizer=None,
+                 temperature: float = EMBEDDING_TEMPERATURE, batch_size: int = 32,
+                 max_length: int = 256):
+        """初始化向量检索式分类引擎
+
+        标签集只编码一次并缓存为归一化矩阵，输入文本编码一次，
+        通过余弦相似度一次性为全部标签打分，模型调用次数与标签数无关。
+
+        Args:
+            model_path: 句向量模型路径，不存在时使用传入的 encoder
+            encoder: 备用编码器（如零样本模型的主干网络）
+            tokenizer: 与 encoder 配套的分词器
+            temperature: 相似度转为概率时的 softmax 温度
+            batch_size: 编码时每批的文本数
+            max_length: 编码时的最大 token 数
+        """
+        self.temperature = temperature
+        self.batch_size = batch_size
+        self.max_length = max_length
+        try:
+            if model_path and os.path.exists(model_path):
+                logger.info(f'发现本地句向量模型：{model_path}')
+                self.encoder = AutoModel.from_pretrained(model_path)
+                self.tokenizer = AutoTokenizer.from_pretrained(model_path)
+            elif encoder is not None and tokenizer is not None:
+                logger.info('未找到句向量模型，使用零样本模型的主干网络编码')
+                self.encoder = encoder
+                self.tokenizer = tokenizer
+            else:
+                raise ValueError(f'模型路径不存在：{model_path}')
+            self.encoder.eval()
+            self._label_matrices: Dict[Tuple[str, ...], np.ndarray] = {}
+            logger.info('向量分类引擎初始化成功')
+        except Exception as e:
+            logger.error(f'向量分类引擎初始化失败：{str(e)}')
+            raise
+
+    def encode(self, texts: List[str]) -> np.ndarray:
+        """将文本编码为 L2 归一化的句向量（mean pooling）
+
+        Returns:
+            np.ndarray: 形状为 (len(texts), hidden_size) 的矩阵
+        """
+        vectors = []
+        for start in range(0, len(texts), self.batch_size):
+            inputs = self.tokenizer(
+                texts[start:start + self.batch_size],
+                padding=True,
+                truncation=True,
+                max_length=self.max_length,
+                return_tensors='pt'
+            ).to(self.encoder.device)
+            with torch.inference_mode():
+                hidden = self.encoder(**inputs).last_hidden_state
+            mask = inputs['attention_mask'].unsqueeze(-1).to(hidden.dtype)
+            pooled = (hidden * mask).sum(1) / mask.sum(1).clamp(min=1)
+            vectors.append(pooled.float().cpu().numpy())
+        matrix = np.concatenate(vectors, axis=0)
+        norms = np.linalg.norm(matrix, axis=1, keepdims=True)
+        return matrix / np.maximum(norms, 1e-12)
+
+    def label_matrix(self, labels: list) -> np.ndarray:
+        """返回标签集的向量矩阵，同一标签集只编码一次"""
+        key = tuple(labels)
+        matrix = self._label_matrices.get(key)
+        if matrix is None:
+            matrix = self.encode(list(labels))
+            self._label_matrices[key] = matrix
+        return matrix
+
+    def score(self, sequences: List[str], labels: list) -> np.ndarray:
+        """计算每条文本与每个标签的余弦相似度
+
+        Returns:
+            np.ndarray: 形状为 (len(sequences), len(labels)) 的相似度矩阵
+        """
+        return self.encode(sequences) @ self.label_matrix(labels).T
+
+    def classify_batch(self, sequences: List[str], labels: list,
+                       top_k: Optional[int] = None) -> List[dict]:
+        """对多条文本按相似度分类，分数为相似度经温度 softmax 后的概率
+
+        Args:
+            sequences: 待分类的文本列表
+            labels: 标签列表
+            top_k: 只返回得分最高的前 k 个标签，默认返回全部
+
+        Returns:
+            list: 与 sequences 一一对应的分类结果，格式同 txtClassifier.classify
+        """
+        similarity = self.score(sequences, labels) / self.temperature
+        similarity -= similarity.max(axis=1, keepdims=True)
+        probabilities = np.exp(similarity)
+        probabilities /= probabilities.sum(axis=1, keepdims=True)
+        results = []
+        for sequence, row in zip(sequences, probabilities):
+            order = np.argsort(-row)[:top_k]
+            results.append({
+                'sequence': sequence,
+                'labels': [labels[i] for i in order],
+                'scores': row[order].tolist()
+            })
+        return results
+
+if __name__ == '__main__':
+    # 对比零样本推理与向量引擎：python -m tools.classifier.embedding
+    from tools.classifier.classifier import txtClassifier
+    from tools.default_labels import text_labels
+
+    classifier = txtClassifier()
+    test_sequences = [
+        '请提供您的身份证号码和户籍所在地',
+        '本季度营业收入同比增长12%，净利润率保持稳定',
+        '数据库连接串：host=10.0.0.1 user=admin password=******',
+        '患者主诉头痛三天，既往有高血压病史'
+    ]
+    expected = ['个人身份信息', '财务报表', '系统配置', '医疗健康信息']
+    report = classifier.compare_engines(test_sequences, text_labels, expected=expected)
+    print('\n引擎对比结果:')
+    for key, value in report.items():
+        print(f'{key}: {value}')
@@ -0,0 +1,191 @@
+import logging
+import re
+import threading
+import unicodedata
+from collections import deque
+from typing import Dict, List, Optional, Tuple
+
+import pandas as pd
+
+from tools.prefilter_rules import PREFILTER_RULES
+from tools.scanner.detectors import DETECTORS, Detector
+from tools.settings import PREFILTER_CONFIDENCE, PREFILTER_MAX_CHARS
+
+# 配置日志
+logging.basicConfig(
+    level=logging.INFO,
+    format='%(asctime)s - %(name)s - %(levelname)s - %(message)s'
+)
+logger = logging.getLogger(__name__)
+
+# 预分类的层级：关键词、正则；都未命中的请求交给模型
+TIERS = ('keyword', 'regex', 'model')
+# 在文本中查找检测器候选值时，要求前后不是数字或字母，避免截取更长数字串的一部分
+BOUNDARY = r'(?<![0-9A-Za-z]){}(?![0-9A-Za-z])'
+
+
+def normalize_for_matching(text: str) -> str:
+    """关键词匹配前的归一化：全半角统一并转小写"""
+    return unicodedata.normalize('NFKC', text).lower()
+
+
+class KeywordAutomaton:
+    def __init__(self, keywords: Dict[str, str]):
+        """Aho-Corasick 多模式匹配自动机，一次扫描找出文本中出现的全部关键词
+
+        Args:
+            keywords: 关键词 -> 标签
+        """
+        self._goto: List[Dict[str, int]] = [{}]
+        self._fail: List[int] = [0]
+        self._output: List[List[Tuple[str, str]]] = [[]]
+        for keyword, label in keywords.items():
+            self._insert(normalize_for_matching(keyword), keyword, label)
+        self._build_fail_links()
+
+    def _insert(self, pattern: str, keyword: str, label: str):
+        state = 0
+        for char in pattern:
+            if char not in self._goto[state]:
+                self._goto.append({})
+                self._fail.append(0)
+                self._output.append([])
+                self._goto[state][char] = len(self._goto) - 1
+            state = self._goto[state][char]
+        self._output[state].append((keyword, label))
+
+    def _build_fail_links(self):
+        queue = deque(self._goto[0].values())
+        while queue:
+            state = queue.popleft()
+            for char, child in self._goto[state].items():
+                queue.append(child)
+                fail = self._fail[state]
+                while fail and char not in self._goto[fail]:
+                    fail = self._fail[fail]
+                self._fail[child] = self._goto[fail].get(char, 0)
+                self._output[child] = self._output[child] + self._output[self._fail[child]]
+
+    def find(self, text: str) -> List[Tuple[str, str]]:
+        """返回文本中出现的 (关键词, 标签)，按出现位置排列"""
+        matches = []
+        state = 0
+        for char in normalize_for_matching(text):
+            while state and char not in self._goto[state]:
+                state = self._fail[state]
+            state = self._goto[state].get(char, 0)
+            matches.extend(self._output[state])
+        return matches
+
+
+class RegexRule:
+    def __init__(self, label: str, pattern: Optional[str] = None, detector: Optional[str] = None):
+        """正则规则：自定义正则，或引用表格扫描的检测器（在文本中查找候选值后做校验位检查）"""
+        self.label = label
+        self.detector: Optional[Detector] = None
+        if detector is not None:
+            detectors = {item.name: item for item in DETECTORS}
+            if detector not in detectors:
+                raise ValueError(f'未知的检测器：{detector}')
+            self.detector = detectors[detector]
+            pattern = BOUNDARY.format(self.detector.pattern)
+        if not pattern:
+            raise ValueError(f'正则规则缺少 pattern 或 detector：{label}')
+        self.name = detector or pattern
+        self.regex = re.compile(pattern)
+
+    def search(self, text: str) -> bool:
+        if self.detector is None:
+            return self.regex.search(text) is not None
+        candidates = [match.group(0) for match in self.regex.finditer(text)]
+        return bool(candidates) and bool(self.detector.match(pd.Series(candidates, dtype=object)).any())
+
+
+class RulePrefilter:
+    def __init__(self, rules: dict = PREFILTER_RULES, confidence: float = PREFILTER_CONFIDENCE,
+                 max_chars: int = PREFILTER_MAX_CHARS):
+        """规则预分类：关键词自动机与正则依次匹配，命中且无歧义时直接给出标签
+
+        同一层级命中多个不同标签时视为有歧义，交给模型分类；关键词有歧义时不再尝试正则。
+
+        Args:
+            rules: 接口类型 -> {"keywords": {标签: [关键词]}, "regexes": [{"label", "pattern" 或 "detector"}]}
+            confidence: 规则命中时返回的固定置信度
+            max_chars: 超过该字符数的文本不做预分类，0 表示不限制
+        """
+        self.confidence = confidence
+        self.max_chars = max_chars
+        self._automata: Dict[str, KeywordAutomaton] = {}
+        self._regexes: Dict[str, List[RegexRule]] = {}
+        for kind, config in rules.items():
+            keywords = {
+                keyword: label
+                for label, words in config.get('keywords', {}).items() for keyword in words
+            }
+            self._automata[kind] = KeywordAutomaton(keywords)
+            self._regexes[kind] = [RegexRule(**rule) for rule in config.get('regexes', [])]
+            logger.info(f'规则预分类 {kind}：{len(keywords)} 个关键词，{len(self._regexes[kind])} 条正则')
+        self._counts = {kind: dict.fromkeys(TIERS, 0) for kind in rules}
+        self._lock = threading.Lock()
+
+    def classify(self, kind: str, sequence: str, labels: list) -> Optional[dict]:
+        """尝试用规则分类
+
+        Args:
+            kind: 接口类型，如 'txt'、'csv'
+            sequence: 待分类的文本
+            labels: 标签列表，规则给出的标签不在其中时不生效
+
+        Returns:
+            dict: 格式同 txtClassifier.classify，另含 tier（命中的层级）与 matches（命中的规则）；
+                未命中或有歧义时为 None
+        """
+        if kind not in self._automata or not sequence:
+            return None
+        result = None
+        if not self.max_chars or len(sequence) <= self.max_chars:
+            result = self._match(kind, sequence, labels)
+        self._record(kind, result['tier'] if result else 'model')
+        return result
+
+    def _match(self, kind: str, sequence: str, labels: list) -> Optional[dict]:
+        keywords = self._automata[kind].find(sequence)
+        if keywords:
+            return self._resolve(sequence, labels, 'keyword', keywords)
+        regexes = [(rule.name, rule.label) for rule in self._regexes[kind] if rule.search(sequence)]
+        if regexes:
+            return self._resolve(sequence, labels, 'regex', regexes)
+        return None
+
+    def _resolve(self, sequence: str, labels: list, tier: str, matches: List[Tuple[str, str]]) -> Optional[dict]:
+        matched_labels = {label for _, label in matches}
+        if len(matched_labels) != 1:
+            return None
+        label = matched_labels.pop()
+        if label not in labels:
+            return None
+        return {
+            'sequence': sequence,
+            'labels': [label],
+            'scores': [self.confidence],
+            'tier': tier,
+            'matches': sorted({name for name, _ in matches})
+        }
+
+    def _record(self, kind: str, tier: str):
+        with self._lock:
+            self._counts[kind][tier] += 1
+
+    def stats(self) -> dict:
+        """返回每种接口各层级处理的请求数与占比"""
+        with self._lock:
+            counts = {kind: dict(tiers) for kind, tiers in self._counts.items()}
+        report = {}
+        for kind, tiers in counts.items():
+            total = sum(tiers.values())
+            report[kind] = {
+                "total": total,
+                "tiers": {tier: {"count": count, "rate": count / total if total else 0.0}
+                          for tier, count in tiers.items()}
+            }
+        return report
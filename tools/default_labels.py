@@ -212,6 +212,126 @@ table_data_labels = [
     "人力资源数据"
 ]
 
+# 标签描述：级联模式的字符 n-gram 初筛用标签名加描述中的关键词为标签打分，未配置描述的标签只使用标签名
+label_descriptions = {
+    # 文本分类（"个人身份信息" 与表格数据标签同名，见下方）
+    "联系方式": "手机号 电话 邮箱 微信 QQ 联系人 通讯地址",
+    "财务信息": "银行卡 账号 余额 收入 工资 转账 信用卡 交易流水",
+    "医疗健康信息": "病历 诊断 病史 处方 体检 患者 症状 用药",
+    "工作履历": "工作经历 职位 任职 离职 入职 简历 单位",
+    "教育背景": "学历 学位 毕业院校 专业 入学 成绩",
+    "家庭信息": "配偶 子女 父母 婚姻 家庭成员 亲属",
+    "地址位置": "住址 地址 省 市 区 街道 门牌 定位 经纬度",
+    "密码凭证": "密码 口令 密钥 私钥 令牌 token 验证码 凭证",
+    "法律文件": "起诉书 判决书 裁定 仲裁 律师函 诉讼",
+    "合同协议": "合同 协议 甲方 乙方 条款 签署 违约",
+    "商业机密": "机密 保密 核心技术 配方 定价策略 未公开",
+    "技术文档": "设计文档 架构 接口 技术方案 规格说明",
+    "会议记录": "会议纪要 参会人员 议题 决议 会议时间",
+    "邮件通信": "发件人 收件人 抄送 主题 邮件 附件",
+    "聊天记录": "聊天 消息 群聊 对话 回复",
+    "社交媒体内容": "微博 朋友圈 点赞 评论 转发 粉丝 话题",
+    "新闻文章": "新闻 记者 报道 据悉 消息称 发布会",
+    "学术论文": "摘要 关键词 引言 参考文献 实验 研究方法",
+    "产品说明": "产品介绍 功能 规格 参数 型号 适用",
+    "用户手册": "使用说明 安装 步骤 注意事项 常见问题",
+    "政策文件": "通知 意见 办法 实施方案 政策 印发",
+    "法规条文": "第一条 条例 法律 规定 法规 违反 处罚",
+    "财务报表": "资产负债表 利润表 现金流量表 营业收入 净利润 报表",
+    "审计报告": "审计 审计意见 会计师事务所 内部控制 审计发现",
+    "研发资料": "研发 实验数据 原型 专利 测试报告 算法",
+    "客户资料": "客户名单 客户信息 客户编号 购买记录 会员",
+    "供应商信息": "供应商 采购 报价 供货 账期 资质",
+    "市场分析": "市场规模 份额 趋势 用户调研 增长率",
+    "竞争情报": "竞争对手 竞品 对标 竞争格局 情报",
+    "培训材料": "培训 课程 课件 讲师 考核 学员",
+    "操作手册": "操作步骤 操作流程 运维 点击 菜单",
+    "安全规程": "安全规定 安全操作 防护 禁止 安全责任",
+    "应急预案": "应急 预案 突发事件 应急响应 处置 演练",
+    "日志记录": "日志 时间戳 INFO WARN 访问日志 记录",
+    "系统配置": "配置项 参数 host port 数据库连接 服务器",
+    "代码注释": "注释 函数 参数说明 返回值 TODO",
+    "API文档": "接口地址 请求方法 GET POST 请求参数 响应 状态码",
+    "数据库结构": "表结构 字段 主键 索引 外键 建表 CREATE TABLE",
+    "网络配置": "IP 子网掩码 网关 DNS 路由 防火墙 VLAN",
+    "备份文件": "备份 还原 快照 归档 bak",
+    "临时文件": "临时 tmp 缓存目录 自动生成",
+    "缓存数据": "缓存 cache 过期时间 命中",
+    "元数据": "元数据 创建时间 修改时间 作者 文件大小 格式",
+    "配置文件": "yaml json ini conf properties 配置",
+    "脚本文件": "脚本 shell python bash 执行",
+    "批处理文件": "批处理 bat cmd 定时任务",
+    "环境变量": "环境变量 PATH export env",
+    "系统信息": "操作系统 版本 CPU 内存 磁盘 主机名",
+    "错误日志": "错误 异常 报错 ERROR Exception 堆栈 失败",
+    # 表格数据分类
+    "个人基本资料": "姓名 性别 年龄 出生日期 民族 国籍 手机号 邮箱 住址",
+    "个人身份信息": "身份证号 证件类型 证件号码 护照号 户籍 社保号 出生日期 民族",
+    "个人健康生理信息": "病历 诊断 病史 过敏史 血型 身高 体重 体检 用药",
+    "个人教育工作信息": "学历 学位 毕业院校 专业 工作单位 职位 职称 工号 入职",
+    "个人财产信息": "银行卡号 账户 余额 存款 房产 车辆 收入 信用卡 资产",
+    "个人通信信息": "通话记录 短信 通讯录 聊天记录 主叫 被叫 通话时长",
+    "联系人信息": "联系人 紧急联系人 关系 联系人电话 亲属",
+    "个人上网记录": "浏览记录 访问网址 url 搜索记录 点击 访问时间 登录日志",
+    "个人常用设备信息": "设备号 IMEI MAC 地址 设备型号 操作系统 设备标识 IDFA",
+    "个人位置信息": "经度 纬度 定位 轨迹 位置 GPS 行程",
+    "银行业务数据": "存款 贷款 账户 开户 网点 柜员 流水 利率 放款",
+    "证券业务数据": "股票 证券代码 持仓 委托 成交 股东 基金 交易所",
+    "保险业务数据": "保单号 投保人 被保险人 保费 理赔 险种 保额",
+    "金融科技业务数据": "支付 钱包 第三方支付 风控 信用评分 数字货币 聚合支付",
+    "信托与租赁业务数据": "信托 受益人 租赁 租金 融资租赁 信托计划",
+    "风险投资与私募股权数据": "投资 融资轮次 估值 私募 基金 LP GP 投资标的",
+    "公安司法数据": "案件 案由 嫌疑人 判决 立案 警情 执行 法院",
+    "市场监管数据": "营业执照 统一社会信用代码 企业登记 抽检 投诉 商标",
+    "税务财政数据": "纳税人识别号 税额 发票 税种 申报 财政预算 退税",
+    "民政社保数据": "社保 养老保险 医保 低保 婚姻登记 参保 缴费基数",
+    "卫生健康数据": "疫苗 传染病 卫生监督 疾控 接种 公共卫生",
+    "教育科研数据": "学生 学号 班级 考试 成绩 课题 科研项目 论文",
+    "自然资源与环保数据": "土地 矿产 排放 监测 污染 水质 空气质量 林地",
+    "城市管理数据": "城管 市政 路灯 井盖 违建 垃圾清运 停车",
+    "应急管理数据": "应急 灾害 救援 安全生产 事故 隐患 物资储备",
+    "国家统计": "统计 普查 指标 GDP 人口 统计年鉴 抽样调查",
+    "电子与半导体数据": "芯片 晶圆 良率 封装 半导体 电路 器件",
+    "重工与装备制造数据": "设备 机床 装备 生产线 工艺 零部件 工单",
+    "化工与新材料数据": "化工 配方 原料 反应 材料 纯度 危化品",
+    "原材料与采矿数据": "矿石 采矿 品位 矿区 钢材 原材料 产量",
+    "整车研发与制造数据": "整车 车型 VIN 底盘 发动机 总装 车辆识别代号",
+    "销售与分销数据": "销售订单 经销商 渠道 销量 分销 提货",
+    "汽车售后市场数据": "维修 保养 配件 工单 4S 里程 索赔",
+    "车联网与智能驾驶数据": "车辆轨迹 车速 自动驾驶 传感器 雷达 车载终端",
+    "客运服务数据": "旅客 乘客 车票 航班 列车 座位 购票 乘车",
+    "货运与物流数据": "运单号 快递 收件人 寄件人 物流 配送 货物 包裹",
+    "仓储服务数据": "仓库 库位 入库 出库 库存 盘点 货架",
+    "出行服务数据": "打车 网约车 司机 订单 上车点 下车点 共享单车",
+    "电力行业数据": "电表 用电量 电费 供电 电网 户号 负荷",
+    "石油天然气数据": "油井 原油 天然气 管道 加油站 炼油 气量",
+    "水务行业数据": "水表 用水量 水费 供水 污水 管网",
+    "新能源数据": "光伏 风电 储能 充电桩 电池 发电量",
+    "线上电商数据": "订单号 商品 sku 购物车 收货地址 店铺 买家 评价",
+    "线下零售数据": "门店 收银 小票 会员卡 POS 促销 货架",
+    "快速消费品数据": "快消 品牌 批次 经销 铺货 终端 饮料 日化",
+    "医疗机构数据": "医院 科室 挂号 门诊 住院号 医生 处方 检查报告",
+    "生命科学与制药数据": "药品 临床试验 受试者 基因 批号 制药 化合物",
+    "医疗器械数据": "医疗器械 注册证 型号 不良事件 器械",
+    "健康管理数据": "健康档案 体检 心率 血压 睡眠 运动 步数",
+    "地产开发与销售数据": "楼盘 房源 房号 户型 面积 购房 认购 售价",
+    "建筑工程数据": "工程 施工 图纸 项目 标段 监理 验收",
+    "物业管理数据": "业主 物业费 房号 报修 停车位 小区",
+    "新闻出版数据": "稿件 作者 出版 书号 ISBN 编辑 发行",
+    "广播影视与流媒体数据": "影片 剧集 播放量 节目 点播 频道 版权",
+    "游戏产业数据": "玩家 角色 游戏 充值 道具 关卡 服务器 账号",
+    "体育产业数据": "运动员 赛事 比赛 比分 场馆 俱乐部 门票",
+    "酒店住宿数据": "入住 退房 房间号 酒店 预订 宾客 住宿",
+    "餐饮行业数据": "菜品 点餐 桌号 外卖 餐厅 菜单 堂食",
+    "旅游服务数据": "游客 景区 门票 行程 线路 导游 旅行社",
+    "种植业数据": "作物 种植面积 亩产 播种 农田 施肥 品种",
+    "畜牧业数据": "养殖 牲畜 存栏 出栏 饲料 防疫 耳标",
+    "渔业/水产养殖数据": "水产 渔船 捕捞 养殖塘 鱼苗 渔获",
+    "法律服务数据": "律师 委托人 案件 律所 代理 合同审查",
+    "咨询与审计数据": "审计 咨询 项目 底稿 客户 审计意见",
+    "人力资源数据": "员工 工号 部门 薪资 考勤 绩效 招聘 入职 离职",
+}
+
 
 
 # 统一安全矩阵 - 包含所有类型的分类数据
@@ -419,6 +539,25 @@ unified_security_matrix = {
     "人力资源数据": {"低风险等级": 3, "中风险等级": 4, "高风险等级": 4}
 }
 
+# 组合标签的分隔符，如 "信息查询 - 金融服务" 由意图和行业两部分组成
+LABEL_SEPARATOR = " - "
+
+def split_label_factors(labels, separator=LABEL_SEPARATOR):
+    """将组合标签拆分为两组因子标签（按首次出现的顺序去重）
+
+    仅当每个标签都恰好包含一个分隔符时可拆分，否则返回 None
+    """
+    heads, tails = [], []
+    for label in labels:
+        parts = label.split(separator)
+        if len(parts) != 2 or not all(part.strip() for part in parts):
+            return None
+        if parts[0] not in heads:
+            heads.append(parts[0])
+        if parts[1] not in tails:
+            tails.append(parts[1])
+    return heads, tails
+
 # 获取所有标签的函数
 def get_all_labels():
     """返回所有类型的分类标签"""
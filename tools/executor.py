@@ -0,0 +1,93 @@
+import asyncio
+import functools
+import logging
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+from tools.settings import INFER_RETRY_AFTER
+
+# 配置日志
+logging.basicConfig(
+    level=logging.INFO,
+    format='%(asctime)s - %(name)s - %(levelname)s - %(message)s'
+)
+logger = logging.getLogger(__name__)
+
+
+class InferenceQueueFull(RuntimeError):
+    def __init__(self, name: str, retry_after: int = INFER_RETRY_AFTER):
+        """推理队列已满，调用方应稍后重试
+
+        Args:
+            name: 执行器名称
+            retry_after: 建议的重试等待秒数
+        """
+        super().__init__(f'推理队列已满：{name}')
+        self.name = name
+        self.retry_after = retry_after
+
+
+class InferenceExecutor:
+    def __init__(self, name: str, max_workers: int = 1, max_queue: int = 16,
+                 retry_after: int = INFER_RETRY_AFTER):
+        """初始化推理执行器
+
+        阻塞的模型推理在独立线程池中运行，不占用事件循环。
+        正在执行与排队的任务总数超过 max_workers + max_queue 时
+        立即抛出 InferenceQueueFull，而不是无限排队。
+
+        Args:
+            name: 执行器名称，用于日志和统计
+            max_workers: 并发执行的推理任务数
+            max_queue: 允许排队等待的任务数
+            retry_after: 队列满时建议的重试等待秒数
+        """
+        self.name = name
+        self.max_workers = max(1, max_workers)
+        self.max_queue = max(0, max_queue)
+        self.retry_after = retry_after
+        self._pool = ThreadPoolExecutor(max_workers=self.max_workers,
+                                        thread_name_prefix=f'infer-{name}')
+        self._pending = 0
+        self._rejected = 0
+        self._lock = threading.Lock()
+
+    async def run(self, fn, *args, **kwargs):
+        """在线程池中执行 fn(*args, **kwargs) 并等待结果
+
+        Raises:
+            InferenceQueueFull: 执行器已满
+        """
+        with self._lock:
+            if self._pending >= self.max_workers + self.max_queue:
+                self._rejected += 1
+                logger.warning(f'推理队列已满：{self.name}，当前任务数：{self._pending}')
+                raise InferenceQueueFull(self.name, self.retry_after)
+            self._pending += 1
+        try:
+            future = self._pool.submit(functools.partial(fn, *args, **kwargs))
+        except Exception:
+            self._release()
+            raise
+        # 以线程池任务真正结束为准释放名额，调用方取消等待不会提前释放
+        future.add_done_callback(lambda _: self._release())
+        return await asyncio.wrap_future(future)
+
+    def stats(self) -> dict:
+        """返回并发数、排队上限、当前任务数与拒绝次数"""
+        with self._lock:
+            pending, rejected = self._pending, self._rejected
+        return {
+            "max_workers": self.max_workers,
+            "max_queue": self.max_queue,
+            "pending": pending,
+            "rejected": rejected
+        }
+
+    def shutdown(self, wait: bool = True):
+        """关闭线程池"""
+        self._pool.shutdown(wait=wait)
+
+    def _release(self):
+        with self._lock:
+            self._pending -= 1
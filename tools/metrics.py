@@ -0,0 +1,267 @@
+import bisect
+import threading
+import time
+from contextlib import contextmanager
+from typing import Any, Callable, Dict, Iterable, Iterator, List, Sequence, Tuple
+
+# 默认分桶：批大小（条）与等待时间（秒）
+SIZE_BUCKETS = (1, 2, 4, 8, 16, 32, 64)
+LATENCY_BUCKETS = (0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+
+
+class Histogram:
+    def __init__(self, name: str, buckets: Sequence[float] = LATENCY_BUCKETS):
+        """线程安全的累积直方图
+
+        Args:
+            name: 指标名称
+            buckets: 升序排列的分桶上界，最后自动追加 +Inf
+        """
+        self.name = name
+        self.buckets = tuple(sorted(buckets))
+        self._counts = [0] * (len(self.buckets) + 1)
+        self._sum = 0.0
+        self._count = 0
+        self._lock = threading.Lock()
+
+    def observe(self, value: float):
+        """记录一个观测值"""
+        index = bisect.bisect_left(self.buckets, value)
+        with self._lock:
+            self._counts[index] += 1
+            self._sum += value
+            self._count += 1
+
+    def snapshot(self) -> dict:
+        """返回累积分桶计数、总数和总和"""
+        with self._lock:
+            counts = list(self._counts)
+            total, count = self._sum, self._count
+        cumulative = {}
+        running = 0
+        for bound, bucket_count in zip(self.buckets + (float('inf'),), counts):
+            running += bucket_count
+            cumulative['+Inf' if bound == float('inf') else str(bound)] = running
+        return {
+            "buckets": cumulative,
+            "count": count,
+            "sum": total
+        }
+
+
+class Counter:
+    def __init__(self, name: str):
+        """线程安全的单调递增计数器"""
+        self.name = name
+        self._value = 0.0
+        self._lock = threading.Lock()
+
+    def inc(self, amount: float = 1):
+        with self._lock:
+            self._value += amount
+
+    @property
+    def value(self) -> float:
+        return self._value
+
+
+class MetricFamily:
+    def __init__(self, name: str, kind: str, help: str, labelnames: Sequence[str], factory: Callable[[], Any]):
+        """同名指标按标签值区分的一组子指标
+
+        Args:
+            name: 指标名称
+            kind: 'counter'、'gauge' 或 'histogram'
+            help: 指标说明
+            labelnames: 标签名
+            factory: 创建子指标的函数
+        """
+        self.name = name
+        self.kind = kind
+        self.help = help
+        self.labelnames = tuple(labelnames)
+        self._factory = factory
+        self._children: Dict[tuple, Any] = {}
+        self._lock = threading.Lock()
+
+    def labels(self, *values) -> Any:
+        """返回标签值对应的子指标（Counter 或 Histogram），首次使用时创建"""
+        values = tuple(str(value) for value in values)
+        child = self._children.get(values)
+        if child is None:
+            if len(values) != len(self.labelnames):
+                raise ValueError(f'指标 {self.name} 需要标签 {self.labelnames}，实际为 {values}')
+            with self._lock:
+                child = self._children.setdefault(values, self._factory())
+        return child
+
+    def samples(self) -> List[Tuple[tuple, Any]]:
+        with self._lock:
+            return list(self._children.items())
+
+
+class CallbackMetric:
+    def __init__(self, name: str, kind: str, help: str, labelnames: Sequence[str],
+                 callback: Callable[[], Iterable[Tuple[tuple, float]]]):
+        """导出时才调用 callback 读取的指标，用于已有统计（缓存命中次数、队列长度等）
+
+        callback 返回 (标签值, 数值) 列表，读取失败时该指标不输出
+        """
+        self.name = name
+        self.kind = kind
+        self.help = help
+        self.labelnames = tuple(labelnames)
+        self.callback = callback
+
+    def samples(self) -> List[Tuple[tuple, float]]:
+        return [(tuple(str(value) for value in values), value) for values, value in self.callback()]
+
+
+class MetricsRegistry:
+    def __init__(self):
+        """指标注册表，按名称复用已创建的指标，并以 Prometheus 文本格式导出"""
+        self._metrics: Dict[str, Any] = {}
+        self._lock = threading.Lock()
+
+    def counter(self, name: str, help: str, labelnames: Sequence[str] = ()) -> MetricFamily:
+        return self._family(name, 'counter', help, labelnames, lambda: Counter(name))
+
+    def histogram(self, name: str, help: str, labelnames: Sequence[str] = (),
+                  buckets: Sequence[float] = LATENCY_BUCKETS) -> MetricFamily:
+        return self._family(name, 'histogram', help, labelnames, lambda: Histogram(name, buckets))
+
+    def callback(self, name: str, kind: str, help: str, labelnames: Sequence[str],
+                 callback: Callable[[], Iterable[Tuple[tuple, float]]]) -> CallbackMetric:
+        """注册回调指标，同名指标重复注册时替换为新的回调"""
+        metric = CallbackMetric(name, kind, help, labelnames, callback)
+        with self._lock:
+            self._metrics[name] = metric
+        return metric
+
+    def _family(self, name: str, kind: str, help: str, labelnames: Sequence[str],
+                factory: Callable[[], Any]) -> MetricFamily:
+        with self._lock:
+            metric = self._metrics.get(name)
+            if metric is None:
+                metric = self._metrics[name] = MetricFamily(name, kind, help, labelnames, factory)
+            elif metric.kind != kind or metric.labelnames != tuple(labelnames):
+                raise ValueError(f'指标 {name} 已注册为 {metric.kind}{metric.labelnames}')
+            return metric
+
+    def render(self) -> str:
+        """按 Prometheus 文本格式（0.0.4）输出所有指标"""
+        with self._lock:
+            metrics = sorted(self._metrics.values(), key=lambda metric: metric.name)
+        lines = []
+        for metric in metrics:
+            try:
+                samples = metric.samples()
+            except Exception:
+                continue
+            lines.append(f'# HELP {metric.name} {_escape_help(metric.help)}')
+            lines.append(f'# TYPE {metric.name} {metric.kind}')
+            for values, child in sorted(samples, key=lambda sample: sample[0]):
+                labels = list(zip(metric.labelnames, values))
+                if metric.kind == 'histogram':
+                    snapshot = child.snapshot()
+                    for bound, count in snapshot['buckets'].items():
+                        lines.append(f'{metric.name}_bucket{_format_labels(labels + [("le", bound)])} {count}')
+                    lines.append(f'{metric.name}_sum{_format_labels(labels)} {_format_value(snapshot["sum"])}')
+                    lines.append(f'{metric.name}_count{_format_labels(labels)} {snapshot["count"]}')
+                else:
+                    value = child.value if isinstance(child, Counter) else child
+                    lines.append(f'{metric.name}{_format_labels(labels)} {_format_value(value)}')
+        return '\n'.join(lines) + '\n'
+
+
+def _escape_help(text: str) -> str:
+    return text.replace('\\', '\\\\').replace('\n', '\\n')
+
+
+def _escape_label(value: str) -> str:
+    return value.replace('\\', '\\\\').replace('"', '\\"').replace('\n', '\\n')
+
+
+def _format_labels(labels: List[Tuple[str, str]]) -> str:
+    if not labels:
+        return ''
+    return '{' + ','.join(f'{name}="{_escape_label(value)}"' for name, value in labels) + '}'
+
+
+def _format_value(value: float) -> str:
+    if value == float('inf'):
+        return '+Inf'
+    if float(value).is_integer():
+        return str(int(value))
+    return repr(float(value))
+
+
+@contextmanager
+def timer(histogram: Histogram):
+    """记录 with 代码块的耗时（秒），代码块抛出异常时同样记录"""
+    start = time.perf_counter()
+    try:
+        yield
+    finally:
+        histogram.observe(time.perf_counter() - start)
+
+
+def timed_iter(iterable: Iterable, histogram: Histogram) -> Iterator:
+    """逐个产出 iterable 的元素，并把每次取下一个元素的耗时累加后记录为一次观测，适合惰性解码的生成器"""
+    iterator = iter(iterable)
+    elapsed = 0.0
+    try:
+        while True:
+            start = time.perf_counter()
+            try:
+                item = next(iterator)
+            except StopIteration:
+                elapsed += time.perf_counter() - start
+                return
+            elapsed += time.perf_counter() - start
+            yield item
+    finally:
+        histogram.observe(elapsed)
+        close = getattr(iterator, 'close', None)
+        if close is not None:
+            close()
+
+
+class RequestMetricsMiddleware:
+    def __init__(self, app, histogram: MetricFamily):
+        """ASGI 中间件：按路由模板和状态码记录请求耗时，流式响应记录到响应体发送完毕为止
+
+        Args:
+            app: ASGI 应用
+            histogram: 标签为 (endpoint, status) 的直方图
+        """
+        self.app = app
+        self.histogram = histogram
+
+    async def __call__(self, scope, receive, send):
+        if scope['type'] != 'http':
+            await self.app(scope, receive, send)
+            return
+        start = time.perf_counter()
+        status = [500]
+
+        async def send_with_status(message):
+            if message['type'] == 'http.response.start':
+                status[0] = message['status']
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_with_status)
+        finally:
+            # 路由匹配后 FastAPI 在 scope 中写入 route，使用路由模板避免标签基数随路径增长
+            route = scope.get('route')
+            endpoint = getattr(route, 'path', 'unmatched')
+            self.histogram.labels(endpoint, status[0]).observe(time.perf_counter() - start)
+
+
+# 进程内的全局指标注册表，由 /metrics 接口导出
+registry = MetricsRegistry()
+# 模型内部各阶段耗时：文本分类的分词、前向计算和后处理，图像的解码、预处理和生成描述，音频的解码和语音识别
+model_stage_seconds = registry.histogram(
+    'model_stage_seconds', '模型内部各阶段的耗时（秒）', ('model', 'stage')
+)
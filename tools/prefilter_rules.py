@@ -0,0 +1,39 @@
+# 规则预分类配置：命中无歧义的关键词或正则时直接给出标签，不再调用零样本模型
+# 标签须取自 default_labels.py 中对应的标签集；文本命中多个不同标签的规则时视为有歧义，交给模型分类
+
+# 文本分类（text_labels）
+txt_keyword_rules = {
+    "个人身份信息": ["身份证号", "身份证号码", "居民身份证", "护照号码", "军官证号", "社会保障号"],
+    "联系方式": ["手机号", "手机号码", "联系电话", "电子邮箱", "邮箱地址", "微信号"],
+    "财务信息": ["银行卡号", "银行账号", "信用卡号", "开户行", "账户余额"],
+    "医疗健康信息": ["病历", "病历号", "诊断结果", "既往病史", "处方单", "体检报告"],
+    "密码凭证": ["登录密码", "支付密码", "access_key", "secret_key", "私钥", "口令"],
+}
+
+# 正则规则：detector 引用 tools/scanner/detectors.py 中的检测器（正则加校验位），pattern 为自定义正则
+txt_regex_rules = [
+    {"label": "个人身份信息", "detector": "id_card"},
+    {"label": "财务信息", "detector": "bank_card"},
+    {"label": "联系方式", "detector": "phone"},
+    {"label": "联系方式", "detector": "email"},
+]
+
+# 表格分类（table_data_labels），匹配表名、表头或列名
+csv_keyword_rules = {
+    "个人身份信息": ["身份证号", "身份证号码", "证件号码", "护照号码"],
+    "个人财产信息": ["银行卡号", "银行账号", "信用卡号", "账户余额"],
+    "个人健康生理信息": ["病历", "病历号", "诊断结果", "既往病史", "过敏史"],
+    "个人通信信息": ["通话记录", "短信内容"],
+    "个人位置信息": ["经纬度", "定位信息", "行动轨迹"],
+}
+
+csv_regex_rules = [
+    # 常见的拼音缩写与英文列名
+    {"label": "个人身份信息", "pattern": r"(?i)(?<![a-z])(?:sfzh|id_?card(?:_?no)?|id_?number)(?![a-z])"},
+    {"label": "个人财产信息", "pattern": r"(?i)(?<![a-z])(?:yhkh|bank_?card(?:_?no)?|card_?no)(?![a-z])"},
+]
+
+PREFILTER_RULES = {
+    "txt": {"keywords": txt_keyword_rules, "regexes": txt_regex_rules},
+    "csv": {"keywords": csv_keyword_rules, "regexes": csv_regex_rules},
+}
@@ -0,0 +1,160 @@
+import asyncio
+import logging
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Awaitable, Callable, Dict, Optional
+
+from tools.settings import INFER_RETRY_AFTER
+
+# 配置日志
+logging.basicConfig(
+    level=logging.INFO,
+    format='%(asctime)s - %(name)s - %(levelname)s - %(message)s'
+)
+logger = logging.getLogger(__name__)
+
+# 模型状态
+DISABLED = 'disabled'
+PENDING = 'pending'
+LOADING = 'loading'
+LOADED = 'loaded'
+WARMING = 'warming'
+READY = 'ready'
+FAILED = 'failed'
+
+
+class ModelNotReady(RuntimeError):
+    def __init__(self, name: str, state: str, retry_after: int = INFER_RETRY_AFTER):
+        """模型未启用、仍在加载或加载失败
+
+        Args:
+            name: 模型名称
+            state: 模型当前状态
+            retry_after: 建议的重试等待秒数
+        """
+        super().__init__(f'模型不可用：{name}（{state}）')
+        self.name = name
+        self.state = state
+        self.retry_after = retry_after
+
+
+class ModelRegistry:
+    def __init__(self):
+        """按模态管理模型的加载、预热与就绪状态
+
+        所有启用的模型在后台线程中并发加载，加载完成后各自执行一次预热推理，
+        全部预热完成后 ready 才为真。
+        """
+        self._specs: Dict[str, dict] = {}
+        self._models: Dict[str, Any] = {}
+
+    def register(self, name: str, loader: Callable[[], Any],
+                 warmup: Optional[Callable[[Any], Awaitable[None]]] = None,
+                 on_loaded: Optional[Callable[[Any], None]] = None, enabled: bool = True):
+        """注册一个模型
+
+        Args:
+            name: 模型名称
+            loader: 在线程中调用的加载函数，返回模型实例
+            warmup: 预热协程函数，参数为模型实例
+            on_loaded: 加载完成、预热之前的回调，用于创建依赖该模型的对象
+            enabled: 是否启用，未启用的模型不加载
+        """
+        self._specs[name] = {
+            'loader': loader, 'warmup': warmup, 'on_loaded': on_loaded, 'enabled': enabled,
+            'state': PENDING if enabled else DISABLED, 'error': None,
+            'load_seconds': None, 'warmup_seconds': None
+        }
+
+    async def load_all(self):
+        """并发加载并预热所有启用的模型，单个模型失败不影响其他模型"""
+        names = [name for name, spec in self._specs.items() if spec['enabled']]
+        logger.info(f'开始加载模型：{names}')
+        start = time.perf_counter()
+        await asyncio.gather(*[self._load(name) for name in names])
+        logger.info(f'模型加载结束，耗时 {time.perf_counter() - start:.1f} 秒，状态：{self.states()}')
+
+    def preload(self):
+        """在 fork 之前同步加载所有启用的模型，不预热
+
+        gunicorn --preload 时在主进程调用，worker 以写时复制方式共享模型权重，
+        每个 worker 启动后只执行预热。加载线程在返回前全部退出，fork 时不残留线程。
+        """
+        names = [name for name, spec in self._specs.items() if spec['enabled']]
+        logger.info(f'预加载模型：{names}')
+        with ThreadPoolExecutor(max_workers=max(1, len(names)), thread_name_prefix='preload') as pool:
+            futures = {name: pool.submit(self._load_weights, name) for name in names}
+        for name, future in futures.items():
+            try:
+                future.result()
+            except Exception as e:
+                self._specs[name]['state'] = FAILED
+                self._specs[name]['error'] = str(e)
+                logger.error(f'模型 {name} 预加载失败：{str(e)}')
+
+    def _load_weights(self, name: str):
+        spec = self._specs[name]
+        spec['state'] = LOADING
+        start = time.perf_counter()
+        model = spec['loader']()
+        spec['load_seconds'] = time.perf_counter() - start
+        self._models[name] = model
+        if spec['on_loaded'] is not None:
+            spec['on_loaded'](model)
+        spec['state'] = LOADED
+
+    async def _load(self, name: str):
+        spec = self._specs[name]
+        if spec['state'] == FAILED:
+            return
+        try:
+            # 已在 fork 前预加载的模型只需预热
+            if name not in self._models:
+                await asyncio.to_thread(self._load_weights, name)
+            spec['state'] = WARMING
+            start = time.perf_counter()
+            if spec['warmup'] is not None:
+                await spec['warmup'](self._models[name])
+            spec['warmup_seconds'] = time.perf_counter() - start
+            spec['state'] = READY
+            logger.info(f'模型 {name} 就绪：加载 {spec["load_seconds"]:.1f} 秒，预热 {spec["warmup_seconds"]:.1f} 秒')
+        except Exception as e:
+            spec['state'] = FAILED
+            spec['error'] = str(e)
+            logger.error(f'模型 {name} 加载失败：{str(e)}')
+
+    def get(self, name: str) -> Any:
+        """返回已就绪的模型
+
+        Raises:
+            ModelNotReady: 模型未启用、未就绪或加载失败
+        """
+        spec = self._specs.get(name)
+        state = spec['state'] if spec is not None else DISABLED
+        if state != READY:
+            raise ModelNotReady(name, state)
+        return self._models[name]
+
+    def require(self, *names: str):
+        """检查多个模型均已就绪"""
+        for name in names:
+            self.get(name)
+
+    def enabled(self, name: str) -> bool:
+        spec = self._specs.get(name)
+        return spec is not None and spec['enabled']
+
+    @property
+    def ready(self) -> bool:
+        """所有启用的模型均已预热完成"""
+        return all(spec['state'] in (READY, DISABLED) for spec in self._specs.values())
+
+    def states(self) -> Dict[str, str]:
+        return {name: spec['state'] for name, spec in self._specs.items()}
+
+    def status(self) -> Dict[str, dict]:
+        """各模型的状态、加载与预热耗时、失败原因"""
+        return {
+            name: {key: spec[key] for key in ('state', 'load_seconds', 'warmup_seconds', 'error')}
+            for name, spec in self._specs.items()
+        }
@@ -0,0 +1,411 @@
+"""批量扫描命令行：遍历目录与压缩包，按文件类型分发到文本、表格、图像、音频分类
+
+用法：
+    python -m tools.scan /data/lake -o results.jsonl
+    python -m tools.scan /data/a.zip /data/b.tar.gz -o results.parquet -j 16 --kinds txt,table
+
+每个工作进程只加载一次模型，结果逐条写入 JSONL 或 Parquet 分片，
+已写入的文件记录在检查点中，中断后以相同参数重新运行会跳过已完成的文件。
+"""
+import argparse
+import io
+import json
+import logging
+import multiprocessing
+import os
+import tarfile
+import time
+import zipfile
+from concurrent.futures import FIRST_COMPLETED, ProcessPoolExecutor, wait
+from typing import Dict, Iterable, Iterator, List, NamedTuple, Optional, Union
+
+from tools.default_labels import get_all_labels
+from tools.scanner.readers import TABLE_FORMATS
+from tools.settings import (
+    SCAN_PROCESSES, SCAN_TORCH_THREADS, SCAN_PENDING_PER_PROCESS, SCAN_TEXT_MAX_CHARS,
+    SCAN_MAX_MEMBER_BYTES, SCAN_PARQUET_ROWS_PER_FILE
+)
+from tools.transformer.table import sniff_encoding
+
+# 配置日志
+logging.basicConfig(
+    level=logging.INFO,
+    format='%(asctime)s - %(name)s - %(levelname)s - %(message)s'
+)
+logger = logging.getLogger(__name__)
+
+TEXT_EXTENSIONS = ('.txt', '.md', '.log', '.json', '.xml', '.html', '.htm', '.sql', '.ini', '.conf', '.yaml', '.yml')
+IMAGE_EXTENSIONS = ('.jpg', '.jpeg', '.png', '.bmp', '.gif', '.webp', '.tif', '.tiff')
+AUDIO_EXTENSIONS = ('.wav', '.mp3', '.flac', '.m4a', '.ogg', '.aac', '.amr')
+ZIP_EXTENSIONS = ('.zip',)
+TAR_EXTENSIONS = ('.tar', '.tar.gz', '.tgz', '.tar.bz2', '.tbz2', '.tar.xz', '.txz')
+SCAN_KINDS = ('txt', 'table', 'image', 'audio')
+# 各类文件使用的标签集
+KIND_LABELS = {'txt': 'txt', 'table': 'csv', 'image': 'image', 'audio': 'audio'}
+
+
+class ScanItem(NamedTuple):
+    id: str
+    kind: str
+    name: str
+    source: Union[str, bytes, None]
+    error: Optional[str] = None
+
+
+def file_kind(name: str) -> Optional[str]:
+    """根据扩展名判断文件类型，无法处理时返回 None"""
+    lower = name.lower()
+    extension = os.path.splitext(lower)[1]
+    if extension in TEXT_EXTENSIONS:
+        return 'txt'
+    if extension in TABLE_FORMATS:
+        return 'table'
+    if extension in IMAGE_EXTENSIONS:
+        return 'image'
+    if extension in AUDIO_EXTENSIONS:
+        return 'audio'
+    return None
+
+
+def archive_type(name: str) -> Optional[str]:
+    lower = name.lower()
+    if lower.endswith(ZIP_EXTENSIONS):
+        return 'zip'
+    if lower.endswith(TAR_EXTENSIONS):
+        return 'tar'
+    return None
+
+
+def iter_archive_items(path: str, kinds: Iterable[str],
+                       max_member_bytes: int = SCAN_MAX_MEMBER_BYTES) -> Iterator[ScanItem]:
+    """顺序读取压缩包中的文件，成员内容由主进程读出后交给工作进程
+
+    tar 压缩包按流式顺序读取，不会对 .tar.gz 反复解压；嵌套的压缩包不再展开
+    """
+    def make_item(name: str, size: int, read) -> Optional[ScanItem]:
+        kind = file_kind(name)
+        if kind not in kinds:
+            return None
+        item_id = f'{path}!{name}'
+        if size > max_member_bytes:
+            return ScanItem(item_id, kind, name, None, f'文件超过 {max_member_bytes} 字节，已跳过')
+        return ScanItem(item_id, kind, name, read())
+
+    try:
+        if archive_type(path) == 'zip':
+            with zipfile.ZipFile(path) as zf:
+                for info in zf.infolist():
+                    if info.is_dir():
+                        continue
+                    item = make_item(info.filename, info.file_size, lambda: zf.read(info))
+                    if item is not None:
+                        yield item
+        else:
+            with tarfile.open(path, 'r|*') as tf:
+                for member in tf:
+                    if not member.isfile():
+                        continue
+                    item = make_item(member.name, member.size, lambda: tf.extractfile(member).read())
+                    if item is not None:
+                        yield item
+    except (zipfile.BadZipFile, tarfile.TarError, OSError) as e:
+        logger.warning(f'读取压缩包失败：{path}，{str(e)}')
+        yield ScanItem(path, 'archive', os.path.basename(path), None, f'读取压缩包失败：{str(e)}')
+
+
+def iter_scan_items(paths: Iterable[str], kinds: Iterable[str]) -> Iterator[ScanItem]:
+    """遍历目录与压缩包，按文件路径排序，保证重新运行时顺序一致"""
+    kinds = set(kinds)
+    for root_path in paths:
+        root_path = os.path.abspath(root_path)
+        if os.path.isfile(root_path):
+            files = [root_path]
+        else:
+            files = (
+                os.path.join(directory, name)
+                for directory, subdirs, names in _sorted_walk(root_path)
+                for name in sorted(names)
+            )
+        for path in files:
+            if archive_type(path):
+                yield from iter_archive_items(path, kinds)
+                continue
+            kind = file_kind(path)
+            if kind in kinds:
+                yield ScanItem(path, kind, os.path.basename(path), path)
+
+
+def _sorted_walk(root: str):
+    for directory, subdirs, names in os.walk(root):
+        subdirs.sort()
+        yield directory, subdirs, names
+
+
+class ScanWorker:
+    def __init__(self, kinds: Iterable[str], torch_threads: int = SCAN_TORCH_THREADS):
+        """工作进程内的模型集合，进程启动时加载一次
+
+        Args:
+            kinds: 需要处理的文件类型，只加载对应的模型
+            torch_threads: 每个进程的 torch 线程数，进程数乘以线程数不宜超过 CPU 核数
+        """
+        import torch
+        from tools.classifier.classifier import txtClassifier
+        from tools.scanner.table_scanner import TableScanner
+
+        if torch_threads > 0:
+            torch.set_num_threads(torch_threads)
+        kinds = set(kinds)
+        all_labels = get_all_labels()
+        self.label_groups = {kind: [all_labels[key]] for kind, key in KIND_LABELS.items()}
+        self.classifier = txtClassifier()
+        self.classifier.preload_labels(all_labels.values())
+        self.table_scanner = TableScanner(self.classifier)
+        self.image_recognizer = None
+        self.audio_recognizer = None
+        if 'image' in kinds:
+            from tools.transformer.image import ImageRecognizer
+            self.image_recognizer = ImageRecognizer()
+        if 'audio' in kinds:
+            from tools.transformer.audio import AudioRecognizer
+            self.audio_recognizer = AudioRecognizer()
+
+    def classify_groups(self, text: str, kind: str) -> list:
+        """按该类型的标签组分类，所有标签组合并为一次批量推理"""
+        if not text.strip():
+            return []
+        return self.classifier.classify_multi(text, self.label_groups[kind])
+
+    def process(self, kind: str, name: str, source: Union[str, bytes]) -> dict:
+        if kind == 'txt':
+            text = self._read_text(source)
+            return {"results": self.classify_groups(text, kind)}
+        if kind == 'table':
+            stream = io.BytesIO(source) if isinstance(source, bytes) else source
+            fmt = TABLE_FORMATS[os.path.splitext(name.lower())[1]]
+            table_name = os.path.splitext(os.path.basename(name))[0]
+            return self.table_scanner.scan(stream, fmt, table_name)
+        if kind == 'image':
+            description = self.image_recognizer.recognize(self._read_bytes(source))
+            return {"description": description, "results": self.classify_groups(description, kind)}
+        if kind == 'audio':
+            transcription = self.audio_recognizer.transcribe(self._read_bytes(source))
+            return {"transcription": transcription, "results": self.classify_groups(transcription, kind)}
+        raise ValueError(f'不支持的文件类型：{kind}')
+
+    @staticmethod
+    def _read_bytes(source: Union[str, bytes]) -> bytes:
+        if isinstance(source, bytes):
+            return source
+        with open(source, 'rb') as f:
+            return f.read()
+
+    @staticmethod
+    def _read_text(source: Union[str, bytes], max_chars: int = SCAN_TEXT_MAX_CHARS) -> str:
+        """只读取文本开头的 max_chars 个字符，超出部分模型也会截断"""
+        if isinstance(source, bytes):
+            data = source[:max_chars * 4]
+        else:
+            with open(source, 'rb') as f:
+                data = f.read(max_chars * 4)
+        return data.decode(sniff_encoding(data), errors='replace')[:max_chars]
+
+
+_worker: Optional[ScanWorker] = None
+
+
+def _init_worker(kinds: tuple, torch_threads: int):
+    global _worker
+    _worker = ScanWorker(kinds, torch_threads)
+    logger.info(f'工作进程 {os.getpid()} 模型加载完成')
+
+
+def _process_item(kind: str, name: str, source: Union[str, bytes]) -> dict:
+    """在工作进程中处理一个文件，异常作为结果的一部分返回"""
+    start = time.perf_counter()
+    try:
+        return {"result": _worker.process(kind, name, source), "error": None,
+                "seconds": time.perf_counter() - start}
+    except Exception as e:
+        logger.error(f'处理文件失败：{name}，{str(e)}')
+        return {"result": None, "error": str(e), "seconds": time.perf_counter() - start}
+
+
+class Checkpoint:
+    def __init__(self, path: str):
+        """已写入输出的文件 id 列表，每行一个，重新运行时跳过这些文件"""
+        self.path = path
+        self.done = set()
+        if os.path.exists(path):
+            with open(path, 'r', encoding='utf-8') as f:
+                self.done = {line.rstrip('\n') for line in f if line.strip()}
+            logger.info(f'从检查点恢复：已完成 {len(self.done)} 个文件')
+        self._file = open(path, 'a', encoding='utf-8')
+
+    def __contains__(self, item_id: str) -> bool:
+        return item_id in self.done
+
+    def add(self, item_ids: List[str]):
+        if not item_ids:
+            return
+        self._file.write(''.join(f'{item_id}\n' for item_id in item_ids))
+        self._file.flush()
+        self.done.update(item_ids)
+
+    def close(self):
+        self._file.close()
+
+
+class JsonlSink:
+    def __init__(self, path: str):
+        """JSONL 输出，每条结果立即写入并刷新，重新运行时追加"""
+        self.path = path
+        self._file = open(path, 'a', encoding='utf-8')
+
+    def write(self, record: dict) -> List[str]:
+        """写入一条结果，返回已持久化的文件 id"""
+        self._file.write(json.dumps(record, ensure_ascii=False) + '\n')
+        self._file.flush()
+        return [record['id']]
+
+    def close(self) -> List[str]:
+        self._file.close()
+        return []
+
+
+class ParquetSink:
+    def __init__(self, path: str, rows_per_file: int = SCAN_PARQUET_ROWS_PER_FILE):
+        """Parquet 输出：path 为目录，每 rows_per_file 条结果写一个分片文件
+
+        result 列为 JSON 字符串，不同类型文件的结果结构不同，不展开为嵌套列
+        """
+        self.path = path
+        self.rows_per_file = max(1, rows_per_file)
+        os.makedirs(path, exist_ok=True)
+        self._part = len([name for name in os.listdir(path) if name.endswith('.parquet')])
+        self._buffer: List[dict] = []
+
+    def write(self, record: dict) -> List[str]:
+        row = dict(record)
+        row['result'] = json.dumps(record['result'], ensure_ascii=False) if record['result'] is not None else None
+        self._buffer.append(row)
+        if len(self._buffer) >= self.rows_per_file:
+            return self.flush()
+        return []
+
+    def flush(self) -> List[str]:
+        """写出缓冲的结果，返回已持久化的文件 id"""
+        if not self._buffer:
+            return []
+        import pyarrow as pa
+        import pyarrow.parquet as pq
+
+        table = pa.Table.from_pylist(self._buffer, schema=pa.schema([
+            ('id', pa.string()), ('kind', pa.string()), ('result', pa.string()),
+            ('error', pa.string()), ('seconds', pa.float64())
+        ]))
+        part_path = os.path.join(self.path, f'part-{self._part:05d}.parquet')
+        pq.write_table(table, part_path + '.tmp')
+        # 先写临时文件再改名，中断时不会留下不完整的分片
+        os.replace(part_path + '.tmp', part_path)
+        self._part += 1
+        item_ids = [row['id'] for row in self._buffer]
+        self._buffer = []
+        return item_ids
+
+    def close(self) -> List[str]:
+        return self.flush()
+
+
+def open_sink(output: str):
+    if output.lower().endswith('.parquet'):
+        return ParquetSink(output)
+    return JsonlSink(output)
+
+
+def run_scan(paths: List[str], output: str, kinds: Iterable[str] = SCAN_KINDS,
+             processes: int = SCAN_PROCESSES, torch_threads: int = SCAN_TORCH_THREADS,
+             checkpoint_path: Optional[str] = None) -> Dict[str, int]:
+    """扫描目录与压缩包，把结果写入 output
+
+    Args:
+        paths: 待扫描的目录、文件或压缩包
+        output: 输出路径，以 .parquet 结尾时写 Parquet 分片目录，否则写 JSONL
+        kinds: 需要处理的文件类型
+        processes: 工作进程数，0 表示 CPU 核数
+        torch_threads: 每个工作进程的 torch 线程数
+        checkpoint_path: 检查点文件路径，默认为 output + '.checkpoint'
+
+    Returns:
+        dict: 完成、失败、跳过的文件数
+    """
+    kinds = tuple(kind for kind in kinds if kind in SCAN_KINDS)
+    processes = processes or os.cpu_count() or 1
+    max_pending = max(1, processes * SCAN_PENDING_PER_PROCESS)
+    checkpoint = Checkpoint(checkpoint_path or output.rstrip('/') + '.checkpoint')
+    sink = open_sink(output)
+    stats = {"done": 0, "errors": 0, "skipped": 0}
+    start = time.perf_counter()
+    pending = {}
+
+    def write(item: ScanItem, outcome: dict):
+        record = {"id": item.id, "kind": item.kind, **outcome}
+        checkpoint.add(sink.write(record))
+        stats["done"] += 1
+        if record["error"]:
+            stats["errors"] += 1
+        if stats["done"] % 100 == 0:
+            elapsed = time.perf_counter() - start
+            logger.info(f'已完成 {stats["done"]} 个文件，{stats["done"] / elapsed:.1f} 个/秒')
+
+    def drain(return_when):
+        finished, _ = wait(list(pending), return_when=return_when)
+        for future in finished:
+            write(pending.pop(future), future.result())
+
+    logger.info(f'开始扫描：{paths}，类型：{kinds}，进程数：{processes}')
+    # spawn 启动的子进程不继承父进程的线程与 CUDA 状态
+    context = multiprocessing.get_context('spawn')
+    try:
+        with ProcessPoolExecutor(processes, mp_context=context, initializer=_init_worker,
+                                 initargs=(kinds, torch_threads)) as pool:
+            for item in iter_scan_items(paths, kinds):
+                if item.id in checkpoint:
+                    stats["skipped"] += 1
+                    continue
+                if item.error:
+                    write(item, {"result": None, "error": item.error, "seconds": 0.0})
+                    continue
+                # 限制排队数量，压缩包内容不会一次性全部读入内存
+                if len(pending) >= max_pending:
+                    drain(FIRST_COMPLETED)
+                pending[pool.submit(_process_item, item.kind, item.name, item.source)] = item
+            while pending:
+                drain(FIRST_COMPLETED)
+    finally:
+        checkpoint.add(sink.close())
+        checkpoint.close()
+    elapsed = time.perf_counter() - start
+    logger.info(f'扫描完成：{stats}，耗时 {elapsed:.1f} 秒')
+    return stats
+
+
+def main(argv: Optional[List[str]] = None):
+    parser = argparse.ArgumentParser(prog='python -m tools.scan', description='批量扫描目录与压缩包中的文件并分类分级')
+    parser.add_argument('paths', nargs='+', help='待扫描的目录、文件或 zip/tar 压缩包')
+    parser.add_argument('-o', '--output', required=True, help='输出路径，.jsonl 或 .parquet（分片目录）')
+    parser.add_argument('-j', '--processes', type=int, default=SCAN_PROCESSES, help='工作进程数，0 表示 CPU 核数')
+    parser.add_argument('--torch-threads', type=int, default=SCAN_TORCH_THREADS, help='每个工作进程的 torch 线程数')
+    parser.add_argument('--kinds', default=','.join(SCAN_KINDS), help='处理的文件类型，逗号分隔：txt,table,image,audio')
+    parser.add_argument('--checkpoint', default=None, help='检查点文件路径，默认为输出路径加 .checkpoint')
+    args = parser.parse_args(argv)
+
+    kinds = [kind.strip() for kind in args.kinds.split(',') if kind.strip()]
+    unknown = set(kinds) - set(SCAN_KINDS)
+    if unknown:
+        parser.error(f'不支持的文件类型：{", ".join(sorted(unknown))}')
+    run_scan(args.paths, args.output, kinds, args.processes, args.torch_threads, args.checkpoint)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,76 @@
+import logging
+from typing import Callable, List, Optional
+
+import numpy as np
+import pandas as pd
+
+# 配置日志
+logging.basicConfig(
+    level=logging.INFO,
+    format='%(asctime)s - %(name)s - %(levelname)s - %(message)s'
+)
+logger = logging.getLogger(__name__)
+
+# 身份证号码前 17 位的加权因子与校验码（GB 11643-1999）
+ID_CARD_WEIGHTS = np.array([7, 9, 10, 5, 8, 4, 2, 1, 6, 3, 7, 9, 10, 5, 8, 4, 2])
+ID_CARD_CHECK_CODES = '10X98765432'
+
+
+def id_card_checksum(values: pd.Series) -> pd.Series:
+    """校验 18 位身份证号码的最后一位"""
+    digits = np.array([[int(c) for c in value[:17]] for value in values], dtype=np.int64).reshape(-1, 17)
+    expected = [ID_CARD_CHECK_CODES[i] for i in (digits @ ID_CARD_WEIGHTS) % 11]
+    return pd.Series([value[17].upper() == code for value, code in zip(values, expected)], index=values.index)
+
+
+def luhn_checksum(values: pd.Series) -> pd.Series:
+    """Luhn 算法校验银行卡号"""
+    valid = []
+    for value in values:
+        digits = [int(c) for c in reversed(value)]
+        total = sum(digits[0::2]) + sum(d * 2 - 9 if d * 2 > 9 else d * 2 for d in digits[1::2])
+        valid.append(total % 10 == 0)
+    return pd.Series(valid, index=values.index)
+
+
+class Detector:
+    def __init__(self, name: str, label: str, pattern: str,
+                 checksum: Optional[Callable[[pd.Series], pd.Series]] = None):
+        """基于正则与校验位的敏感数据检测器
+
+        Args:
+            name: 检测器名称
+            label: 命中时对应的 table_data_labels 标签
+            pattern: 整个值需完整匹配的正则表达式
+            checksum: 对正则命中的值做进一步校验的函数
+        """
+        self.name = name
+        self.label = label
+        self.pattern = pattern
+        self.checksum = checksum
+
+    def match(self, values: pd.Series) -> pd.Series:
+        """返回每个值是否命中的布尔序列，正则向量化匹配，校验只作用于正则命中的值"""
+        matched = values.str.fullmatch(self.pattern, na=False)
+        if self.checksum is not None and matched.any():
+            candidates = values[matched]
+            matched.loc[candidates.index] = self.checksum(candidates).to_numpy()
+        return matched
+
+    def match_ratio(self, values: pd.Series) -> float:
+        """命中值占非空值的比例"""
+        if values.empty:
+            return 0.0
+        return float(self.match(values).mean())
+
+
+DETECTORS: List[Detector] = [
+    Detector(
+        'id_card', '个人身份信息',
+        r'[1-9]\d{5}(?:18|19|20)\d{2}(?:0[1-9]|1[0-2])(?:0[1-9]|[12]\d|3[01])\d{3}[\dXx]',
+        id_card_checksum
+    ),
+    Detector('phone', '个人基本资料', r'(?:\+?86[- ]?)?1[3-9]\d{9}'),
+    Detector('bank_card', '个人财产信息', r'(?:62|4|5)\d{14,18}', luhn_checksum),
+    Detector('email', '个人基本资料', r'[A-Za-z0-9._%+-]+@[A-Za-z0-9.-]+\.[A-Za-z]{2,}'),
+]
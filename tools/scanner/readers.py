@@ -0,0 +1,112 @@
+import logging
+import os
+from typing import BinaryIO, Iterator, List, Union
+
+import pandas as pd
+
+from tools.transformer.table import sniff_encoding
+
+# 配置日志
+logging.basicConfig(
+    level=logging.INFO,
+    format='%(asctime)s - %(name)s - %(levelname)s - %(message)s'
+)
+logger = logging.getLogger(__name__)
+
+TABLE_FORMATS = {
+    '.csv': 'csv',
+    '.tsv': 'tsv',
+    '.parquet': 'parquet',
+    '.xlsx': 'excel',
+    '.xlsm': 'excel'
+}
+
+
+def detect_format(filename: str) -> str:
+    """根据扩展名判断表格格式"""
+    extension = os.path.splitext(filename)[1].lower()
+    if extension not in TABLE_FORMATS:
+        raise ValueError(f'不支持的表格格式：{extension}')
+    return TABLE_FORMATS[extension]
+
+
+def unique_headers(values) -> List[str]:
+    """与 pandas.read_csv 相同的表头规则：空表头命名为 Unnamed: 列号，重复的表头依次加 .1、.2 后缀"""
+    headers = []
+    seen = set()
+    for index, value in enumerate(values):
+        name = str(value).strip() if value is not None else ''
+        if not name:
+            name = f'Unnamed: {index}'
+        candidate, suffix = name, 0
+        while candidate in seen:
+            suffix += 1
+            candidate = f'{name}.{suffix}'
+        seen.add(candidate)
+        headers.append(candidate)
+    return headers
+
+
+def iter_table_chunks(source: Union[str, BinaryIO], fmt: str, chunksize: int) -> Iterator[pd.DataFrame]:
+    """按块读取表格，每块为全部列均为字符串的 DataFrame，内存占用与文件大小无关
+
+    Args:
+        source: 文件路径或可 seek 的二进制文件流
+        fmt: 'csv'、'tsv'、'parquet' 或 'excel'
+        chunksize: 每块的行数
+    """
+    if fmt in ('csv', 'tsv'):
+        yield from _iter_csv(source, '\t' if fmt == 'tsv' else ',', chunksize)
+    elif fmt == 'parquet':
+        yield from _iter_parquet(source, chunksize)
+    elif fmt == 'excel':
+        yield from _iter_excel(source, chunksize)
+    else:
+        raise ValueError(f'不支持的表格格式：{fmt}')
+
+
+def _iter_csv(source, sep: str, chunksize: int) -> Iterator[pd.DataFrame]:
+    if isinstance(source, str):
+        with open(source, 'rb') as f:
+            encoding = sniff_encoding(f.read(64 * 1024))
+    else:
+        encoding = sniff_encoding(source.read(64 * 1024))
+        source.seek(0)
+    reader = pd.read_csv(
+        source, sep=sep, dtype=str, keep_default_na=False, chunksize=chunksize,
+        encoding=encoding, encoding_errors='replace', on_bad_lines='skip'
+    )
+    with reader:
+        yield from reader
+
+
+def _iter_parquet(source, chunksize: int) -> Iterator[pd.DataFrame]:
+    import pyarrow.parquet as pq
+
+    parquet_file = pq.ParquetFile(source)
+    for batch in parquet_file.iter_batches(batch_size=chunksize):
+        frame = batch.to_pandas()
+        yield frame.astype(str).where(frame.notna(), '')
+
+
+def _iter_excel(source, chunksize: int) -> Iterator[pd.DataFrame]:
+    from openpyxl import load_workbook
+
+    # 只读模式逐行读取第一个工作表，不加载整个工作簿
+    workbook = load_workbook(source, read_only=True, data_only=True)
+    try:
+        rows = workbook.worksheets[0].iter_rows(values_only=True)
+        headers = unique_headers(next(rows, ()))
+        width = len(headers)
+        buffer = []
+        for row in rows:
+            # 行尾的空单元格在只读模式下可能不返回，短行补齐到表头宽度，超出表头的单元格丢弃
+            values = ['' if value is None else str(value) for value in row[:width]]
+            buffer.append(values + [''] * (width - len(values)))
+            if len(buffer) >= chunksize:
+                yield pd.DataFrame(buffer, columns=headers)
+                buffer = []
+        if buffer:
+            yield pd.DataFrame(buffer, columns=headers)
+    finally:
+        workbook.close()
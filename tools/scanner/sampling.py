@@ -0,0 +1,33 @@
+from typing import List, Optional
+
+import numpy as np
+
+
+class ReservoirSampler:
+    def __init__(self, size: int, seed: Optional[int] = None):
+        """蓄水池采样：无论数据流多长，始终等概率保留至多 size 个值
+
+        Args:
+            size: 采样容量
+            seed: 随机种子
+        """
+        self.size = size
+        self.seen = 0
+        self.samples: List[str] = []
+        self._rng = np.random.default_rng(seed)
+
+    def add_many(self, values) -> None:
+        """按块加入一批值：先填满蓄水池，其余值的替换位置一次性向量化抽取"""
+        values = list(values)
+        fill = min(len(values), max(0, self.size - len(self.samples)))
+        self.samples.extend(values[:fill])
+        self.seen += fill
+        rest = values[fill:]
+        if not rest:
+            return
+        # 第 t 个值（从 0 计）以 size/(t+1) 的概率替换随机位置
+        positions = np.arange(self.seen, self.seen + len(rest))
+        slots = (self._rng.random(len(rest)) * (positions + 1)).astype(np.int64)
+        for index in np.nonzero(slots < self.size)[0]:
+            self.samples[slots[index]] = rest[index]
+        self.seen += len(rest)
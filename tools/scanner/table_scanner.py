@@ -0,0 +1,133 @@
+import logging
+from typing import BinaryIO, Dict, List, Optional, Tuple, Union
+
+import pandas as pd
+
+from tools.default_labels import table_data_labels, unified_security_matrix
+from tools.scanner.detectors import DETECTORS, Detector
+from tools.scanner.readers import iter_table_chunks
+from tools.scanner.sampling import ReservoirSampler
+from tools.settings import (
+    SCAN_CHUNK_ROWS, SCAN_SAMPLE_SIZE, SCAN_DETECTOR_THRESHOLD, CSV_SAMPLE_ROWS, CSV_SAMPLE_VALUE_CHARS
+)
+from tools.transformer.table import build_column_texts
+
+# 配置日志
+logging.basicConfig(
+    level=logging.INFO,
+    format='%(asctime)s - %(name)s - %(levelname)s - %(message)s'
+)
+logger = logging.getLogger(__name__)
+
+
+class TableScanner:
+    def __init__(self, classifier=None, labels: Optional[List[str]] = None,
+                 detectors: Optional[List[Detector]] = None,
+                 chunk_rows: int = SCAN_CHUNK_ROWS, sample_size: int = SCAN_SAMPLE_SIZE,
+                 threshold: float = SCAN_DETECTOR_THRESHOLD, seed: Optional[int] = None):
+        """表格敏感数据扫描器
+
+        按块流式读取表格，每列用蓄水池采样保留固定数量的非空值，内存占用与文件大小无关；
+        先用正则和校验位检测器判定各列，命中比例不足阈值的列再交给 txtClassifier 分类。
+
+        Args:
+            classifier: txtClassifier 实例，为空时不明确的列不做模型分类
+            labels: 列标签集，默认使用 table_data_labels
+            detectors: 检测器列表，默认使用 DETECTORS
+            chunk_rows: 每块读取的行数
+            sample_size: 每列采样的值数量
+            threshold: 检测器命中比例达到该值时直接判定该列
+            seed: 采样随机种子
+        """
+        self.classifier = classifier
+        self.labels = labels or table_data_labels
+        self.detectors = detectors if detectors is not None else DETECTORS
+        self.chunk_rows = max(1, chunk_rows)
+        self.sample_size = max(1, sample_size)
+        self.threshold = threshold
+        self.seed = seed
+
+    def sample(self, source: Union[str, BinaryIO], fmt: str) -> Tuple[List[str], Dict[str, ReservoirSampler], int]:
+        """流式读取表格并对每列做蓄水池采样
+
+        Returns:
+            (列名, 列名到采样器的映射, 总行数)
+        """
+        headers: List[str] = []
+        samplers: Dict[str, ReservoirSampler] = {}
+        total_rows = 0
+        for chunk in iter_table_chunks(source, fmt, self.chunk_rows):
+            total_rows += len(chunk)
+            for column in chunk.columns:
+                name = str(column)
+                if name not in samplers:
+                    headers.append(name)
+                    samplers[name] = ReservoirSampler(self.sample_size, self.seed)
+                values = chunk[column].str.strip()
+                samplers[name].add_many(values[values != ''])
+        return headers, samplers, total_rows
+
+    def detect(self, values: List[str]) -> Optional[dict]:
+        """对一列的采样值运行全部检测器，返回命中比例最高的检测结果"""
+        if not values:
+            return None
+        series = pd.Series(values, dtype=str)
+        best = None
+        for detector in self.detectors:
+            ratio = detector.match_ratio(series)
+            if ratio > 0 and (best is None or ratio > best['match_ratio']):
+                best = {'detector': detector.name, 'label': detector.label, 'match_ratio': ratio}
+        return best
+
+    def profile(self, source: Union[str, BinaryIO], fmt: str, table_name: str = '') -> dict:
+        """读取、采样并运行检测器，不调用模型
+
+        Returns:
+            dict: table、rows、columns（每列的检测结果），以及 ambiguous（需要模型分类的列序号）
+                  和 texts（对应的分类文本）
+        """
+        headers, samplers, total_rows = self.sample(source, fmt)
+        columns, ambiguous = [], []
+        for index, header in enumerate(headers):
+            sampler = samplers[header]
+            detection = self.detect(sampler.samples)
+            column = {
+                'column': header,
+                'non_empty': sampler.seen,
+                'sampled': len(sampler.samples),
+                'detector': detection['detector'] if detection else None,
+                'match_ratio': detection['match_ratio'] if detection else 0.0
+            }
+            if detection and detection['match_ratio'] >= self.threshold:
+                column.update({'label': detection['label'], 'score': detection['match_ratio'], 'source': 'detector'})
+            else:
+                column.update({'label': None, 'score': 0.0, 'source': None})
+                ambiguous.append(index)
+            columns.append(column)
+        # 模型只看列名和少量截断后的采样值
+        samples = [
+            [value[:CSV_SAMPLE_VALUE_CHARS] for value in samplers[headers[index]].samples[:CSV_SAMPLE_ROWS]]
+            for index in ambiguous
+        ]
+        texts = build_column_texts(table_name, [headers[index] for index in ambiguous], samples)
+        return {'table': table_name, 'rows': total_rows, 'columns': columns,
+                'ambiguous': ambiguous, 'texts': texts}
+
+    def apply_model_results(self, profile: dict, results: List[dict]) -> dict:
+        """把模型对不明确列的分类结果写回，并补充 unified_security_matrix 中的级别"""
+        for index, result in zip(profile['ambiguous'], results):
+            if result and result.get('labels'):
+                profile['columns'][index].update(
+                    {'label': result['labels'][0], 'score': result['scores'][0], 'source': 'model'}
+                )
+        for column in profile['columns']:
+            column['levels'] = unified_security_matrix.get(column['label']) if column['label'] else None
+        return {'table': profile['table'], 'rows': profile['rows'], 'columns': profile['columns']}
+
+    def scan(self, source: Union[str, BinaryIO], fmt: str, table_name: str = '') -> dict:
+        """扫描整张表格，返回每列的标签、得分、判定来源和安全级别"""
+        profile = self.profile(source, fmt, table_name)
+        results = []
+        if profile['texts'] and self.classifier is not None:
+            results = self.classifier.classify_many([(text, self.labels) for text in profile['texts']])
+        return self.apply_model_results(profile, results)
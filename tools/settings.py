@@ -0,0 +1,174 @@
+# 服务运行配置
+# 所有配置项均可通过同名环境变量覆盖
+import os
+
+
+def _env_int(name: str, default: int) -> int:
+    value = os.environ.get(name)
+    return int(value) if value not in (None, '') else default
+
+
+def _env_float(name: str, default: float) -> float:
+    value = os.environ.get(name)
+    return float(value) if value not in (None, '') else default
+
+
+def _env_bool(name: str, default: bool) -> bool:
+    value = os.environ.get(name)
+    if value in (None, ''):
+        return default
+    return value.strip().lower() in ('1', 'true', 'yes', 'on')
+
+
+def _env_str(name: str, default: str) -> str:
+    value = os.environ.get(name)
+    return value if value not in (None, '') else default
+
+
+# 零样本分类：单次前向计算的 (文本, 假设) 对数量上限
+CLASSIFY_PAIR_BATCH_SIZE = _env_int('CLASSIFY_PAIR_BATCH_SIZE', 64)
+
+# 零样本分类推理后端：pytorch 原始精度；int8 动态量化（仅 CPU）；onnx 使用 ONNX Runtime
+CLASSIFY_BACKEND = _env_str('CLASSIFY_BACKEND', 'pytorch')
+# onnx 后端的模型文件，为空时使用 <模型目录>/onnx/model.onnx；单个算子的线程数，0 表示自动
+CLASSIFY_ONNX_PATH = _env_str('CLASSIFY_ONNX_PATH', '')
+ONNX_INTRA_OP_THREADS = _env_int('ONNX_INTRA_OP_THREADS', 0)
+
+# 微批处理调度器：单批最多合并的请求数、等待凑批的最长时间（毫秒）
+BATCH_MAX_SIZE = _env_int('CLASSIFY_BATCH_MAX_SIZE', 16)
+BATCH_MAX_WAIT_MS = _env_float('CLASSIFY_BATCH_MAX_WAIT_MS', 5.0)
+
+# 推理执行器：每类模型独立的线程池并发数与排队上限，队列满时返回 503
+INFER_TXT_WORKERS = _env_int('INFER_TXT_WORKERS', 1)
+INFER_TXT_QUEUE = _env_int('INFER_TXT_QUEUE', 256)
+INFER_IMAGE_WORKERS = _env_int('INFER_IMAGE_WORKERS', 1)
+INFER_IMAGE_QUEUE = _env_int('INFER_IMAGE_QUEUE', 16)
+INFER_AUDIO_WORKERS = _env_int('INFER_AUDIO_WORKERS', 1)
+INFER_AUDIO_QUEUE = _env_int('INFER_AUDIO_QUEUE', 8)
+# 503 响应中建议客户端重试的等待秒数
+INFER_RETRY_AFTER = _env_int('INFER_RETRY_AFTER', 1)
+
+# 分类引擎：nli 为逐标签的零样本推理，embedding 为句向量相似度检索
+CLASSIFY_ENGINE = _env_str('CLASSIFY_ENGINE', 'nli')
+# 句向量模型路径，不存在时复用零样本模型的主干网络
+EMBEDDING_MODEL_PATH = _env_str('EMBEDDING_MODEL_PATH', '/etc/model/text2vec-base-chinese')
+EMBEDDING_TEMPERATURE = _env_float('EMBEDDING_TEMPERATURE', 0.05)
+# 向量引擎召回的前 k 个标签再交给零样本模型重排，0 表示不重排
+EMBEDDING_RERANK_TOP_K = _env_int('EMBEDDING_RERANK_TOP_K', 0)
+
+# 层级分类："意图 - 行业" 形式的组合标签拆成两组分别打分再组合
+# off 关闭；parallel 两组因子一起推理；sequential 先定意图，再在该意图下分行业
+CLASSIFY_HIERARCHICAL = _env_str('CLASSIFY_HIERARCHICAL', 'off')
+
+# 批量文本接口：每次送入模型的文本条数
+TXT_BATCH_CHUNK_SIZE = _env_int('TXT_BATCH_CHUNK_SIZE', 32)
+
+# 结果缓存：memory 进程内 LRU，sqlite 磁盘缓存（多 worker 共享），off 关闭
+RESULT_CACHE_BACKEND = _env_str('RESULT_CACHE_BACKEND', 'memory')
+RESULT_CACHE_MAX_ENTRIES = _env_int('RESULT_CACHE_MAX_ENTRIES', 10000)
+RESULT_CACHE_TTL = _env_float('RESULT_CACHE_TTL', 3600)
+RESULT_CACHE_SQLITE_PATH = _env_str('RESULT_CACHE_SQLITE_PATH', '/tmp/classify_result_cache.sqlite3')
+
+# 图像描述缓存：按图像内容哈希缓存 BLIP 生成的描述，0 表示关闭
+IMAGE_CAPTION_CACHE_SIZE = _env_int('IMAGE_CAPTION_CACHE_SIZE', 1024)
+
+# 批量图像识别：每次 generate 的图片数、描述的最大长度（单张与批量接口共用，0 表示使用模型生成配置的默认值）
+IMAGE_BATCH_SIZE = _env_int('IMAGE_BATCH_SIZE', 8)
+IMAGE_CAPTION_MAX_LENGTH = _env_int('IMAGE_CAPTION_MAX_LENGTH', 0)
+# 批量图像接口：压缩包内单个图片的大小上限（字节）
+IMAGE_BATCH_MAX_FILE_BYTES = _env_int('IMAGE_BATCH_MAX_FILE_BYTES', 20 * 1024 * 1024)
+# 批量图像接口：单次请求可上传的图片文件数上限
+IMAGE_BATCH_MAX_FILES = _env_int('IMAGE_BATCH_MAX_FILES', 10000)
+
+# CSV 表头读取：每次读取的字节数、最多读取的字节数
+CSV_READ_CHUNK_BYTES = _env_int('CSV_READ_CHUNK_BYTES', 64 * 1024)
+CSV_MAX_HEAD_BYTES = _env_int('CSV_MAX_HEAD_BYTES', 4 * 1024 * 1024)
+# 按列分类：每列默认采样的值数量与上限、每个采样值保留的字符数
+CSV_SAMPLE_ROWS = _env_int('CSV_SAMPLE_ROWS', 5)
+CSV_MAX_SAMPLE_ROWS = _env_int('CSV_MAX_SAMPLE_ROWS', 50)
+CSV_SAMPLE_VALUE_CHARS = _env_int('CSV_SAMPLE_VALUE_CHARS', 32)
+
+# 表格扫描：每块读取的行数、每列蓄水池采样的值数量
+SCAN_CHUNK_ROWS = _env_int('SCAN_CHUNK_ROWS', 50000)
+SCAN_SAMPLE_SIZE = _env_int('SCAN_SAMPLE_SIZE', 200)
+# 表格扫描：采样值中检测器命中比例达到该阈值时直接判定，不再调用模型
+SCAN_DETECTOR_THRESHOLD = _env_float('SCAN_DETECTOR_THRESHOLD', 0.8)
+# 表格扫描：读取与采样的并发数、排队上限
+SCAN_WORKERS = _env_int('SCAN_WORKERS', 2)
+SCAN_QUEUE = _env_int('SCAN_QUEUE', 8)
+
+# 批量扫描命令行（python -m tools.scan）：工作进程数（0 表示 CPU 核数）、每个进程的 torch 线程数
+SCAN_PROCESSES = _env_int('SCAN_PROCESSES', 0)
+SCAN_TORCH_THREADS = _env_int('SCAN_TORCH_THREADS', 1)
+# 批量扫描：每个工作进程最多排队的文件数、文本文件读取的最大字符数、压缩包内单个文件的大小上限（字节）
+SCAN_PENDING_PER_PROCESS = _env_int('SCAN_PENDING_PER_PROCESS', 4)
+SCAN_TEXT_MAX_CHARS = _env_int('SCAN_TEXT_MAX_CHARS', 4096)
+SCAN_MAX_MEMBER_BYTES = _env_int('SCAN_MAX_MEMBER_BYTES', 512 * 1024 * 1024)
+# 批量扫描：Parquet 输出每个分片文件的行数
+SCAN_PARQUET_ROWS_PER_FILE = _env_int('SCAN_PARQUET_ROWS_PER_FILE', 10000)
+
+# 服务启动：各模态是否加载模型（只提供文本分类的节点可关闭图像、语音模型）
+MODEL_ENABLE_TXT = _env_bool('MODEL_ENABLE_TXT', True)
+MODEL_ENABLE_IMAGE = _env_bool('MODEL_ENABLE_IMAGE', True)
+MODEL_ENABLE_AUDIO = _env_bool('MODEL_ENABLE_AUDIO', True)
+# 服务启动：模型加载后是否执行一次预热推理
+MODEL_WARMUP = _env_bool('MODEL_WARMUP', True)
+# 服务启动：在导入 api.main 时同步加载模型（配合 gunicorn --preload，worker 共享 fork 前加载的权重）
+MODEL_PRELOAD = _env_bool('MODEL_PRELOAD', False)
+
+# 长音频识别：是否用语音活动检测丢弃静音；帧长（毫秒）、语音高出底噪的分贝数
+AUDIO_VAD = _env_bool('AUDIO_VAD', True)
+AUDIO_VAD_FRAME_MS = _env_float('AUDIO_VAD_FRAME_MS', 30)
+AUDIO_VAD_THRESHOLD_DB = _env_float('AUDIO_VAD_THRESHOLD_DB', 12)
+# 长音频识别：最短语音段、分隔语音段的最短静音、语音段前后保留的时长（毫秒）
+AUDIO_VAD_MIN_SPEECH_MS = _env_float('AUDIO_VAD_MIN_SPEECH_MS', 250)
+AUDIO_VAD_MIN_SILENCE_MS = _env_float('AUDIO_VAD_MIN_SILENCE_MS', 500)
+AUDIO_VAD_PAD_MS = _env_float('AUDIO_VAD_PAD_MS', 200)
+# 长音频识别：每次解码的音频块时长（秒）、语音段打包后每个识别片段的最长时长（秒，不超过30）、每批识别的片段数
+AUDIO_BLOCK_SECONDS = _env_float('AUDIO_BLOCK_SECONDS', 60)
+AUDIO_CHUNK_SECONDS = _env_float('AUDIO_CHUNK_SECONDS', 30)
+AUDIO_BATCH_SIZE = _env_int('AUDIO_BATCH_SIZE', 4)
+# 音频分类：转录文本达到该字符数后停止识别，只用开头部分分类，0 表示识别整段音频
+AUDIO_TRANSCRIPT_MAX_CHARS = _env_int('AUDIO_TRANSCRIPT_MAX_CHARS', 1000)
+# 音频分类渐进模式：每转录一个窗口（秒）就分类一次，各标签组最高分领先第二名达到 margin 时停止识别剩余音频
+AUDIO_EARLY_EXIT = _env_bool('AUDIO_EARLY_EXIT', True)
+AUDIO_EARLY_EXIT_WINDOW_SECONDS = _env_float('AUDIO_EARLY_EXIT_WINDOW_SECONDS', 30)
+AUDIO_EARLY_EXIT_MARGIN = _env_float('AUDIO_EARLY_EXIT_MARGIN', 0.3)
+
+# 语音识别后端：pytorch 原始精度；int8 动态量化（仅 CPU）；faster_whisper 使用 CTranslate2 推理引擎
+ASR_BACKEND = _env_str('ASR_BACKEND', 'pytorch')
+# Whisper 模型目录，为空时使用默认目录，可指向本地的蒸馏模型
+ASR_MODEL_PATH = _env_str('ASR_MODEL_PATH', '')
+# faster_whisper 后端：CTranslate2 模型目录（为空时使用 <模型目录>/ct2）、计算类型、CPU 线程数（0 表示自动）
+ASR_CT2_MODEL_PATH = _env_str('ASR_CT2_MODEL_PATH', '')
+ASR_CT2_COMPUTE_TYPE = _env_str('ASR_CT2_COMPUTE_TYPE', 'int8')
+ASR_CPU_THREADS = _env_int('ASR_CPU_THREADS', 0)
+
+# 长文本分类：超过单个窗口的文本按 token 窗口切分后分类再聚合
+LONG_TEXT_ENABLED = _env_bool('LONG_TEXT_ENABLED', True)
+# 窗口长度（token，0 表示模型最大长度减去最长假设句）、相邻窗口重叠的 token 数
+LONG_TEXT_WINDOW_TOKENS = _env_int('LONG_TEXT_WINDOW_TOKENS', 0)
+LONG_TEXT_OVERLAP_TOKENS = _env_int('LONG_TEXT_OVERLAP_TOKENS', 64)
+# 窗口得分的聚合方式：max、mean 或 vote
+LONG_TEXT_AGGREGATION = _env_str('LONG_TEXT_AGGREGATION', 'max')
+# 每个请求最多处理的 token 数，超出部分不参与分类，0 表示不限制
+LONG_TEXT_MAX_TOKENS = _env_int('LONG_TEXT_MAX_TOKENS', 4096)
+
+# 近似重复文本复用：MinHash 估计的 Jaccard 相似度达到阈值时复用已分类文本的结果
+DEDUP_ENABLED = _env_bool('DEDUP_ENABLED', True)
+DEDUP_THRESHOLD = _env_float('DEDUP_THRESHOLD', 0.8)
+# 索引最多保存的文本数，超出时淘汰最久未命中的条目
+DEDUP_MAX_ENTRIES = _env_int('DEDUP_MAX_ENTRIES', 50000)
+# 字符 n-gram 的长度、MinHash 的哈希函数个数、LSH 的分段数（需整除哈希函数个数）
+DEDUP_SHINGLE_SIZE = _env_int('DEDUP_SHINGLE_SIZE', 3)
+DEDUP_NUM_PERM = _env_int('DEDUP_NUM_PERM', 64)
+DEDUP_BANDS = _env_int('DEDUP_BANDS', 16)
+
+# 规则预分类：命中无歧义的关键词或正则时直接返回固定置信度的结果
+PREFILTER_ENABLED = _env_bool('PREFILTER_ENABLED', True)
+PREFILTER_CONFIDENCE = _env_float('PREFILTER_CONFIDENCE', 0.95)
+# 超过该字符数的文本往往涉及多个主题，不做规则预分类，0 表示不限制
+PREFILTER_MAX_CHARS = _env_int('PREFILTER_MAX_CHARS', 256)
+
+# 级联分类：先用字符 n-gram TF-IDF 为全部标签打分，只对前 k 个标签做零样本推理，0 表示不启用
+CLASSIFY_CASCADE_TOP_K = _env_int('CLASSIFY_CASCADE_TOP_K', 0)
@@ -0,0 +1,139 @@
+import os
+import logging
+from typing import List
+
+import numpy as np
+import torch
+from transformers import AutoModelForSpeechSeq2Seq, AutoProcessor, pipeline
+
+from tools.classifier.backends import quantize_int8
+from tools.settings import ASR_CT2_MODEL_PATH, ASR_CT2_COMPUTE_TYPE, ASR_CPU_THREADS
+
+# 配置日志
+logging.basicConfig(
+    level=logging.INFO,
+    format='%(asctime)s - %(name)s - %(levelname)s - %(message)s'
+)
+logger = logging.getLogger(__name__)
+
+ASR_BACKENDS = ('pytorch', 'int8', 'faster_whisper')
+# 本地模型不存在时从网络加载的模型
+FALLBACK_MODEL = 'openai/whisper-small'
+SAMPLING_RATE = 16000
+MAX_NEW_TOKENS = 128
+
+
+def default_ct2_path(model_path: str) -> str:
+    """CTranslate2 模型的默认目录：<模型目录>/ct2"""
+    return os.path.join(model_path, 'ct2')
+
+
+class TransformersWhisperBackend:
+    def __init__(self, model_path: str, quantize: bool = False):
+        """基于 transformers 流水线的 Whisper 推理
+
+        Args:
+            model_path: Whisper 模型的本地路径，不存在时从网络加载并保存到该路径
+            quantize: 是否对全连接层做动态 INT8 量化，只适用于 CPU
+        """
+        device = "cuda:0" if torch.cuda.is_available() else "cpu"
+        if quantize and device != "cpu":
+            raise ValueError('int8 后端仅适用于 CPU')
+        torch_dtype = torch.float16 if torch.cuda.is_available() else torch.float32
+        local = os.path.exists(model_path)
+        source = model_path if local else FALLBACK_MODEL
+        if local:
+            logger.info(f'发现本地模型：{model_path}')
+        else:
+            logger.info(f'本地模型不存在，从网络加载：{FALLBACK_MODEL}')
+
+        model = AutoModelForSpeechSeq2Seq.from_pretrained(
+            source, torch_dtype=torch_dtype, low_cpu_mem_usage=True
+        )
+        processor = AutoProcessor.from_pretrained(source)
+        if not local:
+            # 保存到本地
+            os.makedirs(model_path, exist_ok=True)
+            model.save_pretrained(model_path)
+            processor.save_pretrained(model_path)
+            logger.info(f'模型已保存到本地：{model_path}')
+        if quantize:
+            model = quantize_int8(model)
+        model.to(device)
+
+        # 清除模型的 forced_decoder_ids 配置
+        model.generation_config.forced_decoder_ids = None
+
+        self.pipe = pipeline(
+            "automatic-speech-recognition",
+            model=model,
+            tokenizer=processor.tokenizer,
+            feature_extractor=processor.feature_extractor,
+            max_new_tokens=MAX_NEW_TOKENS,
+            chunk_length_s=30,
+            batch_size=16,
+            return_timestamps=False,
+            torch_dtype=torch_dtype,
+            device=device,
+            generate_kwargs={"language": "chinese"}
+        )
+
+    def transcribe_batch(self, waveforms: List[np.ndarray]) -> List[str]:
+        """批量识别不超过 30 秒的 16 kHz 波形"""
+        # 片段均不超过 30 秒，关闭流水线的分块，避免重叠窗口重复计算
+        outputs = self.pipe(
+            [{"raw": waveform, "sampling_rate": SAMPLING_RATE} for waveform in waveforms],
+            batch_size=len(waveforms),
+            chunk_length_s=0
+        )
+        return [output['text'] for output in outputs]
+
+
+class FasterWhisperBackend:
+    def __init__(self, model_path: str, ct2_path: str = ASR_CT2_MODEL_PATH,
+                 compute_type: str = ASR_CT2_COMPUTE_TYPE, cpu_threads: int = ASR_CPU_THREADS):
+        """基于 CTranslate2（faster-whisper）的 Whisper 推理，CPU 上使用 INT8 计算
+
+        Args:
+            model_path: Whisper 模型的本地路径
+            ct2_path: 转换后的 CTranslate2 模型目录，为空时使用 <模型目录>/ct2
+            compute_type: 计算类型，如 int8、int8_float16、float16、float32
+            cpu_threads: CPU 线程数，0 表示自动
+        """
+        try:
+            from faster_whisper import WhisperModel
+        except ImportError as e:
+            raise ImportError('使用 faster_whisper 后端需要安装 faster-whisper：pip install faster-whisper') from e
+        ct2_path = ct2_path or default_ct2_path(model_path)
+        if not os.path.exists(ct2_path):
+            raise FileNotFoundError(
+                f'CTranslate2 模型不存在：{ct2_path}，请先用 ct2-transformers-converter 转换 {model_path}'
+            )
+        device = "cuda" if torch.cuda.is_available() else "cpu"
+        logger.info(f'加载 CTranslate2 模型：{ct2_path}，设备：{device}，计算类型：{compute_type}')
+        self.model = WhisperModel(ct2_path, device=device, compute_type=compute_type, cpu_threads=cpu_threads)
+
+    def transcribe_batch(self, waveforms: List[np.ndarray]) -> List[str]:
+        """逐个识别不超过 30 秒的 16 kHz 波形，解码参数与 transformers 后端一致（贪心解码）"""
+        texts = []
+        for waveform in waveforms:
+            segments, _ = self.model.transcribe(
+                waveform, language='zh', beam_size=1, condition_on_previous_text=False,
+                without_timestamps=True, max_new_tokens=MAX_NEW_TOKENS, vad_filter=False
+            )
+            texts.append(''.join(segment.text for segment in segments))
+        return texts
+
+
+def create_asr_backend(backend: str, model_path: str):
+    """按名称创建语音识别后端
+
+    Args:
+        backend: 'pytorch'、'int8' 或 'faster_whisper'
+        model_path: Whisper 模型的本地路径
+    """
+    if backend not in ASR_BACKENDS:
+        raise ValueError(f'不支持的语音识别后端：{backend}')
+    if backend == 'faster_whisper':
+        return FasterWhisperBackend(model_path)
+    return TransformersWhisperBackend(model_path, quantize=backend == 'int8')
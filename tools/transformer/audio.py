@@ -1,9 +1,20 @@
 import os
+import io
+import wave
 import logging
+import subprocess
+import threading
 import numpy as np
-from typing import Union, Optional
-import torch
-from transformers import AutoModelForSpeechSeq2Seq, AutoProcessor, pipeline
+from typing import Iterable, Iterator, Union, Optional
+from scipy.signal import resample_poly
+from transformers.pipelines.audio_utils import ffmpeg_read
+
+from tools.settings import (
+    AUDIO_VAD, AUDIO_BLOCK_SECONDS, AUDIO_CHUNK_SECONDS, AUDIO_BATCH_SIZE, ASR_BACKEND, ASR_MODEL_PATH
+)
+from tools.metrics import model_stage_seconds, timer, timed_iter
+from tools.transformer.asr_backends import create_asr_backend
+from tools.transformer.vad import iter_speech_chunks
 
 # 配置日志
 logging.basicConfig(
@@ -11,105 +22,240 @@ logging.basicConfig(
     format='%(asctime)s - %(name)s - %(levelname)s - %(message)s'
 )
 logger = logging.getLogger(__name__)
-model_path = "/etc/model/whisper-model"
+model_path = ASR_MODEL_PATH or "/etc/model/whisper-model"
+# Whisper 特征提取器要求的采样率
+SAMPLING_RATE = 16000
+
+
+def resample(waveform: np.ndarray, orig_rate: int, target_rate: int = SAMPLING_RATE) -> np.ndarray:
+    """将单声道波形重采样到目标采样率"""
+    if orig_rate == target_rate:
+        return waveform.astype(np.float32, copy=False)
+    divisor = np.gcd(int(orig_rate), int(target_rate))
+    return resample_poly(waveform, target_rate // divisor, orig_rate // divisor).astype(np.float32)
+
+
+def to_mono(waveform: np.ndarray) -> np.ndarray:
+    """多声道波形（采样点 × 声道）取平均混为单声道"""
+    waveform = np.asarray(waveform, dtype=np.float32)
+    if waveform.ndim == 2:
+        waveform = waveform.mean(axis=1)
+    return waveform
+
+
+def pcm_to_float(frames: bytes, width: int, channels: int) -> np.ndarray:
+    """将 PCM 采样数据转换为单声道 float32 波形"""
+    if width == 1:
+        waveform = (np.frombuffer(frames, dtype=np.uint8).astype(np.float32) - 128) / 128
+    elif width == 2:
+        waveform = np.frombuffer(frames, dtype='<i2').astype(np.float32) / 32768
+    elif width == 3:
+        raw = np.frombuffer(frames, dtype=np.uint8).reshape(-1, 3)
+        ints = (raw[:, 0].astype(np.int32) | (raw[:, 1].astype(np.int32) << 8) | (raw[:, 2].astype(np.int32) << 16))
+        ints = np.where(ints >= 1 << 23, ints - (1 << 24), ints)
+        waveform = ints.astype(np.float32) / (1 << 23)
+    elif width == 4:
+        waveform = np.frombuffer(frames, dtype='<i4').astype(np.float32) / (1 << 31)
+    else:
+        raise ValueError(f'不支持的 WAV 采样位宽：{width * 8}')
+    return to_mono(waveform.reshape(-1, channels))
+
+
+def decode_wav(data: bytes) -> tuple:
+    """用标准库解码 PCM 格式的 WAV，返回 (单声道 float32 波形, 采样率)"""
+    with wave.open(io.BytesIO(data)) as wav:
+        channels = wav.getnchannels()
+        width = wav.getsampwidth()
+        rate = wav.getframerate()
+        frames = wav.readframes(wav.getnframes())
+    return pcm_to_float(frames, width, channels), rate
+
+
+def is_wav(data: bytes) -> bool:
+    return data[:4] == b'RIFF' and data[8:12] == b'WAVE'
+
+
+def decode_audio(data: bytes, sampling_rate: int = SAMPLING_RATE) -> np.ndarray:
+    """在内存中将音频文件内容解码为指定采样率的单声道 float32 波形
+
+    PCM 格式的 WAV 直接用标准库解码，其他格式通过 ffmpeg 管道解码，均不落盘
+    """
+    if is_wav(data):
+        try:
+            waveform, rate = decode_wav(data)
+            return resample(waveform, rate, sampling_rate)
+        except (wave.Error, ValueError) as e:
+            logger.info(f'WAV 无法直接解码，改用 ffmpeg：{str(e)}')
+    return ffmpeg_read(data, sampling_rate)
+
+
+def load_audio(audio: Union[str, bytes, np.ndarray], sampling_rate: Optional[int] = None,
+               target_rate: int = SAMPLING_RATE) -> np.ndarray:
+    """将音频文件路径、文件内容或波形统一为目标采样率的单声道 float32 波形
+
+    Args:
+        audio: 音频文件路径、音频文件内容或波形数组
+        sampling_rate: 波形数组的采样率，默认视为 target_rate
+        target_rate: 目标采样率
+    """
+    if isinstance(audio, np.ndarray):
+        return resample(to_mono(audio), sampling_rate or target_rate, target_rate)
+    if isinstance(audio, str):
+        if not os.path.exists(audio):
+            raise FileNotFoundError(f'音频文件不存在：{audio}')
+        with open(audio, 'rb') as f:
+            audio = f.read()
+    return decode_audio(audio, target_rate)
+
+def audio_duration(audio: Union[bytes, np.ndarray], sampling_rate: Optional[int] = None) -> Optional[float]:
+    """不解码音频估计其时长（秒），PCM WAV 读取文件头，波形数组按采样数计算，其他格式返回 None"""
+    if isinstance(audio, np.ndarray):
+        return len(audio) / (sampling_rate or SAMPLING_RATE)
+    if isinstance(audio, bytes) and is_wav(audio):
+        try:
+            with wave.open(io.BytesIO(audio)) as wav:
+                return wav.getnframes() / wav.getframerate()
+        except (wave.Error, EOFError):
+            return None
+    return None
+
+
+def iter_wav_blocks(data: bytes, block_seconds: float, sampling_rate: int = SAMPLING_RATE) -> Iterator[np.ndarray]:
+    """逐块解码 PCM 格式的 WAV 并重采样，只解码被读取到的部分"""
+    with wave.open(io.BytesIO(data)) as wav:
+        channels = wav.getnchannels()
+        width = wav.getsampwidth()
+        rate = wav.getframerate()
+        block_frames = max(1, int(block_seconds * rate))
+        while True:
+            frames = wav.readframes(block_frames)
+            if not frames:
+                break
+            yield resample(pcm_to_float(frames, width, channels), rate, sampling_rate)
+
+
+def iter_ffmpeg_blocks(data: bytes, block_seconds: float, sampling_rate: int = SAMPLING_RATE) -> Iterator[np.ndarray]:
+    """通过 ffmpeg 管道逐块解码任意格式的音频，提前停止读取时结束 ffmpeg 进程"""
+    command = [
+        'ffmpeg', '-hide_banner', '-loglevel', 'error', '-i', 'pipe:0',
+        '-ac', '1', '-ar', str(sampling_rate), '-f', 'f32le', 'pipe:1'
+    ]
+    try:
+        process = subprocess.Popen(command, stdin=subprocess.PIPE, stdout=subprocess.PIPE, stderr=subprocess.DEVNULL)
+    except FileNotFoundError as e:
+        raise ValueError('解码该音频格式需要安装 ffmpeg') from e
+
+    def write_input():
+        # 输入在单独的线程中写入，避免输出管道写满时相互阻塞
+        try:
+            process.stdin.write(data)
+        except (BrokenPipeError, ValueError):
+            pass
+        finally:
+            try:
+                process.stdin.close()
+            except OSError:
+                pass
+
+    writer = threading.Thread(target=write_input, daemon=True)
+    writer.start()
+    block_bytes = max(1, int(block_seconds * sampling_rate)) * 4
+    decoded = 0
+    try:
+        while True:
+            raw = process.stdout.read(block_bytes)
+            if not raw:
+                break
+            decoded += len(raw)
+            yield np.frombuffer(raw[:len(raw) // 4 * 4], dtype=np.float32)
+    finally:
+        process.kill()
+        process.wait()
+        writer.join()
+    if decoded == 0:
+        raise ValueError('音频解码失败，文件格式可能不受支持')
+
+
+def iter_audio_blocks(audio: Union[str, bytes, np.ndarray], sampling_rate: Optional[int] = None,
+                      block_seconds: float = AUDIO_BLOCK_SECONDS,
+                      target_rate: int = SAMPLING_RATE) -> Iterator[np.ndarray]:
+    """按块生成目标采样率的单声道 float32 波形，长音频无需一次性解码
+
+    Args:
+        audio: 音频文件路径、音频文件内容或波形数组
+        sampling_rate: 波形数组的采样率，默认视为 target_rate
+        block_seconds: 每块的时长（秒）
+        target_rate: 目标采样率
+    """
+    if isinstance(audio, np.ndarray):
+        waveform = load_audio(audio, sampling_rate, target_rate)
+        block = max(1, int(block_seconds * target_rate))
+        for start in range(0, len(waveform), block):
+            yield waveform[start:start + block]
+        return
+    if isinstance(audio, str):
+        if not os.path.exists(audio):
+            raise FileNotFoundError(f'音频文件不存在：{audio}')
+        with open(audio, 'rb') as f:
+            audio = f.read()
+    if is_wav(audio):
+        try:
+            # 先读取文件头，无法用标准库解码的 WAV（如压缩编码）交给 ffmpeg
+            with wave.open(io.BytesIO(audio)) as wav:
+                if wav.getsampwidth() not in (1, 2, 3, 4):
+                    raise ValueError(f'不支持的 WAV 采样位宽：{wav.getsampwidth() * 8}')
+            yield from iter_wav_blocks(audio, block_seconds, target_rate)
+            return
+        except (wave.Error, ValueError, EOFError) as e:
+            logger.info(f'WAV 无法直接解码，改用 ffmpeg：{str(e)}')
+    yield from iter_ffmpeg_blocks(audio, block_seconds, target_rate)
+
 
 class AudioRecognizer:
-    def __init__(self, model_path: str = model_path):
+    def __init__(self, model_path: str = model_path, backend: str = ASR_BACKEND):
         """初始化语音识别器
         
         Args:
             model_path: Whisper模型的本地路径
+            backend: 推理后端，'pytorch'、'int8' 或 'faster_whisper'
         """
         self.model_path = model_path
-        logger.info(f'正在初始化语音识别器，使用模型：{model_path}')
+        self.backend_name = backend
+        logger.info(f'正在初始化语音识别器，使用模型：{model_path}，后端：{backend}')
         
         try:
-            if os.path.exists(model_path):
-                logger.info(f'发现本地模型：{model_path}')
-                # 加载本地模型
-                device = "cuda:0" if torch.cuda.is_available() else "cpu"
-                torch_dtype = torch.float16 if torch.cuda.is_available() else torch.float32
-                
-                model = AutoModelForSpeechSeq2Seq.from_pretrained(
-                    model_path, torch_dtype=torch_dtype, low_cpu_mem_usage=True
-                )
-                model.to(device)
-                
-                processor = AutoProcessor.from_pretrained(model_path)
-                
-                # 清除模型的 forced_decoder_ids 配置
-                model.generation_config.forced_decoder_ids = None
-                
-                self.pipe = pipeline(
-                    "automatic-speech-recognition",
-                    model=model,
-                    tokenizer=processor.tokenizer,
-                    feature_extractor=processor.feature_extractor,
-                    max_new_tokens=128,
-                    chunk_length_s=30,
-                    batch_size=16,
-                    return_timestamps=False,
-                    torch_dtype=torch_dtype,
-                    device=device,
-                    generate_kwargs={"language": "chinese"}
-                )
-            else:
-                logger.info(f'本地模型不存在，从网络加载：openai/whisper-small')
-                # 从网络加载模型
-                device = "cuda:0" if torch.cuda.is_available() else "cpu"
-                torch_dtype = torch.float16 if torch.cuda.is_available() else torch.float32
-                
-                model = AutoModelForSpeechSeq2Seq.from_pretrained(
-                    "openai/whisper-small", torch_dtype=torch_dtype, low_cpu_mem_usage=True
-                )
-                model.to(device)
-                
-                processor = AutoProcessor.from_pretrained("openai/whisper-small")
-                
-                # 清除模型的 forced_decoder_ids 配置
-                model.generation_config.forced_decoder_ids = None
-                
-                self.pipe = pipeline(
-                    "automatic-speech-recognition",
-                    model=model,
-                    tokenizer=processor.tokenizer,
-                    feature_extractor=processor.feature_extractor,
-                    max_new_tokens=128,
-                    chunk_length_s=30,
-                    batch_size=16,
-                    return_timestamps=False,
-                    torch_dtype=torch_dtype,
-                    device=device,
-                    generate_kwargs={"language": "chinese"}
-                )
-                
-                # 保存到本地
-                os.makedirs(model_path, exist_ok=True)
-                model.save_pretrained(model_path)
-                processor.save_pretrained(model_path)
-                logger.info(f'模型已保存到本地：{model_path}')
-                
+            self.backend = create_asr_backend(backend, model_path)
             logger.info('语音识别器初始化成功')
         except Exception as e:
             logger.error(f'语音识别器初始化失败：{str(e)}')
             raise
     
-    def transcribe(self, audio_file: str) -> str:
+    def transcribe(self, audio: Union[str, bytes, np.ndarray], sampling_rate: Optional[int] = None,
+                   max_chars: Optional[int] = None) -> str:
         """将语音转换为文本
         
+        音频在内存中逐块解码并重采样到 16 kHz，丢弃静音后分批送入识别流水线
+        
         Args:
-            audio_file: 音频文件路径
+            audio: 音频文件路径、音频文件内容（bytes）或波形数组
+            sampling_rate: 波形数组的采样率，默认 16 kHz
+            max_chars: 转录文本达到该字符数后停止识别，默认识别整段音频
             
         Returns:
             转录的文本
         """
         try:
-            if not os.path.exists(audio_file):
-                raise FileNotFoundError(f'音频文件不存在：{audio_file}')
-                
-            logger.info(f'开始转录音频：{audio_file}')
-            result = self.pipe(audio_file)
-            transcription = result["text"]
+            source = audio if isinstance(audio, str) else f'<{type(audio).__name__}>'
+            logger.info(f'开始转录音频：{source}')
+            texts = []
+            length = 0
+            for segment in self.transcribe_stream(audio, sampling_rate):
+                texts.append(segment['text'])
+                length += len(segment['text'])
+                if max_chars and length >= max_chars:
+                    logger.info(f'转录文本已达 {max_chars} 字符，在 {segment["end"]:.1f} 秒处停止识别')
+                    break
+            transcription = ''.join(texts)
             
             logger.info(f'音频转录完成：{transcription}')
             return transcription
@@ -117,11 +263,53 @@ class AudioRecognizer:
             logger.error(f'音频转录失败：{str(e)}')
             raise
 
+    def transcribe_stream(self, audio: Union[str, bytes, np.ndarray], sampling_rate: Optional[int] = None,
+                          batch_size: Union[int, Iterable[int]] = AUDIO_BATCH_SIZE, vad: bool = AUDIO_VAD,
+                          chunk_seconds: float = AUDIO_CHUNK_SECONDS) -> Iterator[dict]:
+        """逐段转录长音频，每识别完一批片段就按顺序产出部分转录结果
+
+        音频按块解码，语音活动检测丢弃静音，语音段打包成不超过 chunk_seconds 的片段，
+        每 batch_size 个片段合并为一次识别。调用方提前停止迭代时不再解码后续音频。
+
+        Args:
+            audio: 音频文件路径、音频文件内容（bytes）或波形数组
+            sampling_rate: 波形数组的采样率，默认 16 kHz
+            batch_size: 每批识别的片段数；也可以是依次使用的批大小序列，用完后沿用最后一个
+            vad: 是否丢弃静音
+            chunk_seconds: 每个片段的最长时长（秒）
+
+        Returns:
+            Iterator[dict]: 每个片段的 text、start、end（原音频中的秒数）和 speech_seconds
+        """
+        blocks = timed_iter(iter_audio_blocks(audio, sampling_rate), model_stage_seconds.labels('audio', 'decode'))
+        sizes = iter((batch_size,) if isinstance(batch_size, int) else batch_size)
+        size = max(1, next(sizes, AUDIO_BATCH_SIZE))
+        batch = []
+        for chunk in iter_speech_chunks(blocks, SAMPLING_RATE, chunk_seconds, vad):
+            batch.append(chunk)
+            if len(batch) >= size:
+                yield from self._transcribe_chunks(batch)
+                batch = []
+                size = max(1, next(sizes, size))
+        if batch:
+            yield from self._transcribe_chunks(batch)
+
+    def _transcribe_chunks(self, chunks: list) -> Iterator[dict]:
+        with timer(model_stage_seconds.labels('audio', 'asr')):
+            texts = self.backend.transcribe_batch([chunk['audio'] for chunk in chunks])
+        for chunk, text in zip(chunks, texts):
+            yield {
+                'text': text,
+                'start': chunk['start'],
+                'end': chunk['end'],
+                'speech_seconds': chunk['speech_seconds']
+            }
+
 if __name__ == '__main__':
     # 测试代码
     recognizer = AudioRecognizer()
     
     # 测试本地音频文件（如果有的话）
-    audio_file = '/var/folders/fg/cdwfcq7j0xx97fpzvv3yydcr0000gn/T/tmp4usko48q.wav'
+    audio_file = 'audio/06_life_services_1_information_inquiry_01.wav'
     print('\n音频转录结果：')
     print(recognizer.transcribe(audio_file))
\ No newline at end of file
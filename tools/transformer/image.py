@@ -1,10 +1,17 @@
 import os
 import logging
+import hashlib
+import threading
 import requests
+from collections import OrderedDict
+from io import BytesIO
 from PIL import Image
-from typing import Optional, Union
+from typing import List, Optional, Union
 from transformers import BlipProcessor, BlipForConditionalGeneration
 
+from tools.metrics import model_stage_seconds, timer
+from tools.settings import IMAGE_CAPTION_CACHE_SIZE, IMAGE_BATCH_SIZE, IMAGE_CAPTION_MAX_LENGTH
+
 # 配置日志
 logging.basicConfig(
     level=logging.INFO,
@@ -14,13 +21,19 @@ logger = logging.getLogger(__name__)
 model_path ="/etc/model/blip-model"
 
 class ImageRecognizer:
-    def __init__(self, model_path: str = model_path):
+    def __init__(self, model_path: str = model_path, cache_size: int = IMAGE_CAPTION_CACHE_SIZE):
         """初始化图像识别器
         
         Args:
             model_path: BLIP模型的本地路径
+            cache_size: 图像描述缓存的最大条目数，0 表示不缓存
         """
         self.model_path = model_path
+        self.cache_size = cache_size
+        self._caption_cache = OrderedDict()
+        self._cache_lock = threading.Lock()
+        self.cache_hits = 0
+        self.cache_misses = 0
         logger.info(f'正在初始化图像识别器，使用模型：{model_path}')
         
         try:
@@ -34,11 +47,11 @@ class ImageRecognizer:
             logger.error(f'图像识别器初始化失败：{str(e)}')
             raise
     
-    def load_image(self, image_source: Union[str, Image.Image]) -> Image.Image:
+    def load_image(self, image_source: Union[str, bytes, Image.Image]) -> Image.Image:
         """加载图像
         
         Args:
-            image_source: 图像来源，可以是图像URL、本地文件路径或PIL Image对象
+            image_source: 图像来源，可以是图像URL、本地文件路径、图像文件内容或PIL Image对象
             
         Returns:
             PIL Image对象
@@ -46,6 +59,9 @@ class ImageRecognizer:
         try:
             if isinstance(image_source, Image.Image):
                 return image_source
+
+            if isinstance(image_source, bytes):
+                return Image.open(BytesIO(image_source)).convert('RGB')
             
             if isinstance(image_source, str):
                 if image_source.startswith('http'):
@@ -64,28 +80,40 @@ class ImageRecognizer:
             logger.error(f'图像加载失败：{str(e)}')
             raise
     
-    def recognize(self, image_source: Union[str, Image.Image], max_length: Optional[int] = None) -> str:
+    def recognize(self, image_source: Union[str, bytes, Image.Image],
+                  max_length: Optional[int] = IMAGE_CAPTION_MAX_LENGTH or None) -> str:
         """识别图像内容
         
+        同一图像（按内容哈希判断）的描述会被缓存，重复识别时直接返回
+        
         Args:
-            image_source: 图像来源，可以是图像URL、本地文件路径或PIL Image对象
-            max_length: 生成描述的最大长度
+            image_source: 图像来源，可以是图像URL、本地文件路径、图像文件内容或PIL Image对象
+            max_length: 生成描述的最大长度，None 表示使用模型生成配置的默认值，默认与 recognize_batch 相同
             
         Returns:
             图像描述文本
         """
         try:
             # 加载并处理图像
-            raw_image = self.load_image(image_source)
-            inputs = self.processor(raw_image, return_tensors="pt")
+            with timer(model_stage_seconds.labels('image', 'decode')):
+                raw_image = self.load_image(image_source)
+            cache_key = self._cache_key(image_source, raw_image, max_length)
+            description = self._get_cached(cache_key)
+            if description is not None:
+                logger.info(f'图像识别命中缓存：{description}')
+                return description
+            with timer(model_stage_seconds.labels('image', 'preprocess')):
+                inputs = self.processor(raw_image, return_tensors="pt")
             
             # 生成描述
             generation_kwargs = {}
-            if max_length is not None:
+            if max_length:
                 generation_kwargs['max_length'] = max_length
                 
-            out = self.model.generate(**inputs, **generation_kwargs)
+            with timer(model_stage_seconds.labels('image', 'caption')):
+                out = self.model.generate(**inputs, **generation_kwargs)
             description = self.processor.decode(out[0], skip_special_tokens=True)
+            self._set_cached(cache_key, description)
             
             logger.info(f'图像识别完成：{description}')
             return description
@@ -93,6 +121,91 @@ class ImageRecognizer:
             logger.error(f'图像识别失败：{str(e)}')
             raise
 
+    def recognize_batch(self, image_sources: List[Union[str, bytes, Image.Image]],
+                        batch_size: int = IMAGE_BATCH_SIZE,
+                        max_length: Optional[int] = IMAGE_CAPTION_MAX_LENGTH or None) -> List[str]:
+        """批量识别图像内容
+        
+        未命中缓存的图像按 batch_size 分组，每组预处理为一个张量并只调用一次 generate
+        
+        Args:
+            image_sources: 图像来源列表，元素类型同 recognize
+            batch_size: 每次 generate 的图片数
+            max_length: 生成描述的最大长度，None 表示使用模型生成配置的默认值
+            
+        Returns:
+            与 image_sources 一一对应的图像描述文本
+        """
+        try:
+            with timer(model_stage_seconds.labels('image', 'decode')):
+                raw_images = [self.load_image(image_source) for image_source in image_sources]
+            cache_keys = [
+                self._cache_key(image_source, raw_image, max_length)
+                for image_source, raw_image in zip(image_sources, raw_images)
+            ]
+            descriptions = [self._get_cached(cache_key) for cache_key in cache_keys]
+            pending = [i for i, description in enumerate(descriptions) if description is None]
+
+            generation_kwargs = {}
+            if max_length:
+                generation_kwargs['max_length'] = max_length
+            for start in range(0, len(pending), max(1, batch_size)):
+                chunk = pending[start:start + max(1, batch_size)]
+                with timer(model_stage_seconds.labels('image', 'preprocess')):
+                    inputs = self.processor(images=[raw_images[i] for i in chunk], return_tensors="pt")
+                with timer(model_stage_seconds.labels('image', 'caption')):
+                    out = self.model.generate(**inputs, **generation_kwargs)
+                for i, description in zip(chunk, self.processor.batch_decode(out, skip_special_tokens=True)):
+                    descriptions[i] = description
+                    self._set_cached(cache_keys[i], description)
+
+            logger.info(f'批量图像识别完成，共 {len(descriptions)} 张，新生成 {len(pending)} 张')
+            return descriptions
+        except Exception as e:
+            logger.error(f'批量图像识别失败：{str(e)}')
+            raise
+
+    def cache_stats(self) -> dict:
+        """返回图像描述缓存的命中、未命中次数与当前条目数"""
+        return {
+            "entries": len(self._caption_cache),
+            "max_entries": self.cache_size,
+            "hits": self.cache_hits,
+            "misses": self.cache_misses
+        }
+
+    @staticmethod
+    def _cache_key(image_source, raw_image: Image.Image, max_length: Optional[int]) -> str:
+        """按图像内容计算缓存键：文件内容直接取哈希，其余来源对解码后的像素取哈希"""
+        digest = hashlib.sha256()
+        if isinstance(image_source, bytes):
+            digest.update(image_source)
+        else:
+            digest.update(f'{raw_image.mode}:{raw_image.size}'.encode('utf-8'))
+            digest.update(raw_image.tobytes())
+        return f'{digest.hexdigest()}:{max_length or None}'
+
+    def _get_cached(self, key: str) -> Optional[str]:
+        if self.cache_size <= 0:
+            return None
+        with self._cache_lock:
+            description = self._caption_cache.get(key)
+            if description is None:
+                self.cache_misses += 1
+                return None
+            self._caption_cache.move_to_end(key)
+            self.cache_hits += 1
+            return description
+
+    def _set_cached(self, key: str, description: str):
+        if self.cache_size <= 0:
+            return
+        with self._cache_lock:
+            self._caption_cache[key] = description
+            self._caption_cache.move_to_end(key)
+            while len(self._caption_cache) > self.cache_size:
+                self._caption_cache.popitem(last=False)
+
 if __name__ == '__main__':
     # 测试代码
     recognizer = ImageRecognizer()
@@ -0,0 +1,94 @@
+import codecs
+import csv
+import io
+import logging
+from typing import BinaryIO, List, Tuple
+
+from tools.settings import CSV_READ_CHUNK_BYTES, CSV_MAX_HEAD_BYTES, CSV_SAMPLE_VALUE_CHARS
+
+# 配置日志
+logging.basicConfig(
+    level=logging.INFO,
+    format='%(asctime)s - %(name)s - %(levelname)s - %(message)s'
+)
+logger = logging.getLogger(__name__)
+
+
+def sniff_encoding(head: bytes) -> str:
+    """根据文件开头判断编码：UTF-8 BOM、UTF-8，否则按 GB18030（兼容 GBK）处理"""
+    if head.startswith(codecs.BOM_UTF8):
+        return 'utf-8-sig'
+    try:
+        # 开头可能截断在多字节字符中间，用增量解码器避免误判
+        codecs.getincrementaldecoder('utf-8')().decode(head, final=False)
+        return 'utf-8'
+    except UnicodeDecodeError:
+        return 'gb18030'
+
+
+def read_csv_head(stream: BinaryIO, sample_rows: int = 0, chunk_size: int = CSV_READ_CHUNK_BYTES,
+                  max_bytes: int = CSV_MAX_HEAD_BYTES) -> Tuple[List[str], List[List[str]], str]:
+    """从 CSV 文件流中只读取表头和前若干行
+
+    按块读取，解析出表头和 sample_rows 行完整记录后立即停止，不会把整个文件载入内存
+
+    Args:
+        stream: 二进制文件流
+        sample_rows: 表头之后需要读取的数据行数
+        chunk_size: 每次读取的字节数
+        max_bytes: 最多读取的字节数
+
+    Returns:
+        (表头, 数据行, 编码)
+    """
+    needed = 1 + max(0, sample_rows)
+    decoder = None
+    encoding = 'utf-8'
+    text = ''
+    read_bytes = 0
+    rows = []
+    while True:
+        chunk = stream.read(chunk_size)
+        eof = not chunk
+        if decoder is None and chunk:
+            encoding = sniff_encoding(chunk)
+            decoder = codecs.getincrementaldecoder(encoding)(errors='replace')
+        if decoder is not None:
+            text += decoder.decode(chunk, final=eof)
+        read_bytes += len(chunk)
+        rows = list(csv.reader(io.StringIO(text)))
+        # 多解析出一行说明前 needed 行都已完整，不会截断在引号内的换行处
+        if eof or len(rows) > needed:
+            break
+        if read_bytes >= max_bytes:
+            logger.warning(f'CSV 前 {needed} 行超过 {max_bytes} 字节，只使用已读取的部分')
+            if len(rows) > 1:
+                rows = rows[:-1]
+            break
+    rows = rows[:needed]
+    if not rows:
+        return [], [], encoding
+    return rows[0], rows[1:], encoding
+
+
+def column_samples(headers: List[str], rows: List[List[str]],
+                   max_chars: int = CSV_SAMPLE_VALUE_CHARS) -> List[List[str]]:
+    """按列收集非空的采样值，每个值最多保留 max_chars 个字符"""
+    samples = [[] for _ in headers]
+    for row in rows:
+        for index, value in enumerate(row[:len(headers)]):
+            value = value.strip()
+            if value:
+                samples[index].append(value[:max_chars])
+    return samples
+
+
+def build_column_texts(table_name: str, headers: List[str], samples: List[List[str]]) -> List[str]:
+    """为每一列生成用于分类的文本：表名、列名和采样值"""
+    texts = []
+    for header, values in zip(headers, samples):
+        text = f'表名：{table_name}，列名：{header}'
+        if values:
+            text += f'，示例值：{"、".join(values)}'
+        texts.append(text)
+    return texts
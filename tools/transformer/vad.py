@@ -0,0 +1,177 @@
+import logging
+from typing import Iterable, Iterator, List, Optional, Tuple
+
+import numpy as np
+
+from tools.settings import (
+    AUDIO_VAD_FRAME_MS, AUDIO_VAD_THRESHOLD_DB, AUDIO_VAD_MIN_SPEECH_MS, AUDIO_VAD_MIN_SILENCE_MS,
+    AUDIO_VAD_PAD_MS, AUDIO_CHUNK_SECONDS
+)
+
+# 配置日志
+logging.basicConfig(
+    level=logging.INFO,
+    format='%(asctime)s - %(name)s - %(levelname)s - %(message)s'
+)
+logger = logging.getLogger(__name__)
+
+# 语音判定阈值的下限（dBFS）：静音底噪极低时不把微弱噪声当作语音；中位能量低于该值的块视为静音
+MIN_THRESHOLD_DB = -55.0
+# 阈值至少高出底噪的分贝数，能量起伏很小的平稳噪声不会被判为语音
+MIN_CONTRAST_DB = 3.0
+# 拼接语音段时插入的静音间隔（秒），保留语音段的边界
+SEGMENT_GAP_SECONDS = 0.1
+# Whisper 单次输入的最长时长（秒）
+MAX_CHUNK_SECONDS = 30.0
+
+
+def frame_energy_db(waveform: np.ndarray, frame_samples: int) -> np.ndarray:
+    """按帧计算能量（dBFS），不足一帧的尾部忽略"""
+    count = len(waveform) // frame_samples
+    frames = waveform[:count * frame_samples].reshape(count, frame_samples)
+    return 10 * np.log10(np.mean(frames.astype(np.float64) ** 2, axis=1) + 1e-10)
+
+
+def detect_speech(waveform: np.ndarray, sampling_rate: int, frame_ms: float = AUDIO_VAD_FRAME_MS,
+                  threshold_db: float = AUDIO_VAD_THRESHOLD_DB, min_speech_ms: float = AUDIO_VAD_MIN_SPEECH_MS,
+                  min_silence_ms: float = AUDIO_VAD_MIN_SILENCE_MS,
+                  pad_ms: float = AUDIO_VAD_PAD_MS) -> List[Tuple[int, int]]:
+    """基于短时能量的语音活动检测
+
+    以能量的第 10 百分位估计底噪，高出底噪 threshold_db 的帧视为语音；底噪与块内峰值相差不足时
+    （低增益或低信噪比的录音）阈值取两者的中点。间隔短于 min_silence_ms 的语音段合并，
+    短于 min_speech_ms 的语音段丢弃，每段前后各保留 pad_ms。没有检测到语音但块并非静音时保留整块，
+    避免整段语音（底噪即语音电平）被丢弃。
+
+    Args:
+        waveform: 单声道 float32 波形
+        sampling_rate: 采样率
+        frame_ms: 帧长（毫秒）
+        threshold_db: 语音高出底噪的分贝数
+        min_speech_ms: 最短语音段（毫秒）
+        min_silence_ms: 分隔两段语音的最短静音（毫秒）
+        pad_ms: 语音段前后保留的时长（毫秒）
+
+    Returns:
+        list: 语音段的 (起始采样点, 结束采样点)
+    """
+    frame_samples = max(1, int(sampling_rate * frame_ms / 1000))
+    energy = frame_energy_db(waveform, frame_samples)
+    if len(energy) == 0:
+        return []
+    noise_floor = np.percentile(energy, 10)
+    peak = energy.max()
+    threshold = max(min(noise_floor + threshold_db, (noise_floor + peak) / 2),
+                    noise_floor + MIN_CONTRAST_DB, MIN_THRESHOLD_DB)
+    segments = find_segments(energy > threshold, frame_samples, len(waveform), sampling_rate,
+                             frame_ms, min_speech_ms, min_silence_ms, pad_ms)
+    if not segments and np.median(energy) > MIN_THRESHOLD_DB:
+        logger.info(f'语音检测未找到语音段，块中位能量 {np.median(energy):.1f} dBFS，保留整块')
+        return [(0, len(waveform))]
+    return segments
+
+
+def find_segments(active: np.ndarray, frame_samples: int, length: int, sampling_rate: int, frame_ms: float,
+                  min_speech_ms: float, min_silence_ms: float, pad_ms: float) -> List[Tuple[int, int]]:
+    """把逐帧的语音判定合并为语音段 (起始采样点, 结束采样点)"""
+    active = np.concatenate([[False], active, [False]])
+    changes = np.flatnonzero(np.diff(active.astype(np.int8)))
+    runs = list(zip(changes[0::2], changes[1::2]))
+    if not runs:
+        return []
+
+    min_silence = min_silence_ms / frame_ms
+    merged = [list(runs[0])]
+    for start, end in runs[1:]:
+        if start - merged[-1][1] < min_silence:
+            merged[-1][1] = end
+        else:
+            merged.append([start, end])
+
+    min_speech = min_speech_ms / frame_ms
+    pad = int(sampling_rate * pad_ms / 1000)
+    segments = []
+    for start, end in merged:
+        if end - start < min_speech:
+            continue
+        start = max(0, start * frame_samples - pad)
+        end = min(length, end * frame_samples + pad)
+        if segments and start <= segments[-1][1]:
+            segments[-1] = (segments[-1][0], end)
+        else:
+            segments.append((start, end))
+    return segments
+
+
+class SpeechChunker:
+    def __init__(self, sampling_rate: int, chunk_seconds: float = AUDIO_CHUNK_SECONDS, vad: bool = True):
+        """把逐块输入的波形切分为语音段，并打包成不超过 chunk_seconds 的识别片段
+
+        Args:
+            sampling_rate: 采样率
+            chunk_seconds: 每个识别片段的最长时长，不超过 Whisper 的 30 秒
+            vad: 是否丢弃静音，关闭时按固定时长切分
+        """
+        self.sampling_rate = sampling_rate
+        self.max_samples = int(min(chunk_seconds, MAX_CHUNK_SECONDS) * sampling_rate)
+        self.gap = np.zeros(int(SEGMENT_GAP_SECONDS * sampling_rate), dtype=np.float32)
+        self.vad = vad
+        self.offset = 0
+        self._pieces: List[np.ndarray] = []
+        self._length = 0
+        self._start: Optional[int] = None
+        self._end = 0
+        self._speech = 0
+
+    def feed(self, block: np.ndarray) -> List[dict]:
+        """输入一块波形，返回已装满的识别片段"""
+        chunks = []
+        segments = detect_speech(block, self.sampling_rate) if self.vad else [(0, len(block))]
+        for start, end in segments:
+            while start < end:
+                gap = len(self.gap) if self._pieces else 0
+                room = self.max_samples - self._length - gap
+                if room <= 0:
+                    chunks.append(self._emit())
+                    continue
+                take = min(room, end - start)
+                if gap:
+                    self._pieces.append(self.gap)
+                self._pieces.append(block[start:start + take])
+                self._length += gap + take
+                self._speech += take
+                if self._start is None:
+                    self._start = self.offset + start
+                self._end = self.offset + start + take
+                start += take
+        self.offset += len(block)
+        return chunks
+
+    def flush(self) -> List[dict]:
+        """返回剩余未装满的识别片段"""
+        return [self._emit()] if self._pieces else []
+
+    def _emit(self) -> dict:
+        chunk = {
+            'audio': np.concatenate(self._pieces),
+            'start': self._start / self.sampling_rate,
+            'end': self._end / self.sampling_rate,
+            'speech_seconds': self._speech / self.sampling_rate
+        }
+        self._pieces, self._length, self._start, self._speech = [], 0, None, 0
+        return chunk
+
+
+def iter_speech_chunks(blocks: Iterable[np.ndarray], sampling_rate: int,
+                       chunk_seconds: float = AUDIO_CHUNK_SECONDS, vad: bool = True) -> Iterator[dict]:
+    """逐块读取波形并生成识别片段，每个片段包含 audio、start、end（原音频中的秒数）和 speech_seconds"""
+    chunker = SpeechChunker(sampling_rate, chunk_seconds, vad)
+    total_speech = 0.0
+    for block in blocks:
+        for chunk in chunker.feed(block):
+            total_speech += chunk['speech_seconds']
+            yield chunk
+    for chunk in chunker.flush():
+        total_speech += chunk['speech_seconds']
+        yield chunk
+    logger.info(f'语音检测：音频 {chunker.offset / sampling_rate:.1f} 秒，语音 {total_speech:.1f} 秒')